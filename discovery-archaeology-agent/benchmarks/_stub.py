@@ -0,0 +1,222 @@
+"""Shared helpers for offline benchmarks.
+
+Benchmarks never talk to OpenAI. ``configure_environment`` points the app at
+a throwaway SQLite file and ``install_stub_llm`` swaps ``ChatOpenAI`` for a
+canned model with a configurable delay. Both must run before the package's
+API module is imported.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+
+def configure_environment(db_path: str = None) -> str:
+    """Point settings at a temporary database and a dummy API key."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="daa-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+    return db_path
+
+
+DEFAULT_PATTERNS = ["accident_to_innovation", "prerequisite_chain"]
+
+
+def canned_analysis(invention_name: str, discoveries: int = 5, patterns: list = None) -> dict:
+    """Build a valid ``InventionAnalysis`` payload for an invention."""
+    patterns = patterns or DEFAULT_PATTERNS
+    return {
+        "invention_name": invention_name,
+        "invention_year": 1900 + (sum(map(ord, invention_name)) % 120),
+        "summary": f"Summary of {invention_name}.",
+        "discoveries": [
+            {
+                "id": f"d{i}",
+                "year": 1850 + i,
+                "title": f"{invention_name} discovery {i}",
+                "description": "An accident in the lab revealed something unexpected.",
+                "discoverers": [f"Researcher {i}"],
+                "discovery_type": "accidental",
+                "original_goal": "Something else entirely",
+                "actual_outcome": "A surprising effect",
+                "significance": "Made the invention possible",
+                "location": "Somewhere",
+            }
+            for i in range(discoveries)
+        ],
+        "connections": [
+            {
+                "from_discovery_id": f"d{i}",
+                "to_discovery_id": f"d{i + 1}",
+                "relationship_type": "enabled",
+                "description": "One led to the next",
+            }
+            for i in range(discoveries - 1)
+        ],
+        "patterns_identified": patterns,
+        "pattern_explanations": {pattern: f"{invention_name} shows {pattern}." for pattern in patterns},
+        "serendipity_moments": ["A lucky accident", "A failed batch"],
+        "critical_prerequisites": ["Electricity"],
+        "objective_blindness_examples": ["Nobody was looking for this"],
+        "narrative": f"The meandering story of {invention_name}.",
+        "key_lesson": "Follow the surprises.",
+    }
+
+
+def canned_focus_delta(invention_name: str, focus_areas: str, discoveries: int = 2) -> dict:
+    """Build a valid ``FocusDelta`` payload extending a stored analysis."""
+    return {
+        "summary": f"{invention_name} seen through {focus_areas}.",
+        "highlighted_discovery_ids": [],
+        "discoveries": [
+            {
+                "id": f"f{i}",
+                "year": 1860 + i,
+                "title": f"{invention_name} {focus_areas} discovery {i}",
+                "description": "A detail that only matters for this focus.",
+                "discoverers": [f"Specialist {i}"],
+                "discovery_type": "observation",
+                "actual_outcome": "A new angle",
+                "significance": "Explains the focus area",
+            }
+            for i in range(discoveries)
+        ],
+        "connections": [
+            {"from_discovery_id": f"f{i}", "to_discovery_id": f"f{i + 1}",
+             "relationship_type": "enabled", "description": "One led to the next"}
+            for i in range(discoveries - 1)
+        ],
+        "insights": [f"What {focus_areas} teaches about {invention_name}."],
+    }
+
+
+def canned_response(prompt: str) -> str:
+    """The canned completion for an analysis, focus, pattern or reduce prompt."""
+    if "Analyze the invention:" in prompt:
+        name = prompt.split("Analyze the invention:", 1)[1].splitlines()[0].strip()
+        return json.dumps(canned_analysis(name))
+    if prompt.startswith("Invention:") and "Focus areas:" in prompt:
+        lines = prompt.splitlines()
+        return json.dumps(canned_focus_delta(lines[0][len("Invention:"):].strip(), lines[1][len("Focus areas:"):].strip()))
+    # Pattern prompts list inventions as "- name"; reduce prompts do not
+    names = [line[2:] for line in prompt.splitlines() if line.startswith("- ") and ":" not in line]
+    return json.dumps({
+        "pattern_description": "A recurring pattern.",
+        "examples": [{"invention": name, "example": "It happened", "impact": "Large"} for name in names],
+        "insights": "Innovation meanders.",
+    })
+
+
+class StubChatModel:
+    """Drop-in stand-in for ``ChatOpenAI`` that returns canned JSON."""
+
+    delay = 0.0
+    calls = 0
+    max_prompt_chars = 0
+    _lock = threading.Lock()
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    @classmethod
+    def reset(cls, delay: float = 0.0):
+        cls.delay = delay
+        cls.calls = 0
+        cls.max_prompt_chars = 0
+
+    @classmethod
+    def _count(cls, messages):
+        with cls._lock:
+            cls.calls += 1
+            cls.max_prompt_chars = max(cls.max_prompt_chars, sum(len(m.content) for m in messages))
+
+    def _respond(self, messages) -> SimpleNamespace:
+        return SimpleNamespace(content=canned_response(messages[-1].content))
+
+    def invoke(self, messages, **kwargs):
+        self._count(messages)
+        time.sleep(self.delay)
+        return self._respond(messages)
+
+    async def ainvoke(self, messages, **kwargs):
+        self._count(messages)
+        await asyncio.sleep(self.delay)
+        return self._respond(messages)
+
+    async def astream(self, messages, chunk_chars: int = 64, **kwargs):
+        """Stream the canned response in chunks spread evenly over ``delay``."""
+        self._count(messages)
+        content = self._respond(messages).content
+        chunks = [content[i:i + chunk_chars] for i in range(0, len(content), chunk_chars)]
+        for chunk in chunks:
+            await asyncio.sleep(self.delay / len(chunks))
+            yield SimpleNamespace(content=chunk)
+        if self.kwargs.get("stream_usage"):
+            # Like the OpenAI API, usage arrives in a final chunk with no text
+            yield SimpleNamespace(content="", usage_metadata={
+                "input_tokens": sum(len(m.content) for m in messages) // 4,
+                "output_tokens": len(content) // 4
+            })
+
+
+def install_stub_llm(delay: float = 0.0):
+    """Replace ``ChatOpenAI`` in the client module with ``StubChatModel``."""
+    from discovery_archaeology_agent import openai_client
+
+    StubChatModel.reset(delay)
+    openai_client.ChatOpenAI = StubChatModel
+    openai_client._client = None  # rebuild the shared client on the stub
+    return StubChatModel
+
+
+def point_client_at(base_url: str):
+    """Send the shared client's real ``ChatOpenAI`` to a local endpoint."""
+    from discovery_archaeology_agent import openai_client
+    from discovery_archaeology_agent.config import settings
+
+    settings.openai_base_url = base_url
+    openai_client._client = None
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LiveServer:
+    """Run the FastAPI app under uvicorn in a background thread.
+
+    ``httpx.ASGITransport`` buffers whole response bodies, so anything that
+    measures streaming has to go through a real socket.
+    """
+
+    def __init__(self, app, port: int = 0):
+        import socket
+
+        import uvicorn
+
+        if not port:
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
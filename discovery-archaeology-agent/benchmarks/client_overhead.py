@@ -0,0 +1,124 @@
+"""Per-request overhead of building the LLM client versus sharing one.
+
+"fresh" repeats what every request used to do: build a ``ChatOpenAI`` (and
+with it a new HTTP connection pool), a ``PydanticOutputParser`` and the
+analysis ``ChatPromptTemplate``, then render the prompt with freshly
+generated format instructions. "shared" renders the prompt on the
+process-wide client. Both then make one call to a local OpenAI-compatible
+endpoint, so the cost of opening a new connection per request shows up too.
+
+    python -m benchmarks.client_overhead --requests 200
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._stub import LiveServer, configure_environment, percentile, point_client_at
+
+
+def _completions_app():
+    """Minimal ``/v1/chat/completions`` endpoint that answers instantly."""
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def completions(body: dict):
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "{}"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }
+
+    return app
+
+
+def _fresh_messages(base_url: str):
+    """Build everything per request, as before the shared client."""
+    from langchain_core.output_parsers import PydanticOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.openai_client import ANALYSIS_MESSAGES, LLM_PARAMS
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+
+    llm = ChatOpenAI(
+        model=settings.openai_model,
+        api_key=settings.openai_api_key,
+        base_url=base_url,
+        **LLM_PARAMS
+    )
+    parser = PydanticOutputParser(pydantic_object=InventionAnalysis)
+    prompt = ChatPromptTemplate.from_messages(ANALYSIS_MESSAGES)
+    messages = prompt.format_messages(
+        invention_name="Microwave Oven",
+        focus_prompt="",
+        format_instructions=parser.get_format_instructions()
+    )
+    return llm, messages
+
+
+def _shared_messages(client):
+    return client.llm, client._analysis_messages("Microwave Oven", None)
+
+
+async def _measure(label: str, build, requests: int, call: bool):
+    build_times, call_times = [], []
+    for _ in range(requests):
+        start = time.perf_counter()
+        llm, messages = build()
+        built = time.perf_counter()
+        if call:
+            await llm.ainvoke(messages)
+        build_times.append(built - start)
+        call_times.append(time.perf_counter() - built)
+
+    print(
+        f"{label:<8} build p50={percentile(build_times, 50) * 1000:7.3f}ms "
+        f"p99={percentile(build_times, 99) * 1000:7.3f}ms"
+        + (
+            f"   call p50={percentile(call_times, 50) * 1000:7.3f}ms "
+            f"p99={percentile(call_times, 99) * 1000:7.3f}ms"
+            if call else ""
+        )
+    )
+
+
+async def run(requests: int, call: bool):
+    from discovery_archaeology_agent import openai_client
+
+    with LiveServer(_completions_app()) as server:
+        base_url = f"{server.url}/v1"
+
+        point_client_at(base_url)
+        client = openai_client.get_client()
+
+        # Warm imports and pools so neither side pays one-off costs
+        await _measure("warmup", lambda: _fresh_messages(base_url), 3, call)
+        await _measure("warmup", lambda: _shared_messages(client), 3, call)
+
+        await _measure("fresh", lambda: _fresh_messages(base_url), requests, call)
+        await _measure("shared", lambda: _shared_messages(client), requests, call)
+        await openai_client.close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--no-call", action="store_true", help="only measure client and prompt construction")
+    args = parser.parse_args()
+
+    configure_environment()
+    asyncio.run(run(args.requests, not args.no_call))
+
+
+if __name__ == "__main__":
+    main()
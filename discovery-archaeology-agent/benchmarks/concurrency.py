@@ -0,0 +1,76 @@
+"""Latency of cheap GETs while slow analyses are in flight.
+
+Starts N analyses against a stub LLM with an injected delay and, while they
+run, hammers ``/health`` and ``/inventions``. With a non-blocking analysis
+path the p99 of the cheap endpoints stays close to the idle baseline.
+
+    python -m benchmarks.concurrency --analyses 20 --delay 2
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._stub import configure_environment, install_stub_llm, percentile
+
+
+async def _probe(client, path: str, duration: float) -> list:
+    """Issue sequential GETs for ``duration`` seconds and record latencies."""
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(label: str, samples: list):
+    print(
+        f"{label:<28} n={len(samples):<5} "
+        f"p50={percentile(samples, 50) * 1000:7.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:7.2f}ms"
+    )
+
+
+async def run(analyses: int, delay: float):
+    import httpx
+    from discovery_archaeology_agent.api import app
+    from discovery_archaeology_agent.database import init_db
+
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for path in ("/health", "/inventions"):
+            _report(f"idle {path}", await _probe(client, path, 1.0))
+
+        in_flight = [
+            asyncio.create_task(client.post(
+                "/inventions/analyze", json={"invention_name": f"Invention {i}"}
+            ))
+            for i in range(analyses)
+        ]
+        await asyncio.sleep(0.05)
+        for path in ("/health", "/inventions"):
+            _report(f"loaded {path}", await _probe(client, path, delay / 2))
+
+        responses = await asyncio.gather(*in_flight)
+        failed = [r for r in responses if r.status_code != 200]
+        print(f"analyses completed: {len(responses) - len(failed)}/{len(responses)}")
+        for response in failed[:3]:
+            print(f"  {response.status_code}: {response.text[:200]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analyses", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=2.0, help="stub LLM latency in seconds")
+    args = parser.parse_args()
+
+    configure_environment()
+    install_stub_llm(args.delay)
+    asyncio.run(run(args.analyses, args.delay))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Linking quality and insert-time cost of discovery entity resolution.
+
+Draws ``--discoveries`` true discoveries (a title of one to three words, a
+year and one or two discoverers), then stores ``--inventions`` synthetic
+analyses through ``DiscoveryEngine._add_analysis``, each mentioning
+``--per-invention`` of them with Zipf popularity, so well-known
+prerequisites recur under many inventions. Every mention is reworded the
+way analyses differ: "Invention of the X", "X discovered", a year off by
+one, initials instead of first names, a discoverer left out. Reports the
+time ``link_discoveries`` takes per analysis as the corpus grows (and what
+comparing with every entity would take instead), then the purity of the
+entities (mentions whose entity is mostly their own discovery), their
+completeness (mentions in the largest entity of their discovery) and the
+entity to discovery row ratio.
+
+    python -m benchmarks.discovery_entities --inventions 5000 --discoveries 20000
+"""
+import argparse
+import random
+import time
+from collections import Counter, defaultdict
+
+from benchmarks._stub import canned_analysis, configure_environment, percentile
+
+TEMPLATES = ["{}", "Invention of the {}", "Discovery of {}", "The {}", "{} discovered", "First {}"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices("abcdefghiklmnoprstuvy", k=rng.randint(4, 9)))
+
+
+def _truth(discoveries: int, rng: random.Random) -> list:
+    """Title, year and (first name, surname) discoverers of each true discovery."""
+    vocabulary = [_word(rng) for _ in range(20000)]
+    cumulative, total = [], 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1 / rank
+        cumulative.append(total)
+    surnames = [_word(rng).capitalize() for _ in range(8000)]
+    first_names = [_word(rng).capitalize() for _ in range(300)]
+    return [
+        (
+            " ".join(rng.choices(vocabulary, cum_weights=cumulative, k=rng.randint(1, 3))),
+            1600 + rng.randrange(420),
+            [(rng.choice(first_names), rng.choice(surnames)) for _ in range(rng.randint(1, 2))]
+        )
+        for _ in range(discoveries)
+    ]
+
+
+def _mention(truth: tuple, rng: random.Random) -> dict:
+    """One analysis's account of a true discovery."""
+    title, year, people = truth
+    if rng.random() < 0.15:
+        year += rng.choice([-1, 1])
+    discoverers = []
+    for first, last in people:
+        roll = rng.random()
+        if roll < 0.2:
+            continue
+        discoverers.append(f"{first[0]}. {last}" if roll < 0.5 else f"{first} {last}")
+    return {"title": rng.choice(TEMPLATES).format(title).capitalize(), "year": year, "discoverers": discoverers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inventions", type=int, default=5000)
+    parser.add_argument("--discoveries", type=int, default=20000, help="true discoveries")
+    parser.add_argument("--per-invention", type=int, default=8, help="discoveries mentioned per analysis")
+    parser.add_argument("--checkpoints", type=int, default=5)
+    args = parser.parse_args()
+
+    configure_environment()
+    from discovery_archaeology_agent import discovery_engine
+    from discovery_archaeology_agent.database import SessionLocal, init_db
+    from discovery_archaeology_agent.entities import canonical_title
+    from discovery_archaeology_agent.models import DiscoveryEntityModel, DiscoveryModel
+    from discovery_archaeology_agent.naming import similarity, trigrams
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+
+    link_discoveries = discovery_engine.link_discoveries
+    latencies = []
+
+    def timed_link(db, discoveries):
+        begin = time.perf_counter()
+        link_discoveries(db, discoveries)
+        latencies.append(time.perf_counter() - begin)
+
+    discovery_engine.link_discoveries = timed_link
+
+    init_db()
+    rng = random.Random(0)
+    truth = _truth(args.discoveries, rng)
+    popularity, total = [], 0.0
+    for rank in range(1, len(truth) + 1):
+        total += 1 / rank
+        popularity.append(total)
+    mentions = {}  # discovery id -> true discovery
+    every = max(args.inventions // args.checkpoints, 1)
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        engine = discovery_engine.DiscoveryEngine(db)
+        for i in range(args.inventions):
+            chosen = set()
+            while len(chosen) < args.per_invention:
+                chosen.add(rng.choices(range(len(truth)), cum_weights=popularity)[0])
+            chosen = sorted(chosen)
+            payload = canned_analysis(f"Invention {i}", discoveries=len(chosen))
+            for discovery, index in zip(payload["discoveries"], chosen):
+                discovery.update(_mention(truth[index], rng))
+            invention = engine._add_analysis(InventionAnalysis(**payload))
+            mentions.update((discovery.id, index) for discovery, index in zip(invention.discoveries, chosen))
+            if i % 200 == 199:
+                db.commit()
+            if i % every == every - 1:
+                window = latencies[-every:]
+                # What resolution without blocking keys would cost: every
+                # entity read and compared with the analysis's discoveries
+                begin = time.perf_counter()
+                stored = db.query(DiscoveryEntityModel.canonical_title).all()
+                for discovery in payload["discoveries"]:
+                    grams = trigrams(canonical_title(discovery["title"]))
+                    max(similarity(grams, trigrams(row.canonical_title)) for row in stored)
+                scan = time.perf_counter() - begin
+                print(f"after {i + 1:6d} inventions ({len(stored):6d} entities): link per analysis "
+                      f"p50={percentile(window, 50) * 1000:.2f}ms p99={percentile(window, 99) * 1000:.2f}ms, "
+                      f"full scan {scan * 1000:.0f}ms")
+        db.commit()
+        print(f"stored {args.inventions} inventions in {time.perf_counter() - start:.1f}s")
+
+        links = dict(db.query(DiscoveryModel.id, DiscoveryModel.entity_id))
+        entities = db.query(DiscoveryEntityModel).count()
+
+    by_entity = defaultdict(Counter)
+    by_truth = defaultdict(Counter)
+    for discovery_id, index in mentions.items():
+        by_entity[links[discovery_id]][index] += 1
+        by_truth[index][links[discovery_id]] += 1
+    total = len(mentions)
+    purity = sum(counts.most_common(1)[0][1] for counts in by_entity.values()) / total
+    completeness = sum(counts.most_common(1)[0][1] for counts in by_truth.values()) / total
+    print(f"{total} discovery rows of {len(by_truth)} true discoveries -> {entities} entities "
+          f"({entities / len(by_truth):.2f} per true discovery, {entities / total:.1%} of rows)")
+    print(f"purity={purity:.2%} completeness={completeness:.2%}")
+
+
+if __name__ == "__main__":
+    main()
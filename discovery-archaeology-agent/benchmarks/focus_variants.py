@@ -0,0 +1,116 @@
+"""Tokens per focused analysis: full re-analysis vs. a delta on the base analysis.
+
+Stores base analyses of ``--inventions`` inventions, then requests each
+with ``--focus-sets`` different focus sets in two ways: the old workaround
+(a full analysis prompt with the focus areas, i.e. deleting the row and
+re-running) and ``DiscoveryEngine`` with focus areas, which sends the
+stored discovery chain and asks only for what the focus adds. Reports LLM
+calls and estimated prompt/completion tokens per focused request, then
+repeats the focused requests, which must be answered from stored variants
+without any call.
+
+    python -m benchmarks.focus_variants --inventions 20 --focus-sets 3 --discoveries 10
+"""
+import argparse
+import json
+import sys
+from types import SimpleNamespace
+
+from benchmarks._stub import (
+    StubChatModel, canned_analysis, canned_response, configure_environment, install_stub_llm
+)
+
+FOCUS_SETS = [
+    ["accidents"],
+    ["failed experiments", "materials"],
+    ["people", "funding"],
+    ["cross-domain borrowing"],
+    ["manufacturing", "economics", "patents"],
+]
+
+
+class CountingChatModel(StubChatModel):
+    """Stub model that tallies estimated prompt and completion tokens."""
+
+    discoveries = 5
+    tokens_in = 0
+    tokens_out = 0
+
+    @classmethod
+    def reset_tokens(cls):
+        cls.calls = cls.tokens_in = cls.tokens_out = 0
+
+    def _respond(self, messages) -> SimpleNamespace:
+        from discovery_archaeology_agent.openai_client import estimate_tokens
+
+        prompt = messages[-1].content
+        if "Analyze the invention:" in prompt:
+            name = prompt.split("Analyze the invention:", 1)[1].splitlines()[0].strip()
+            content = json.dumps(canned_analysis(name, discoveries=self.discoveries))
+        else:
+            content = canned_response(prompt)
+        cls = type(self)
+        cls.tokens_in += sum(estimate_tokens(message.content) for message in messages)
+        cls.tokens_out += estimate_tokens(content)
+        return SimpleNamespace(content=content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inventions", type=int, default=20)
+    parser.add_argument("--focus-sets", type=int, default=3, choices=range(1, len(FOCUS_SETS) + 1))
+    parser.add_argument("--discoveries", type=int, default=10, help="discoveries per canned base analysis")
+    args = parser.parse_args()
+
+    configure_environment()
+    install_stub_llm()
+    from discovery_archaeology_agent import openai_client
+
+    CountingChatModel.discoveries = args.discoveries
+    openai_client.ChatOpenAI = CountingChatModel
+    openai_client._client = None
+
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.database import SessionLocal, init_db
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.schemas import InventionRequest
+
+    settings.llm_cache_enabled = False
+    init_db()
+    names = [f"Invention {i}" for i in range(args.inventions)]
+    focus_sets = FOCUS_SETS[:args.focus_sets]
+    requests = [(name, focus) for name in names for focus in focus_sets]
+
+    with SessionLocal() as db:
+        engine = DiscoveryEngine(db)
+        for name in names:
+            engine.analyze_invention(InventionRequest(invention_name=name))
+
+        CountingChatModel.reset_tokens()
+        for name, focus in requests:
+            engine.client.analyze_invention(name, focus_areas=focus)
+        full = (CountingChatModel.calls, CountingChatModel.tokens_in, CountingChatModel.tokens_out)
+
+        CountingChatModel.reset_tokens()
+        for name, focus in requests:
+            engine.analyze_invention(InventionRequest(invention_name=name, focus_areas=focus))
+        delta = (CountingChatModel.calls, CountingChatModel.tokens_in, CountingChatModel.tokens_out)
+
+        CountingChatModel.reset_tokens()
+        for name, focus in requests:
+            engine.analyze_invention(InventionRequest(invention_name=name, focus_areas=list(reversed(focus))))
+        repeat_calls = CountingChatModel.calls
+
+    print(f"{len(requests)} focused requests ({args.inventions} inventions x {len(focus_sets)} focus sets, "
+          f"{args.discoveries} base discoveries)")
+    for label, (calls, tokens_in, tokens_out) in [("full re-analysis", full), ("base + delta", delta)]:
+        print(f"{label:<17} calls={calls:4d} tokens/request: in={tokens_in / len(requests):7.0f} "
+              f"out={tokens_out / len(requests):6.0f} total={(tokens_in + tokens_out) / len(requests):7.0f}")
+    saved = 1 - (delta[1] + delta[2]) / (full[1] + full[2])
+    print(f"tokens saved per focused request: {saved:.1%}")
+    print(f"repeated focused requests: {repeat_calls} LLM calls")
+    sys.exit(0 if repeat_calls == 0 and delta[0] == len(requests) else 1)
+
+
+if __name__ == "__main__":
+    main()
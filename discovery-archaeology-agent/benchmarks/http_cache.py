@@ -0,0 +1,102 @@
+"""Requests per second for repeated GET /inventions/{id} fetches.
+
+Stores inventions with long discovery chains and narratives, then fetches
+them over and over in four ways:
+
+* ``uncached``: the handler as it was, returning the ``InventionResponse``
+  for FastAPI to validate and encode (mounted on a benchmark-only route).
+* ``cold``: the real endpoint with the body cache disabled, so only the
+  faster encoder helps.
+* ``warm``: the real endpoint serving cached bytes.
+* ``304``: the real endpoint with a matching ``If-None-Match``.
+
+    python -m benchmarks.http_cache --requests 2000 --discoveries 40
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._stub import canned_analysis, configure_environment, install_stub_llm, percentile
+
+
+async def _fetch(client, paths: list, requests: int, concurrency: int, etags: dict = None):
+    latencies = []
+    queue = list(range(requests))
+
+    async def worker():
+        while queue:
+            path = paths[queue.pop() % len(paths)]
+            headers = {"If-None-Match": etags[path]} if etags else None
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == (304 if etags else 200), response.status_code
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start), latencies
+
+
+async def run(args):
+    import httpx
+    from fastapi import Depends
+
+    from discovery_archaeology_agent.api import app
+    from discovery_archaeology_agent.database import SessionLocal, get_db, init_db
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.http_cache import invention_bodies
+    from discovery_archaeology_agent.schemas import InventionAnalysis, InventionResponse
+
+    @app.get("/bench/uncached/{invention_id}", response_model=InventionResponse)
+    def uncached(invention_id: int, db=Depends(get_db)):
+        return DiscoveryEngine(db).get_invention(invention_id)
+
+    init_db()
+    ids = []
+    with SessionLocal() as db:
+        for i in range(args.inventions):
+            payload = canned_analysis(f"Cached {i}", discoveries=args.discoveries)
+            payload["narrative"] = "A long and winding story. " * args.narrative_sentences
+            ids.append(DiscoveryEngine(db)._store_analysis(InventionAnalysis(**payload)).id)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        paths = [f"/inventions/{invention_id}" for invention_id in ids]
+        size = len((await client.get(paths[0])).content)
+        print(f"{args.inventions} inventions, {args.discoveries} discoveries each, {size / 1024:.0f} KiB per body")
+
+        modes = [
+            ("uncached", [f"/bench/uncached/{invention_id}" for invention_id in ids], 0),
+            ("cold", paths, 0),
+            ("warm", paths, args.inventions),
+        ]
+        for label, mode_paths, cache_size in modes:
+            invention_bodies.max_entries = cache_size
+            invention_bodies.clear()
+            await _fetch(client, mode_paths, len(mode_paths), args.concurrency)  # warm up
+            rps, latencies = await _fetch(client, mode_paths, args.requests, args.concurrency)
+            print(f"{label:<9} rps={rps:8.1f} p50={percentile(latencies, 50) * 1000:6.2f}ms "
+                  f"p99={percentile(latencies, 99) * 1000:6.2f}ms")
+
+        etags = {path: (await client.get(path)).headers["etag"] for path in paths}
+        rps, latencies = await _fetch(client, paths, args.requests, args.concurrency, etags)
+        print(f"{'304':<9} rps={rps:8.1f} p50={percentile(latencies, 50) * 1000:6.2f}ms "
+              f"p99={percentile(latencies, 99) * 1000:6.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--inventions", type=int, default=20)
+    parser.add_argument("--discoveries", type=int, default=40)
+    parser.add_argument("--narrative-sentences", type=int, default=200)
+    args = parser.parse_args()
+
+    configure_environment()
+    install_stub_llm()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
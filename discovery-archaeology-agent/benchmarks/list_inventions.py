@@ -0,0 +1,89 @@
+"""Memory and latency of GET /inventions pages as the table grows.
+
+Bulk-inserts inventions with large narrative columns, then measures the
+Python heap peak (tracemalloc) and wall time of fetching the first page
+and a deep page. With keyset pagination and column projection both stay
+flat however many rows the table holds.
+
+    python -m benchmarks.list_inventions --sizes 1000 10000 50000
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks._stub import configure_environment, install_stub_llm
+
+NARRATIVE = "A meandering story of accidents and failures. " * 400  # ~18 KB
+
+
+def _grow_to(db, target: int, current: int):
+    """Insert rows until the table holds ``target`` inventions."""
+    from discovery_archaeology_agent.models import InventionModel
+
+    start = datetime(2020, 1, 1)
+    batch = []
+    for i in range(current, target):
+        batch.append({
+            "name": f"Invention {i}",
+            "year": 1800 + i % 220,
+            "summary": f"Summary {i}",
+            "narrative": NARRATIVE,
+            "key_lesson": "Follow the surprises.",
+            "serendipity_moments": ["accident"] * 20,
+            "pattern_explanations": {"accident_to_innovation": NARRATIVE[:2000]},
+            "created_at": start + timedelta(seconds=i),
+            "updated_at": start + timedelta(seconds=i),
+        })
+        if len(batch) == 1000:
+            db.bulk_insert_mappings(InventionModel, batch)
+            batch = []
+    if batch:
+        db.bulk_insert_mappings(InventionModel, batch)
+    db.commit()
+
+
+def _measure(call):
+    tracemalloc.start()
+    start = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    configure_environment()
+    install_stub_llm()
+    from discovery_archaeology_agent.database import SessionLocal, init_db
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine, _encode_cursor
+
+    init_db()
+    current = 0
+    print(f"{'rows':>8} {'first page':>22} {'deep page':>22}")
+    for size in args.sizes:
+        with SessionLocal() as db:
+            _grow_to(db, size, current)
+        current = size
+
+        # A cursor pointing just before the last page
+        deep_cursor = _encode_cursor(datetime(2020, 1, 1) + timedelta(seconds=size - args.limit - 1), size - args.limit)
+        results = []
+        for cursor in (None, deep_cursor):
+            with SessionLocal() as db:
+                engine = DiscoveryEngine(db)
+                results.append(_measure(lambda: engine.list_inventions(limit=args.limit, cursor=cursor)))
+
+        print(f"{size:>8} " + " ".join(
+            f"{elapsed * 1000:8.2f}ms {peak / 1024:8.0f}KiB" for elapsed, peak in results
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Offline load test of every API endpoint against a local OpenAI stub.
+
+Starts ``benchmarks.stub_openai`` (configurable latency and token streaming)
+on a local port, points ``OPENAI_BASE_URL`` at it, serves the app under
+uvicorn and drives a weighted mix of requests from concurrent clients:
+new analyses (blocking and streamed), list, get, patterns, themes and
+timeline. Throughput and p50/p95/p99 per endpoint are written to a JSON
+file; ``--compare`` prints the change against an earlier run, so results
+can be tracked across commits. Nothing leaves the machine.
+
+    python -m benchmarks.load_test --duration 30 --concurrency 32 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from benchmarks._stub import LiveServer, configure_environment, percentile
+
+# Relative share of requests per endpoint
+WORKLOAD = {
+    "analyze": 1,
+    "analyze_stream": 1,
+    "list": 4,
+    "get": 8,
+    "patterns": 2,
+    "themes": 2,
+    "timeline": 2
+}
+
+
+class Workload:
+    """Issues the requests for each endpoint and records their latencies."""
+
+    def __init__(self, client, ids: list, rng: random.Random):
+        self.client = client
+        self.ids = ids
+        self.rng = rng
+        self.latencies = {name: [] for name in WORKLOAD}
+        self.errors = {name: 0 for name in WORKLOAD}
+        self._names = 0
+
+    def _new_name(self) -> str:
+        self._names += 1
+        return f"Load Invention {self._names}"
+
+    async def analyze(self):
+        return await self.client.post("/inventions/analyze", json={"invention_name": self._new_name()})
+
+    async def analyze_stream(self):
+        async with self.client.stream(
+            "POST", "/inventions/analyze/stream", json={"invention_name": self._new_name()}
+        ) as response:
+            await response.aread()
+        return response
+
+    async def list(self):
+        return await self.client.get("/inventions", params={"limit": 20})
+
+    async def get(self):
+        return await self.client.get(f"/inventions/{self.rng.choice(self.ids)}")
+
+    async def patterns(self):
+        return await self.client.get("/patterns")
+
+    async def themes(self):
+        return await self.client.get("/patterns/themes")
+
+    async def timeline(self):
+        return await self.client.get("/patterns/timeline")
+
+    async def worker(self, deadline: float):
+        names, weights = list(WORKLOAD), list(WORKLOAD.values())
+        while time.perf_counter() < deadline:
+            name = self.rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await getattr(self, name)()
+                failed = response.status_code != 200
+            except Exception:
+                failed = True
+            self.latencies[name].append(time.perf_counter() - start)
+            self.errors[name] += failed
+
+
+def _summary(latencies: list, errors: int, duration: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from benchmarks.stub_openai import StubOpenAI
+
+    stub = StubOpenAI(latency=args.latency, token_delay=args.token_delay)
+    with LiveServer(stub.app()) as llm_server:
+        # Settings are read on first use, so configure first
+        os.environ["OPENAI_BASE_URL"] = f"{llm_server.url}/v1"
+        from discovery_archaeology_agent.api import app
+        from discovery_archaeology_agent.database import init_db
+
+        init_db()
+        with LiveServer(app) as api_server:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=api_server.url, limits=limits, timeout=None) as client:
+                ids = []
+                for i in range(args.seed):
+                    response = await client.post("/inventions/analyze", json={"invention_name": f"Seed {i}"})
+                    response.raise_for_status()
+                    ids.append(response.json()["id"])
+                (await client.post("/patterns/analyze")).raise_for_status()
+
+                workload = Workload(client, ids, random.Random(args.random_seed))
+                start = time.perf_counter()
+                deadline = start + args.duration
+                await asyncio.gather(*(workload.worker(deadline) for _ in range(args.concurrency)))
+                elapsed = time.perf_counter() - start
+
+    every = [latency for latencies in workload.latencies.values() for latency in latencies]
+    return {
+        "commit": _commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "latency": args.latency,
+            "token_delay": args.token_delay,
+            "random_seed": args.random_seed,
+            "workload": WORKLOAD
+        },
+        "llm_requests": stub.requests,
+        "endpoints": {
+            name: _summary(latencies, workload.errors[name], elapsed)
+            for name, latencies in workload.latencies.items()
+        },
+        "total": _summary(every, sum(workload.errors.values()), elapsed)
+    }
+
+
+def _change(new: float, old: float) -> str:
+    return f"{(new / old - 1) * 100:+6.1f}%" if old else "    n/a"
+
+
+def report(result: dict, baseline: dict = None):
+    rows = {**result["endpoints"], "total": result["total"]}
+    for name, stats in rows.items():
+        line = (
+            f"{name:<15} n={stats['requests']:6d} err={stats['errors']:4d} rps={stats['rps']:8.1f} "
+            f"p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms p99={stats['p99_ms']:8.2f}ms"
+        )
+        if baseline:
+            old = baseline["total"] if name == "total" else baseline["endpoints"].get(name)
+            if old:
+                line += (
+                    f" | vs {baseline['commit']}: rps {_change(stats['rps'], old['rps'])} "
+                    f"p50 {_change(stats['p50_ms'], old['p50_ms'])} p99 {_change(stats['p99_ms'], old['p99_ms'])}"
+                )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=30, help="inventions stored before the run")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds before a response or first token")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="stub seconds between streamed chunks")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--output", default="load_test.json")
+    parser.add_argument("--compare", help="an earlier --output file to compare against")
+    args = parser.parse_args()
+
+    configure_environment()
+    result = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(result, baseline)
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
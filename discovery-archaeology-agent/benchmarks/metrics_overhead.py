@@ -0,0 +1,113 @@
+"""Request throughput with metrics disabled, enabled, and with Server-Timing.
+
+Each mode runs in its own process because the middleware and the query
+listener are installed at import. The workload is the hot path the
+instrumentation sits on: concurrent ``GET /inventions/{id}`` reads plus
+cached ``POST /inventions/analyze`` calls (answered from the response cache,
+so no LLM latency hides the overhead).
+
+    python -m benchmarks.metrics_overhead --requests 2000 --concurrency 16 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks._stub import configure_environment, install_stub_llm, percentile
+
+MODES = {
+    "off": {"METRICS_ENABLED": "false", "SERVER_TIMING_ENABLED": "false"},
+    "metrics": {"METRICS_ENABLED": "true", "SERVER_TIMING_ENABLED": "false"},
+    "server-timing": {"METRICS_ENABLED": "true", "SERVER_TIMING_ENABLED": "true"}
+}
+
+
+async def run_mode(requests: int, concurrency: int, seed: int) -> dict:
+    import httpx
+    from discovery_archaeology_agent.api import app
+    from discovery_archaeology_agent.database import init_db
+
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        ids = []
+        for i in range(seed):
+            response = await client.post("/inventions/analyze", json={"invention_name": f"Seed {i}"})
+            ids.append(response.json()["id"])
+
+        latencies = []
+        errors = 0
+        queue = list(range(requests))
+
+        async def worker():
+            nonlocal errors
+            while queue:
+                n = queue.pop()
+                start = time.perf_counter()
+                if n % 4:
+                    response = await client.get(f"/inventions/{ids[n % len(ids)]}")
+                else:
+                    response = await client.post(
+                        "/inventions/analyze", json={"invention_name": f"Seed {n % len(ids)}"}
+                    )
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=20, help="inventions stored before the run")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        configure_environment()
+        install_stub_llm()
+        result = asyncio.run(run_mode(args.requests, args.concurrency, args.seed))
+        print(json.dumps(result))
+        return
+
+    # Alternate the modes over several rounds and report medians, so drift
+    # in machine load doesn't land on one mode
+    results = {mode: [] for mode in MODES}
+    for _ in range(args.rounds):
+        for mode, overrides in MODES.items():
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.metrics_overhead", "--mode", mode,
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                 "--seed", str(args.seed)],
+                env={**os.environ, **overrides}, capture_output=True, text=True, check=True
+            ).stdout
+            results[mode].append(json.loads(output.strip().splitlines()[-1]))
+
+    baseline = statistics.median(r["rps"] for r in results["off"])
+    for mode, runs in results.items():
+        rps = statistics.median(r["rps"] for r in runs)
+        print(
+            f"{mode:<14} rps={rps:7.1f} ({(rps / baseline - 1) * 100:+5.1f}%) "
+            f"p50={statistics.median(r['p50_ms'] for r in runs):6.2f}ms "
+            f"p99={statistics.median(r['p99_ms'] for r in runs):7.2f}ms "
+            f"errors={sum(r['errors'] for r in runs)}"
+        )
+
+if __name__ == "__main__":
+    main()
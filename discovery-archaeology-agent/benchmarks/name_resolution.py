@@ -0,0 +1,141 @@
+"""Hit rate and latency of invention name resolution on a sample name list.
+
+Stores a list of well-known inventions among ``--filler`` synthetic ones,
+then looks up variants a user might type (case, spacing, articles,
+full-width characters, accents, typos, plurals) and a list of different
+inventions that must not match. Reports the hit rate of the old exact
+name match, of canonical names alone, and of canonical names plus trigram
+matching, with the false matches and lookup latency of each.
+
+    python -m benchmarks.name_resolution --filler 10000 --threshold 0.75
+"""
+import argparse
+import random
+import time
+
+from benchmarks._stub import configure_environment, percentile
+
+STORED = [
+    "Microwave Oven", "Penicillin", "Velcro", "Post-it Notes", "X-ray", "Teflon",
+    "Vulcanized Rubber", "Safety Glass", "Saccharin", "Pacemaker", "Super Glue",
+    "Play-Doh", "Slinky", "Corn Flakes", "Potato Chips", "Popsicle", "Dynamite",
+    "Radioactivity", "Smallpox Vaccine", "Steam Engine", "Telephone", "Phonograph",
+    "Light Bulb", "Cosmic Microwave Background", "Mauveine", "Quinine", "LSD",
+    "Viagra", "Stainless Steel", "Kevlar", "Nylon", "Polyethylene", "Inkjet Printer",
+    "Vitamin C", "Newton's Cradle", "Café Coffee Filter", "Model T", "Insulin",
+    "Transistor", "Laser", "Radar", "Silly Putty", "Chocolate Chip Cookie",
+    "Champagne", "Fireworks", "Matches", "Smoke Detector", "Pulsar", "Graphene",
+    "Gore-Tex"
+]
+
+# Different inventions, several close to a stored name, that must not match
+DISTINCT = [
+    "Toaster Oven", "Streptomycin", "Zipper", "Sticky Tape", "MRI", "Teflon Pan Coating Machine",
+    "Synthetic Rubber", "Safety Pin", "Aspartame", "Defibrillator", "Hot Glue", "Lego",
+    "Yo-yo", "Rice Krispies", "Tortilla Chips", "Ice Cream Cone", "Gunpowder", "Radium",
+    "Polio Vaccine", "Jet Engine", "Telegraph", "Gramophone", "LED", "Microwave Radar",
+    "Aniline Dye", "Aspirin", "Vitamin D", "Model A", "Laser Printer", "Maser", "Sonar",
+    "Cookie Cutter", "Cotton Candy", "Neutron Star", "Graphite"
+]
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    """Drop or double one inner letter of a long enough word."""
+    if len(word) < 7:
+        return word
+    i = rng.randrange(2, len(word) - 2)
+    return word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + word[i] + word[i:]
+
+
+def variants(name: str, rng: random.Random) -> list:
+    """Ways a user might type a stored name."""
+    full_width = "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" else c for c in name)
+    words = name.split()
+    return [
+        name.lower(),
+        name.upper(),
+        "  " + "   ".join(words) + " ",
+        f"the {name}",
+        f"The {name.lower()}",
+        full_width,
+        name.replace("é", "e"),
+        " ".join(_typo(word, rng) for word in words),
+        name + "s" if not name.endswith("s") else name[:-1],
+    ]
+
+
+def _filler_names(count: int, rng: random.Random) -> list:
+    syllables = ["ka", "lo", "mi", "tor", "ven", "pla", "stro", "gen", "dex", "ril", "na", "qua"]
+    names = set()
+    while len(names) < count:
+        words = ["".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(rng.randint(1, 3))]
+        names.add(" ".join(words).title())
+    return sorted(names - set(STORED))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filler", type=int, default=10000, help="synthetic inventions stored alongside")
+    parser.add_argument("--threshold", type=float, default=0.75)
+    args = parser.parse_args()
+
+    configure_environment()
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.database import SessionLocal, init_db
+    from discovery_archaeology_agent.models import InventionModel
+    from discovery_archaeology_agent.naming import canonicalize, index_name, resolve_invention_id
+
+    init_db()
+    rng = random.Random(0)
+    with SessionLocal() as db:
+        ids = {}
+        for name in STORED + _filler_names(args.filler, rng):
+            invention = InventionModel(name=name, canonical_name=canonicalize(name))
+            db.add(invention)
+            ids[name] = invention
+        db.flush()
+        for invention in ids.values():
+            index_name(db, invention)
+        db.commit()
+        ids = {name: invention.id for name, invention in ids.items()}
+
+        queries = [(variant, ids[name]) for name in STORED for variant in variants(name, rng)]
+        negatives = [(name, None) for name in DISTINCT]
+        print(f"{len(ids)} stored inventions, {len(queries)} variant lookups, {len(negatives)} distinct names")
+
+        def exact(name):
+            row = db.query(InventionModel.id).filter(InventionModel.name == name).first()
+            return row.id if row else None
+
+        def resolve(threshold):
+            def lookup(name):
+                settings.name_match_threshold = threshold
+                return resolve_invention_id(db, name)
+            return lookup
+
+        strategies = [
+            ("exact name", exact),
+            ("canonical", resolve(1.0)),
+            (f"trigram {args.threshold}", resolve(args.threshold)),
+        ]
+        for label, lookup in strategies:
+            lookup("warm up")  # loads the trigram frequencies once
+            hits, wrong, latencies = 0, 0, []
+            for name, expected in queries + negatives:
+                start = time.perf_counter()
+                found = lookup(name)
+                latencies.append(time.perf_counter() - start)
+                if found is not None and found == expected:
+                    hits += 1
+                elif found is not None:
+                    wrong += 1
+                    if label.startswith("trigram"):
+                        print(f"    false match: {name!r}")
+            print(
+                f"{label:<14} hit rate={hits / len(queries):6.1%} false matches={wrong:3d} "
+                f"lookup p50={percentile(latencies, 50) * 1000:.3f}ms p99={percentile(latencies, 99) * 1000:.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Wall-clock time of POST /patterns/analyze with concurrent fan-out.
+
+Seeds inventions that exhibit every pattern type, then re-analyzes all
+patterns against a stub LLM with an injected delay, once per concurrency
+cap. Sequential analysis costs one delay per pattern type; full fan-out
+costs roughly one delay in total.
+
+    python -m benchmarks.pattern_fanout --delay 1 --concurrency 1 2 6
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._stub import canned_analysis, configure_environment, install_stub_llm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=1.0, help="stub LLM latency in seconds")
+    parser.add_argument("--inventions", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 6])
+    args = parser.parse_args()
+
+    configure_environment()
+    stub = install_stub_llm(args.delay)
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.database import SessionLocal, init_db
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.pattern_analyzer import PatternAnalyzer
+    from discovery_archaeology_agent.schemas import InventionAnalysis, PatternType
+
+    init_db()
+    every_pattern = [p.value for p in PatternType]
+    with SessionLocal() as db:
+        engine = DiscoveryEngine(db)
+        for i in range(args.inventions):
+            engine._store_analysis(InventionAnalysis(**canned_analysis(f"Invention {i}", patterns=every_pattern)))
+
+    baseline = None
+    for concurrency in args.concurrency:
+        settings.pattern_concurrency = concurrency
+        stub.calls = 0
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            results = asyncio.run(PatternAnalyzer(db).aanalyze_all_patterns(refresh=True))
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"concurrency={concurrency:<3} patterns={len(results)} llm_calls={stub.calls} "
+            f"wall={elapsed:6.2f}s speedup={baseline / elapsed:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Latency and quality of GET /inventions/{id}/related over a large corpus.
+
+Bulk-inserts ``--inventions`` synthetic analyses drawn from ``--topics``
+topics (each with its own vocabulary, prerequisites and favoured patterns,
+mixed with Zipf-distributed shared words). Builds a reference index at
+``--reference-dimensions``, where hash collisions are rare, then for each
+of ``--dimensions``: builds the related-inventions index, times
+``--lookups`` top-10 lookups through ``DiscoveryEngine.related_inventions``
+and reports build time, p50/p99 latency, matrix memory, how many of the
+reference top 10 it finds, the share of neighbours from the query's own
+topic, and the cost of adding one stored analysis. Fails if the configured
+``RELATED_DIMENSIONS`` misses the latency target.
+
+    python -m benchmarks.related --inventions 50000 --dimensions 64 128 256
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks._stub import canned_analysis, configure_environment, percentile
+
+DISCOVERIES = 5
+TARGET_MS = 10.0
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices("abcdefghiklmnoprstuvy", k=rng.randint(4, 9)))
+
+
+def _corpus(inventions: int, topics: int, rng: random.Random):
+    """Rows for the inventions, discoveries and connections tables, and each invention's topic."""
+    from discovery_archaeology_agent.schemas import DiscoveryType, PatternType
+
+    shared = [_word(rng) for _ in range(5000)]
+    cumulative, total = [], 0.0
+    for rank in range(1, len(shared) + 1):
+        total += 1 / rank
+        cumulative.append(total)
+    topic_words = [[_word(rng) for _ in range(40)] for _ in range(topics)]
+    topic_prerequisites = [[f"{_word(rng)} {_word(rng)}" for _ in range(5)] for _ in range(topics)]
+    patterns = [pattern.value for pattern in PatternType]
+    types = [discovery_type.value for discovery_type in DiscoveryType]
+
+    def text(topic: int, length: int) -> str:
+        words = rng.choices(shared, cum_weights=cumulative, k=length)
+        for i in range(0, length, 6):
+            words[i] = rng.choice(topic_words[topic])
+        return " ".join(words)
+
+    inventions_rows, discovery_rows, connection_rows, labels = [], [], [], {}
+    for invention_id in range(1, inventions + 1):
+        topic = rng.randrange(topics)
+        labels[invention_id] = topic
+        favoured = patterns[topic % len(patterns)]
+        inventions_rows.append({
+            "id": invention_id,
+            "name": f"Invention {invention_id}",
+            "canonical_name": f"invention {invention_id}",
+            "year": 1800 + rng.randrange(220),
+            "summary": text(topic, 20),
+            "narrative": text(topic, 80),
+            "key_lesson": text(topic, 10),
+            "serendipity_moments": [text(topic, 8)],
+            "critical_prerequisites": rng.sample(topic_prerequisites[topic], 2),
+            "objective_blindness_examples": [text(topic, 8)],
+            "pattern_explanations": {pattern: "" for pattern in {favoured, rng.choice(patterns)}},
+        })
+        for i in range(DISCOVERIES):
+            discovery_id = (invention_id - 1) * DISCOVERIES + i + 1
+            discovery_rows.append({
+                "id": discovery_id,
+                "invention_id": invention_id,
+                "year": 1750 + rng.randrange(250),
+                "title": text(topic, 5),
+                "description": text(topic, 20),
+                "discovery_type": rng.choice(types),
+                "original_goal": text(topic, 6),
+                "actual_outcome": text(topic, 6),
+                "significance": text(topic, 10),
+                "discoverers": [f"{_word(rng)} {_word(rng)}"],
+            })
+            if i:
+                connection_rows.append({
+                    "from_discovery_id": discovery_id - 1,
+                    "to_discovery_id": discovery_id,
+                    "relationship_type": rng.choice(["enabled", "inspired", "required"]),
+                    "description": "",
+                })
+    return inventions_rows, discovery_rows, connection_rows, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inventions", type=int, default=50000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--reference-dimensions", type=int, default=2048)
+    parser.add_argument("--lookups", type=int, default=500)
+    args = parser.parse_args()
+
+    configure_environment()
+    from sqlalchemy import insert
+
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.database import SessionLocal, init_db
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.models import ConnectionModel, DiscoveryModel, InventionModel
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+    from discovery_archaeology_agent.similarity import related_index
+
+    init_db()
+    rng = random.Random(0)
+    start = time.perf_counter()
+    inventions, discoveries, connections, labels = _corpus(args.inventions, args.topics, rng)
+    with SessionLocal() as db:
+        db.execute(insert(InventionModel), inventions)
+        db.execute(insert(DiscoveryModel), discoveries)
+        db.execute(insert(ConnectionModel), connections)
+        db.commit()
+    print(f"stored {len(inventions)} inventions, {len(discoveries)} discoveries "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    configured = settings.related_dimensions
+    ok = True
+    queries = rng.sample(range(1, args.inventions + 1), min(args.lookups, args.inventions))
+
+    settings.related_dimensions = args.reference_dimensions
+    related_index.clear()
+    with SessionLocal() as db:
+        engine = DiscoveryEngine(db)
+        reference = {
+            invention_id: {hit.id for hit in engine.related_inventions(invention_id, limit=10)}
+            for invention_id in queries
+        }
+
+    for dimensions in args.dimensions:
+        settings.related_dimensions = dimensions
+        related_index.clear()
+        with SessionLocal() as db:
+            engine = DiscoveryEngine(db)
+            start = time.perf_counter()
+            engine.related_inventions(queries[0])
+            build = time.perf_counter() - start
+
+            latencies, same_topic, found, returned = [], 0, 0, 0
+            for invention_id in queries:
+                begin = time.perf_counter()
+                related = engine.related_inventions(invention_id, limit=10)
+                latencies.append(time.perf_counter() - begin)
+                same_topic += sum(labels[hit.id] == labels[invention_id] for hit in related)
+                found += len(reference[invention_id] & {hit.id for hit in related})
+                returned += len(related)
+
+            adds = []
+            for i in range(20):
+                analysis = InventionAnalysis(**canned_analysis(f"Added {dimensions}-{i}"))
+                begin = time.perf_counter()
+                related_index.add_analysis(args.inventions + 1000 * dimensions + i, analysis)
+                adds.append(time.perf_counter() - begin)
+
+        p50, p99 = percentile(latencies, 50) * 1000, percentile(latencies, 99) * 1000
+        if dimensions == configured:
+            ok = p50 < TARGET_MS
+        matrix = related_index._corpus.matrix[:related_index._corpus.size]
+        print(
+            f"dimensions={dimensions:<5} build={build:5.1f}s matrix={matrix.nbytes / 2 ** 20:6.1f}MiB "
+            f"top-10 p50={p50:6.2f}ms p99={p99:6.2f}ms "
+            f"recall@10={found / max(sum(map(len, reference.values())), 1):6.1%} "
+            f"same-topic={same_topic / max(returned, 1):6.1%} add p50={percentile(adds, 50) * 1000:.2f}ms"
+        )
+
+    print(f"target: top-10 p50 under {TARGET_MS:.0f}ms at RELATED_DIMENSIONS={configured}: {'PASS' if ok else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
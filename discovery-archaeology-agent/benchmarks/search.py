@@ -0,0 +1,109 @@
+"""Search latency at 100k discoveries: the FTS5 index vs. the LIKE fallback.
+
+Stores ``--inventions`` synthetic analyses of ``--discoveries`` discoveries
+each, with text drawn from a Zipf-distributed vocabulary and a few planted
+terms, then builds the search index with ``backfill_search`` (the indexing
+cost). Runs a rare term, a common term, a phrase, a prefix and a two-term
+query ``--repeat`` times through ``search`` with FTS5 and again with the
+LIKE fallback, and reports p50/p99 latency and the hit count of each.
+
+    python -m benchmarks.search --inventions 5000 --discoveries 20 --repeat 20
+"""
+import argparse
+import random
+import time
+
+from benchmarks._stub import canned_analysis, configure_environment, percentile
+
+# Planted in a few discoveries each, so the rare queries have known answers
+PLANTED = ["vacuum tube", "penicillin mould", "vulcanized"]
+
+QUERIES = [
+    ("rare term", "vulcanized"),
+    ("common term", "experiment"),
+    ("phrase", '"vacuum tube"'),
+    ("prefix", "penicil*"),
+    ("two terms", "accident furnace"),
+]
+
+COMMON = [
+    "experiment", "accident", "laboratory", "sample", "heat", "light", "metal", "glass",
+    "furnace", "chemist", "engineer", "patent", "factory", "signal", "current", "crystal"
+]
+
+
+def _vocabulary(size: int, rng: random.Random) -> list:
+    letters = "abcdefghiklmnoprstuvy"
+    words = set(COMMON)
+    while len(words) < size:
+        words.add("".join(rng.choices(letters, k=rng.randint(4, 10))))
+    return COMMON + sorted(words - set(COMMON))
+
+
+def _sentence(vocabulary: list, weights: list, rng: random.Random, length: int) -> str:
+    return " ".join(rng.choices(vocabulary, weights=weights, k=length)).capitalize() + "."
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inventions", type=int, default=5000)
+    parser.add_argument("--discoveries", type=int, default=20, help="discoveries per invention")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20, help="hits per page")
+    args = parser.parse_args()
+
+    configure_environment()
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.database import SessionLocal, init_db
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+    from discovery_archaeology_agent.search import backfill_search, fts_enabled, search
+
+    init_db()
+    rng = random.Random(0)
+    vocabulary = _vocabulary(20000, rng)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+    # Store without indexing, then index everything at once to time it
+    settings.search_fts_enabled = False
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        engine = DiscoveryEngine(db)
+        for i in range(args.inventions):
+            payload = canned_analysis(f"Invention {i}", discoveries=args.discoveries)
+            payload["narrative"] = " ".join(_sentence(vocabulary, weights, rng, 14) for _ in range(6))
+            for discovery in payload["discoveries"]:
+                discovery["description"] = _sentence(vocabulary, weights, rng, 20)
+                if rng.random() < 0.001:
+                    discovery["description"] += f" Then a {rng.choice(PLANTED)} appeared."
+            engine._add_analysis(InventionAnalysis(**payload))
+            if i % 200 == 199:
+                db.commit()
+        db.commit()
+    print(f"stored {args.inventions} inventions, {args.inventions * args.discoveries} discoveries "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    settings.search_fts_enabled = True
+    with SessionLocal() as db:
+        if not fts_enabled(db):
+            print("FTS5 is not available in this SQLite build; only the fallback is measured")
+        start = time.perf_counter()
+        backfill_search(db)
+        elapsed = time.perf_counter() - start
+        print(f"indexing: {elapsed:.1f}s total, {elapsed / args.inventions * 1000:.2f}ms per analysis")
+
+        for fts in (True, False):
+            settings.search_fts_enabled = fts
+            label = "FTS5" if fts_enabled(db) else "LIKE fallback"
+            for name, query in QUERIES:
+                latencies = []
+                for _ in range(args.repeat):
+                    begin = time.perf_counter()
+                    hits, more = search(db, query, limit=args.limit)
+                    latencies.append(time.perf_counter() - begin)
+                print(f"{label:<14} {name:<12} {query!r:<20} hits={len(hits):3d}{'+' if more else ' '} "
+                      f"p50={percentile(latencies, 50) * 1000:8.2f}ms p99={percentile(latencies, 99) * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
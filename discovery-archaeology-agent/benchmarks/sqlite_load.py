@@ -0,0 +1,161 @@
+"""Mixed read/write load against SQLite, default versus production profile.
+
+Writers store new analyses through the async API (the stub LLM answers
+instantly, so the cost is almost all database work) while readers fetch
+single inventions and list pages. Sync writers, threads calling the
+blocking ``DiscoveryEngine.analyze_invention`` as a script would, run
+alongside them so the sync cache and storage paths are measured too. Each
+profile runs in its own process because the engine reads its settings
+when it is created:
+
+* ``default``: rollback journal, ``synchronous=FULL``, no mmap, the stock
+  page cache and no writer queue, as before the production profile.
+* ``wal``: the production pragmas without the single-writer thread, so
+  the thread's own effect is the difference to ``production``.
+* ``production``: the shipped settings (WAL, ``synchronous=NORMAL``, mmap,
+  a larger cache, busy timeout and the single-writer thread).
+
+    python -m benchmarks.sqlite_load --duration 10 --writers 8 --readers 16 --sync-writers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks._stub import configure_environment, install_stub_llm, percentile
+
+PROFILES = {
+    "default": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE_KIB": "2000",
+        "SQLITE_SINGLE_WRITER": "false"
+    },
+    "wal": {"SQLITE_SINGLE_WRITER": "false"},
+    "production": {}
+}
+
+
+async def _writer(client, worker: int, deadline: float, stats: dict):
+    n = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post(
+            "/inventions/analyze", json={"invention_name": f"Load {worker}-{n}"}
+        )
+        stats["write"].append(time.perf_counter() - start)
+        if response.status_code != 200:
+            stats["errors"] += 1
+        n += 1
+
+
+async def _reader(client, ids: list, deadline: float, stats: dict):
+    while time.perf_counter() < deadline:
+        path = random.choice([f"/inventions/{random.choice(ids)}", "/inventions?limit=20"])
+        start = time.perf_counter()
+        response = await client.get(path)
+        stats["read"].append(time.perf_counter() - start)
+        if response.status_code != 200:
+            stats["errors"] += 1
+
+
+def _sync_writer(worker: int, deadline: float, stats: dict):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.schemas import InventionRequest
+
+    n = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            with SessionLocal() as db:
+                DiscoveryEngine(db).analyze_invention(InventionRequest(invention_name=f"Sync {worker}-{n}"))
+        except Exception:
+            stats["errors"] += 1
+        stats["sync_write"].append(time.perf_counter() - start)
+        n += 1
+
+
+async def run_profile(duration: float, writers: int, readers: int, sync_writers: int, seed: int) -> dict:
+    import httpx
+    from discovery_archaeology_agent.api import app
+    from discovery_archaeology_agent.database import init_db
+
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        ids = []
+        for i in range(seed):
+            response = await client.post("/inventions/analyze", json={"invention_name": f"Seed {i}"})
+            ids.append(response.json()["id"])
+
+        stats = {"read": [], "write": [], "sync_write": [], "errors": 0}
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=_sync_writer, args=(w, deadline, stats)) for w in range(sync_writers)
+        ]
+        for thread in threads:
+            thread.start()
+        await asyncio.gather(
+            *(_writer(client, w, deadline, stats) for w in range(writers)),
+            *(_reader(client, ids, deadline, stats) for _ in range(readers))
+        )
+        await asyncio.to_thread(lambda: [thread.join() for thread in threads])
+
+    return {
+        "reads_per_s": len(stats["read"]) / duration,
+        "writes_per_s": len(stats["write"]) / duration,
+        "read_p50_ms": percentile(stats["read"], 50) * 1000,
+        "read_p99_ms": percentile(stats["read"], 99) * 1000,
+        "write_p50_ms": percentile(stats["write"], 50) * 1000,
+        "write_p99_ms": percentile(stats["write"], 99) * 1000,
+        "sync_writes_per_s": len(stats["sync_write"]) / duration,
+        "sync_write_p50_ms": percentile(stats["sync_write"], 50) * 1000,
+        "errors": stats["errors"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--sync-writers", type=int, default=4, help="threads using the blocking API")
+    parser.add_argument("--seed", type=int, default=50, help="inventions stored before the run")
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        configure_environment()
+        install_stub_llm()
+        result = asyncio.run(run_profile(args.duration, args.writers, args.readers, args.sync_writers, args.seed))
+        print(json.dumps(result))
+        return
+
+    for profile, overrides in PROFILES.items():
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.sqlite_load", "--profile", profile,
+             "--duration", str(args.duration), "--writers", str(args.writers),
+             "--readers", str(args.readers), "--sync-writers", str(args.sync_writers),
+             "--seed", str(args.seed)],
+            env={**os.environ, **overrides}, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{profile:<11} reads/s={result['reads_per_s']:7.1f} "
+            f"p50={result['read_p50_ms']:7.2f}ms p99={result['read_p99_ms']:8.2f}ms | "
+            f"writes/s={result['writes_per_s']:6.1f} "
+            f"p50={result['write_p50_ms']:7.2f}ms p99={result['write_p99_ms']:8.2f}ms | "
+            f"sync writes/s={result['sync_writes_per_s']:6.1f} p50={result['sync_write_p50_ms']:7.2f}ms | "
+            f"errors={result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
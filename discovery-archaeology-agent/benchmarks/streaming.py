@@ -0,0 +1,69 @@
+"""Time to first discovery: streaming vs. blocking analysis.
+
+Analyzes an invention through ``POST /inventions/analyze`` and through the
+server-sent-event endpoint against a stub LLM that streams its canned
+response over ``--delay`` seconds, and checks that both store the same
+analysis.
+
+    python -m benchmarks.streaming --delay 5
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks._stub import LiveServer, configure_environment, install_stub_llm
+
+
+async def run(delay: float) -> int:
+    import httpx
+    from discovery_archaeology_agent.api import app
+
+    with LiveServer(app) as server:
+        return await _compare(httpx, server.url)
+
+
+async def _compare(httpx, base_url: str) -> int:
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        start = time.perf_counter()
+        blocking = (await client.post("/inventions/analyze", json={"invention_name": "Telephone"})).json()
+        print(f"blocking:  first discovery {time.perf_counter() - start:6.2f}s (whole response)")
+
+        start = time.perf_counter()
+        first_discovery = None
+        counts = {}
+        result = None
+        async with client.stream("POST", "/inventions/analyze/stream", json={"invention_name": "Telegraph"}) as stream:
+            event = None
+            async for line in stream.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                    counts[event] = counts.get(event, 0) + 1
+                    if event == "discovery" and first_discovery is None:
+                        first_discovery = time.perf_counter() - start
+                elif line.startswith("data: ") and event == "result":
+                    result = json.loads(line[len("data: "):])
+        total = time.perf_counter() - start
+        print(f"streaming: first discovery {first_discovery:6.2f}s, result {total:6.2f}s, events {counts}")
+
+        stored = (await client.get(f"/inventions/{result['id']}")).json()
+
+    # Same shape as the blocking path and identical to what was stored
+    same = stored == result and set(blocking["analysis"]) == set(result["analysis"])
+    print(f"streamed result matches stored analysis: {same}")
+    return 0 if same else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=5.0, help="stub LLM generation time in seconds")
+    args = parser.parse_args()
+
+    configure_environment()
+    install_stub_llm(args.delay)
+    sys.exit(asyncio.run(run(args.delay)))
+
+
+if __name__ == "__main__":
+    main()
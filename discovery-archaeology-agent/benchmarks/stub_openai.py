@@ -0,0 +1,169 @@
+"""Local OpenAI-compatible chat completions server for offline runs.
+
+Answers ``POST /v1/chat/completions`` with the same canned JSON as
+``StubChatModel`` after an optional latency. ``"stream": true`` requests get
+the completion as server-sent ``chat.completion.chunk`` events of
+``chunk_chars`` characters, ``token_delay`` seconds apart, after the same
+latency. It rate limits like the real API when asked to: the first
+``fail_first`` requests, requests beyond ``max_concurrency`` in flight, and
+every request while ``always_429`` is set get a 429 with Retry-After
+headers. ``tests/test_rate_limit.py`` runs the client against it.
+
+    python -m benchmarks.stub_openai --port 8100 --latency 0.5 --token-delay 0.01 --max-concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import math
+import threading
+
+from benchmarks._stub import canned_response
+
+
+class StubOpenAI:
+    """Configurable stand-in for the chat completions endpoint."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        token_delay: float = 0.0,
+        chunk_chars: int = 16,
+        max_concurrency: int = 0,
+        fail_first: int = 0,
+        always_429: bool = False,
+        retry_after: float = 0.1
+    ):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.chunk_chars = chunk_chars
+        self.max_concurrency = max_concurrency
+        self.fail_first = fail_first
+        self.always_429 = always_429
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _usage(body: dict, content: str) -> dict:
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+    async def _chunks(self, body: dict, content: str):
+        """The completion as OpenAI streaming events, ending with ``[DONE]``."""
+        def event(choices: list, **extra) -> str:
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body.get("model", "stub"),
+                "choices": choices,
+                **extra
+            }
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        def delta(fields: dict, finish_reason=None) -> list:
+            return [{"index": 0, "delta": fields, "finish_reason": finish_reason}]
+
+        try:
+            yield event(delta({"role": "assistant", "content": ""}))
+            for i in range(0, len(content), self.chunk_chars):
+                await asyncio.sleep(self.token_delay)
+                yield event(delta({"content": content[i:i + self.chunk_chars]}))
+            yield event(delta({}, "stop"))
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield event([], usage=self._usage(body, content))
+            yield "data: [DONE]\n\n"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def app(self):
+        from fastapi import FastAPI
+        from fastapi.responses import JSONResponse, StreamingResponse
+
+        app = FastAPI()
+
+        @app.post("/v1/chat/completions")
+        async def completions(body: dict):
+            with self._lock:
+                self.requests += 1
+                over = bool(self.max_concurrency) and self.in_flight >= self.max_concurrency
+                if self.always_429 or self.requests <= self.fail_first or over:
+                    self.rate_limited += 1
+                    return JSONResponse(
+                        status_code=429,
+                        headers={
+                            "retry-after-ms": str(int(self.retry_after * 1000)),
+                            "retry-after": str(math.ceil(self.retry_after))
+                        },
+                        content={"error": {
+                            "message": "Rate limit reached for requests",
+                            "type": "requests",
+                            "code": "rate_limit_exceeded"
+                        }}
+                    )
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+            try:
+                await asyncio.sleep(self.latency)
+                content = canned_response(body["messages"][-1]["content"])
+            except BaseException:
+                with self._lock:
+                    self.in_flight -= 1
+                raise
+
+            if body.get("stream"):
+                # Still in flight until the last chunk is sent
+                return StreamingResponse(self._chunks(body, content), media_type="text/event-stream")
+
+            with self._lock:
+                self.in_flight -= 1
+
+            return {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": self._usage(body, content)
+            }
+
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before the response or first chunk")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="429 beyond this many in flight, 0 for no limit")
+    parser.add_argument("--fail-first", type=int, default=0, help="429 the first N requests")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    stub = StubOpenAI(
+        latency=args.latency,
+        token_delay=args.token_delay,
+        max_concurrency=args.max_concurrency,
+        fail_first=args.fail_first
+    )
+    uvicorn.run(stub.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
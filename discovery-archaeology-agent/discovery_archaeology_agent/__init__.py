@@ -1,7 +1,24 @@
 """Discovery Archaeology Agent - Reverse engineer the true origins of inventions."""
-from .api import app
-from .discovery_engine import DiscoveryEngine
-from .schemas import InventionRequest, InventionResponse, PatternAnalysis
+import importlib
+from typing import Any
 
 __version__ = "0.1.0"
-__all__ = ["app", "DiscoveryEngine", "InventionRequest", "InventionResponse", "PatternAnalysis"]
\ No newline at end of file
+__all__ = ["app", "DiscoveryEngine", "InventionRequest", "InventionResponse", "PatternAnalysis"]
+
+# Exports are imported on first access, so importing the package (or any
+# one module in it, such as the CLI) does not load the whole application
+_EXPORTS = {
+    "app": ".api",
+    "DiscoveryEngine": ".discovery_engine",
+    "InventionRequest": ".schemas",
+    "InventionResponse": ".schemas",
+    "PatternAnalysis": ".schemas"
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
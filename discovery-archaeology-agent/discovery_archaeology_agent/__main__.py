@@ -0,0 +1,4 @@
+"""Allow ``python -m discovery_archaeology_agent``."""
+from .main import main
+
+main()
@@ -0,0 +1,86 @@
+"""Theme and timeline aggregates maintained as inventions are stored."""
+from typing import List, Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from .models import InventionModel, InventionThemeModel, TimelineEntryModel
+
+# Serendipity moments mentioning a keyword earn the invention its theme
+MOMENT_THEMES = (
+    ("accident", "Accidental Discoveries"),
+    ("fail", "Failures Leading to Success")
+)
+
+
+def invention_themes(invention: InventionModel) -> List[str]:
+    """The common themes an invention's analysis shows."""
+    themes = []
+    moments = [moment.lower() for moment in invention.serendipity_moments or []]
+    for keyword, theme in MOMENT_THEMES:
+        if any(keyword in moment for moment in moments):
+            themes.append(theme)
+    if invention.critical_prerequisites:
+        themes.append("Built on Prerequisites")
+    if invention.objective_blindness_examples:
+        themes.append("Missed Initial Opportunities")
+    return themes
+
+
+def add_aggregates(
+    db: Session,
+    invention: InventionModel,
+    key_discovery: Optional[str],
+    pattern_count: int = 0
+):
+    """Add an invention's theme tags and timeline row to the session, uncommitted."""
+    for theme in invention_themes(invention):
+        db.add(InventionThemeModel(theme=theme, invention_id=invention.id, invention_name=invention.name))
+    
+    db.add(TimelineEntryModel(
+        invention_id=invention.id,
+        year=invention.year,
+        invention_name=invention.name,
+        key_discovery=key_discovery or "Unknown",
+        pattern_count=pattern_count,
+        prerequisite_count=len(invention.critical_prerequisites or [])
+    ))
+
+
+def count_pattern_links(db: Session, invention_id: int, linked: int):
+    """Add newly linked patterns to an invention's timeline row, uncommitted."""
+    if linked:
+        # The row may still be pending (sessions don't autoflush), and the
+        # UPDATE below only sees rows already in the database
+        db.flush()
+        db.query(TimelineEntryModel).filter(
+            TimelineEntryModel.invention_id == invention_id
+        ).update(
+            {TimelineEntryModel.pattern_count: TimelineEntryModel.pattern_count + linked},
+            synchronize_session=False
+        )
+
+
+def backfill_aggregates(db: Session, batch_size: int = 500) -> int:
+    """Build aggregates for inventions stored before they existed.
+    
+    Returns the number of inventions backfilled.
+    """
+    missing = db.query(InventionModel).outerjoin(
+        TimelineEntryModel, TimelineEntryModel.invention_id == InventionModel.id
+    ).filter(
+        TimelineEntryModel.invention_id.is_(None)
+    ).options(
+        selectinload(InventionModel.discoveries),
+        selectinload(InventionModel.patterns)
+    ).order_by(InventionModel.id)
+    
+    count = 0
+    while True:
+        inventions = missing.limit(batch_size).all()
+        if not inventions:
+            return count
+        for invention in inventions:
+            first = min(invention.discoveries, key=lambda discovery: discovery.id, default=None)
+            add_aggregates(db, invention, first.title if first else None, len(invention.patterns))
+        db.commit()
+        count += len(inventions)
@@ -1,24 +1,35 @@
 """FastAPI application and endpoints."""
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Optional
+import asyncio
+import json
 
-from .database import get_db, init_db
+from .batch import BatchAnalyzer
+from .database import SessionLocal, get_db, init_db
 from .discovery_engine import DiscoveryEngine
+from .http_cache import conditional_response, detail_cache_control, invention_bodies, json_bytes, json_response
+from .jobs import job_queue
+from .llm_cache import response_cache
+from .metrics import MetricsMiddleware, registry
+from .openai_client import close_client, get_client
 from .pattern_analyzer import PatternAnalyzer
+from .rate_limit import LLMUnavailable, RateLimitExceeded
 from .schemas import (
-    InventionRequest, InventionResponse, PatternAnalysis
+    InventionRequest, InventionResponse, PatternAnalysis, PatternType, JobResponse, JobStatus,
+    BatchRequest, RelatedInvention, SearchHit, SearchHitKind, DiscoveryEntity
 )
+from .search import search
+from .similarity import related_index
 from .config import settings
 
 
-# Create FastAPI app
-app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
-    description="AI agent that reverse-engineers the true origins of inventions"
-)
+# Create FastAPI app; its title and version come from settings at startup,
+# so importing this module reads no settings
+app = FastAPI(description="AI agent that reverse-engineers the true origins of inventions")
 
 # Add CORS middleware for frontend
 app.add_middleware(
@@ -27,13 +38,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-Offset", "Link", "Server-Timing", "ETag"],
 )
 
+# Checks metrics_enabled per request
+app.add_middleware(MetricsMiddleware)
+
+
+def sse_event(event: str, data) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    """Pass an exhausted LLM rate limit on to the caller as a 429."""
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))} if exc.retry_after else None
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers=headers)
+
+
+@app.exception_handler(LLMUnavailable)
+async def llm_unavailable_handler(request: Request, exc: LLMUnavailable):
+    """Report a persistently failing LLM API as a 503."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
+    """Initialize database, the shared LLM client, job workers and the related-inventions index on startup.
+    
+    Without an API key the client is left for the first LLM call, so
+    stored analyses, patterns and search are still served.
+    """
+    app.title = settings.app_name
+    app.version = settings.app_version
     init_db()
+    if settings.openai_api_key:
+        get_client()
+    await job_queue.start()
+    related_index.warm()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop job workers; unfinished jobs resume on the next start."""
+    await job_queue.stop()
+    await close_client()
 
 
 @app.get("/")
@@ -54,39 +104,279 @@ async def analyze_invention(
     """Analyze an invention's origins."""
     try:
         engine = DiscoveryEngine(db)
-        result = engine.analyze_invention(request)
+        result = await engine.aanalyze_invention(request)
         return result
+    except (RateLimitExceeded, LLMUnavailable):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/inventions/analyze/stream")
+async def stream_invention_analysis(request: InventionRequest):
+    """Analyze an invention, streaming each part as server-sent events.
+    
+    Emits ``discovery``, ``connection`` and ``field`` events as the model
+    produces them, then a ``result`` event with the stored analysis (the
+    same body ``POST /inventions/analyze`` returns), or an ``error`` event.
+    """
+    
+    async def events():
+        # The stream outlives the request's dependencies, so it owns its session
+        db = SessionLocal()
+        try:
+            engine = DiscoveryEngine(db)
+            async for event, data in engine.astream_invention(request):
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+        finally:
+            db.close()
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/inventions/analyze/batch")
+async def batch_analyze_inventions(request: BatchRequest):
+    """Analyze many inventions, streaming progress as server-sent events.
+    
+    Emits a ``progress`` event as each invention is skipped (already
+    stored), analyzed or fails, then a ``summary`` event with the totals.
+    One failed invention does not stop the rest.
+    """
+    if len(request.invention_names) > settings.batch_max_names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.batch_max_names} inventions per batch"
+        )
+    
+    async def events():
+        # The stream outlives the request's dependencies, so it owns its session
+        db = SessionLocal()
+        try:
+            batch = BatchAnalyzer(db)
+            async for progress in batch.run(
+                request.invention_names,
+                focus_areas=request.focus_areas,
+                refresh=request.refresh
+            ):
+                yield sse_event("progress", progress)
+            yield sse_event("summary", batch.summary)
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+        finally:
+            db.close()
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/inventions/analyze/jobs", response_model=JobResponse, status_code=202)
+async def submit_analysis_job(
+    request: InventionRequest,
+    db: Session = Depends(get_db)
+):
+    """Queue an invention analysis and return its job immediately."""
+    job = await job_queue.submit(db, request)
+    job_queue.notify()
+    return job
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    """Get the status of a queued analysis, with its result once done."""
+    job = job_queue.get(db, job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Stream a job's status changes as server-sent events until it finishes."""
+    
+    def poll():
+        with SessionLocal() as db:
+            return job_queue.get(db, job_id)
+    
+    job = await asyncio.to_thread(poll)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        current = job
+        last_status = None
+        while True:
+            if current.status != last_status:
+                last_status = current.status
+                yield sse_event(current.status.value, current)
+            if current.status in (JobStatus.DONE, JobStatus.FAILED):
+                return
+            await asyncio.sleep(settings.job_poll_seconds)
+            current = await asyncio.to_thread(poll)
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# Read-only endpoints are plain functions so FastAPI runs their blocking
+# database work in its threadpool instead of on the event loop.
 @app.get("/inventions", response_model=List[Dict])
-async def list_inventions(db: Session = Depends(get_db)):
-    """List all analyzed inventions."""
+def list_inventions(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    pattern: Optional[PatternType] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: Session = Depends(get_db)
+):
+    """List analyzed inventions, one page at a time.
+    
+    The cursor for the next page is returned in the ``X-Next-Cursor`` and
+    ``Link`` headers; neither is set on the last page.
+    """
     engine = DiscoveryEngine(db)
-    return engine.list_inventions()
+    try:
+        page, next_cursor = engine.list_inventions(
+            limit=limit,
+            cursor=cursor,
+            year_from=year_from,
+            year_to=year_to,
+            pattern=pattern,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    
+    return json_response(request, page, headers=headers)
 
 
 @app.get("/inventions/{invention_id}", response_model=InventionResponse)
-async def get_invention(
+def get_invention(
     invention_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """Get a specific invention analysis."""
+    """Get a specific invention analysis.
+    
+    The serialized body is cached per ``updated_at``, so repeat reads skip
+    loading and encoding the discovery graph, and a matching
+    ``If-None-Match`` gets a 304.
+    """
     engine = DiscoveryEngine(db)
-    result = engine.get_invention(invention_id)
+    exists, version = engine.invention_version(invention_id)
+    if not exists:
+        raise HTTPException(status_code=404, detail="Invention not found")
+    
+    cached = invention_bodies.get(invention_id, version)
+    if cached is None:
+        result = engine.get_invention(invention_id)
+        if not result:
+            raise HTTPException(status_code=404, detail="Invention not found")
+        cached = invention_bodies.put(invention_id, version, json_bytes(result))
+    
+    return conditional_response(request, cached, detail_cache_control())
+
+
+@app.get("/inventions/{invention_id}/related", response_model=List[RelatedInvention])
+def get_related_inventions(
+    invention_id: int,
+    request: Request,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Rank other stored inventions by similarity to this one.
+    
+    Compares the text, discovery chains, patterns and prerequisites of
+    the analyses as hashed TF-IDF vectors held in memory; no embedding
+    service is called.
+    """
+    related = DiscoveryEngine(db).related_inventions(invention_id, limit=limit)
+    if related is None:
+        raise HTTPException(status_code=404, detail="Invention not found")
+    
+    return json_response(request, related)
+
+
+@app.get("/inventions/{invention_id}/shared-discoveries", response_model=List[DiscoveryEntity])
+def get_shared_discoveries(
+    invention_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Discoveries this invention builds on that other inventions build on too.
     
-    if not result:
+    Each lists the other inventions whose analyses include it, oldest
+    first; discoveries unique to this invention are left out.
+    """
+    shared = DiscoveryEngine(db).shared_discoveries(invention_id)
+    if shared is None:
         raise HTTPException(status_code=404, detail="Invention not found")
     
-    return result
+    return json_response(request, shared)
+
+
+@app.get("/discoveries/{entity_id}", response_model=DiscoveryEntity)
+def get_discovery_entity(
+    entity_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Get a discovery shared across analyses, with every invention that includes it.
+    
+    Discovery entity ids are listed per discovery in ``discovery_entities``
+    of an invention response.
+    """
+    entity = DiscoveryEngine(db).get_discovery_entity(entity_id)
+    if entity is None:
+        raise HTTPException(status_code=404, detail="Discovery not found")
+    
+    return json_response(request, entity)
+
+
+@app.get("/search", response_model=List[SearchHit])
+def search_inventions(
+    request: Request,
+    q: str = Query(..., min_length=1, description='Words and "quoted phrases"; a trailing * matches prefixes'),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    kind: Optional[SearchHitKind] = None,
+    db: Session = Depends(get_db)
+):
+    """Search invention narratives, summaries, lessons and discoveries.
+    
+    Hits match every term and are ranked by relevance, with matches marked
+    in the title and snippet. The offset of the next page is returned in
+    the ``X-Next-Offset`` and ``Link`` headers; neither is set on the last
+    page.
+    """
+    try:
+        hits, more = search(db, q, limit=limit, offset=offset, kind=kind)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {}
+    if more:
+        headers["X-Next-Offset"] = str(offset + limit)
+        next_url = request.url.include_query_params(offset=offset + limit)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    
+    return json_response(request, hits, headers=headers)
 
 
 @app.get("/patterns", response_model=List[PatternAnalysis])
-async def get_patterns(db: Session = Depends(get_db)):
+def get_patterns(request: Request, db: Session = Depends(get_db)):
     """Get all identified patterns across inventions."""
     engine = DiscoveryEngine(db)
-    return engine.get_patterns()
+    return json_response(request, engine.get_patterns())
 
 
 @app.get("/health")
@@ -96,24 +386,39 @@ async def health_check():
 
 
 @app.post("/patterns/analyze")
-async def analyze_patterns(db: Session = Depends(get_db)):
+async def analyze_patterns(
+    refresh: bool = Query(False, description="Bypass the LLM response cache"),
+    db: Session = Depends(get_db)
+):
     """Analyze patterns across all inventions."""
     analyzer = PatternAnalyzer(db)
-    patterns = analyzer.analyze_all_patterns()
+    patterns = await analyzer.aanalyze_all_patterns(refresh=refresh)
     return patterns
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus metrics for this worker."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """LLM response cache counters for this worker."""
+    return response_cache.stats()
+
+
 @app.get("/patterns/themes")
-async def get_common_themes(db: Session = Depends(get_db)):
+def get_common_themes(request: Request, db: Session = Depends(get_db)):
     """Get common themes across inventions."""
     analyzer = PatternAnalyzer(db)
     themes = analyzer.find_common_themes()
-    return themes
+    return json_response(request, themes)
 
 
 @app.get("/patterns/timeline")
-async def get_innovation_timeline(db: Session = Depends(get_db)):
+def get_innovation_timeline(request: Request, db: Session = Depends(get_db)):
     """Get timeline of innovations."""
     analyzer = PatternAnalyzer(db)
     timeline = analyzer.get_innovation_timeline()
-    return timeline
\ No newline at end of file
+    return json_response(request, timeline)
\ No newline at end of file
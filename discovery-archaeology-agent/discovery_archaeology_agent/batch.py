@@ -0,0 +1,261 @@
+"""Bulk analysis of many inventions with bounded parallelism."""
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import SessionLocal, run_in_session, run_write
+from .metrics import timed_stage
+from .discovery_engine import DiscoveryEngine, focus_key
+from .models import InventionModel
+from .naming import add_alias, canonicalize, resolve_invention_id
+from .openai_client import DiscoveryArchaeologyClient, get_client
+from .rate_limit import TokenBucket
+from .schemas import (
+    BatchItemStatus, BatchProgress, BatchSummary, InventionAnalysis, InventionRequest, InventionResponse
+)
+
+
+def unique_names(names: List[str]) -> List[str]:
+    """Whitespace-normalized names, without blanks or repeats, in order.
+    
+    Names with the same canonical form count as repeats; the first is kept.
+    """
+    unique: Dict[str, str] = {}
+    for name in (" ".join(raw.split()) for raw in names):
+        if name:
+            unique.setdefault(canonicalize(name), name)
+    return list(unique.values())
+
+
+class BatchAnalyzer:
+    """Analyze a list of inventions, reporting progress as each finishes.
+    
+    Names already stored are skipped. LLM calls run concurrently under a
+    concurrency cap and a tokens-per-minute budget; finished analyses are
+    stored several to a transaction. A failed invention is reported and the
+    rest of the batch carries on.
+    
+    With focus areas, each invention's focused variant is built on its
+    stored base analysis instead (see ``DiscoveryEngine``).
+    """
+    
+    def __init__(
+        self,
+        db_session: Session,
+        client: Optional[DiscoveryArchaeologyClient] = None,
+        concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        commit_size: Optional[int] = None
+    ):
+        self.db = db_session
+        self._client = client
+        self.concurrency = concurrency or settings.batch_concurrency
+        self.budget = TokenBucket(
+            settings.batch_tokens_per_minute if tokens_per_minute is None else tokens_per_minute
+        )
+        self.commit_size = commit_size or settings.batch_commit_size
+        self.summary = BatchSummary(total=0, analyzed=0, skipped=0, failed=0)
+    
+    @property
+    def client(self) -> DiscoveryArchaeologyClient:
+        """The LLM client, created once an invention needs analyzing."""
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+    
+    async def run(
+        self,
+        invention_names: List[str],
+        focus_areas: Optional[List[str]] = None,
+        refresh: bool = False
+    ) -> AsyncIterator[BatchProgress]:
+        """Analyze the inventions, yielding a progress report for each.
+        
+        Skipped and failed inventions are reported straight away; analyzed
+        ones once their transaction commits. ``summary`` holds the totals
+        when the iterator is exhausted.
+        """
+        names = unique_names(invention_names)
+        self.summary = BatchSummary(total=len(names), analyzed=0, skipped=0, failed=0)
+        
+        if focus_key(focus_areas):
+            async for progress in self._run_focused(names, focus_areas, refresh):
+                yield progress
+            return
+        
+        stored = await run_in_session(self.db, self._stored_ids, names)
+        for name in names:
+            if name in stored:
+                yield self._progress(name, BatchItemStatus.SKIPPED, invention_id=stored[name])
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def analyze(name: str) -> Tuple[str, Union[InventionAnalysis, Exception]]:
+            async with semaphore:
+                try:
+                    await self.budget.acquire(self.client.estimate_analysis_tokens(name, focus_areas))
+                    return name, await self.client.aanalyze_invention(
+                        invention_name=name,
+                        focus_areas=focus_areas,
+                        refresh=refresh
+                    )
+                except Exception as e:
+                    return name, e
+        
+        tasks = [asyncio.create_task(analyze(name)) for name in names if name not in stored]
+        pending: List[Tuple[str, InventionAnalysis]] = []
+        last_commit = time.monotonic()
+        try:
+            for finished in asyncio.as_completed(tasks):
+                name, result = await finished
+                if isinstance(result, Exception):
+                    yield self._progress(name, BatchItemStatus.FAILED, error=str(result))
+                    continue
+                
+                pending.append((name, result))
+                due = time.monotonic() - last_commit >= settings.batch_commit_seconds
+                if len(pending) >= self.commit_size or due:
+                    for progress in await self._commit(pending):
+                        yield progress
+                    pending, last_commit = [], time.monotonic()
+            
+            for progress in await self._commit(pending):
+                yield progress
+        finally:
+            # Stop outstanding calls if the caller goes away mid-batch
+            for task in tasks:
+                task.cancel()
+    
+    async def _run_focused(
+        self,
+        names: List[str],
+        focus_areas: List[str],
+        refresh: bool
+    ) -> AsyncIterator[BatchProgress]:
+        """Analyze the inventions with focus areas, reporting each as it finishes.
+        
+        A focused analysis is a base analysis (stored, or made first) plus a
+        short focus delta. Both are stored by ``DiscoveryEngine`` as each
+        invention finishes rather than several to a transaction.
+        """
+        stored = await run_in_session(self.db, self._stored_variant_ids, names, focus_areas)
+        for name in names:
+            if name in stored:
+                yield self._progress(name, BatchItemStatus.SKIPPED, invention_id=stored[name])
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def analyze(name: str) -> Tuple[str, Union[InventionResponse, Exception]]:
+            async with semaphore:
+                # Engines run concurrently, so each needs its own session
+                db = SessionLocal()
+                try:
+                    await self.budget.acquire(self.client.estimate_analysis_tokens(name, focus_areas))
+                    request = InventionRequest(invention_name=name, focus_areas=focus_areas, refresh=refresh)
+                    return name, await DiscoveryEngine(db, client=self._client).aanalyze_invention(request)
+                except Exception as e:
+                    return name, e
+                finally:
+                    db.close()
+        
+        tasks = [asyncio.create_task(analyze(name)) for name in names if name not in stored]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                name, result = await finished
+                if isinstance(result, Exception):
+                    yield self._progress(name, BatchItemStatus.FAILED, error=str(result))
+                else:
+                    yield self._progress(name, BatchItemStatus.ANALYZED, invention_id=result.id)
+        finally:
+            # Stop outstanding calls if the caller goes away mid-batch
+            for task in tasks:
+                task.cancel()
+    
+    async def _commit(self, pending: List[Tuple[str, InventionAnalysis]]) -> List[BatchProgress]:
+        """Store finished analyses in one transaction and report them."""
+        if not pending:
+            return []
+        
+        outcomes = await run_write(self.db, self._store_batch, pending)
+        reports = []
+        for (name, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, int):
+                reports.append(self._progress(name, BatchItemStatus.ANALYZED, invention_id=outcome))
+            else:
+                reports.append(self._progress(name, BatchItemStatus.FAILED, error=outcome))
+        return reports
+    
+    @timed_stage("db_write")
+    def _store_batch(self, pending: List[Tuple[str, InventionAnalysis]]) -> List[Union[int, str]]:
+        """Add each analysis under its own savepoint, then commit them together.
+        
+        Returns the stored invention id for each analysis, or an error
+        message for one that could not be stored.
+        """
+        engine = DiscoveryEngine(self.db, client=self._client)
+        outcomes: List[Union[int, str]] = []
+        added: List[Tuple[int, InventionAnalysis]] = []
+        for name, analysis in pending:
+            try:
+                with self.db.begin_nested():
+                    invention = engine._add_analysis(analysis)
+                    engine._link_patterns(invention, analysis)
+                    if canonicalize(name) != invention.canonical_name:
+                        add_alias(self.db, name, invention.id)
+                outcomes.append(invention.id)
+                added.append((invention.id, analysis))
+            except IntegrityError:
+                # Stored meanwhile, by another request or earlier in this batch
+                existing = self.db.query(InventionModel.id).filter(
+                    InventionModel.name == analysis.invention_name
+                ).scalar()
+                outcomes.append(existing if existing is not None else "Could not store analysis")
+            except Exception as e:
+                outcomes.append(str(e))
+        
+        self.db.commit()
+        for invention_id, analysis in added:
+            engine._after_commit(invention_id, analysis)
+        return outcomes
+    
+    def _stored_ids(self, names: List[str]) -> Dict[str, int]:
+        """Ids of the names that already resolve to a stored invention."""
+        stored = {}
+        for name in names:
+            invention_id = resolve_invention_id(self.db, name)
+            if invention_id is not None:
+                stored[name] = invention_id
+        return stored
+    
+    def _stored_variant_ids(self, names: List[str], focus_areas: List[str]) -> Dict[str, int]:
+        """Ids of the names whose focused variant is already stored."""
+        engine = DiscoveryEngine(self.db, client=self._client)
+        stored = {}
+        for name in names:
+            focused, _ = engine._find_focused(name, focus_areas)
+            if focused is not None:
+                stored[name] = focused.id
+        return stored
+    
+    def _progress(
+        self,
+        name: str,
+        status: BatchItemStatus,
+        invention_id: Optional[int] = None,
+        error: Optional[str] = None
+    ) -> BatchProgress:
+        """Count an outcome and build its progress report."""
+        setattr(self.summary, status.value, getattr(self.summary, status.value) + 1)
+        completed = self.summary.analyzed + self.summary.skipped + self.summary.failed
+        return BatchProgress(
+            invention_name=name,
+            status=status,
+            invention_id=invention_id,
+            error=error,
+            completed=completed,
+            total=self.summary.total
+        )
@@ -1,16 +1,41 @@
 """Configuration management for Discovery Archaeology Agent."""
 import os
+import threading
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Optional
 
 
 class Settings(BaseSettings):
     # OpenAI Configuration
-    openai_api_key: str
+    openai_api_key: Optional[str] = None  # required once an LLM call is made
     openai_model: str = "o3-2025-04-16"
+    openai_base_url: Optional[str] = None  # an OpenAI-compatible endpoint instead of api.openai.com
+    openai_max_connections: int = 20
+    openai_timeout_seconds: float = 600.0
+    
+    # LLM Rate Limit Configuration (0 disables a per-minute budget)
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+    llm_max_retries: int = 5
+    llm_backoff_base_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 60.0
+    llm_max_concurrency: int = 32  # AIMD ceiling for concurrent calls
+    llm_min_concurrency: int = 1
+    llm_latency_target_seconds: float = 0.0  # slower calls shrink concurrency, 0 to ignore latency
     
     # Database Configuration
     database_url: str = "sqlite:///./discovery_archaeology.db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    
+    # SQLite Configuration (ignored for other databases)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # bytes
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_single_writer: bool = True  # serialize writes on one thread
     
     # Application Configuration
     app_name: str = "Discovery Archaeology Agent"
@@ -21,9 +46,91 @@ class Settings(BaseSettings):
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     
+    # Metrics Configuration
+    metrics_enabled: bool = True  # /metrics and per-stage timings
+    server_timing_enabled: bool = False  # per-request Server-Timing header
+    
+    # HTTP Cache Configuration
+    http_cache_max_entries: int = 1024  # serialized invention bodies kept per worker, 0 disables
+    http_cache_max_age: int = 60  # seconds browsers may reuse an invention without revalidating
+    http_cache_shared_max_age: int = 3600  # the same for shared caches and CDNs (s-maxage)
+    
+    # Single-flight Configuration
+    analysis_lease_enabled: bool = False  # coalesce across worker processes
+    analysis_lease_seconds: int = 600
+    analysis_lease_poll_seconds: float = 1.0
+    
+    # Name Resolution Configuration
+    name_match_threshold: float = 0.75  # trigram similarity that reuses a stored analysis; 1 disables fuzzy matching
+    
+    # Discovery Entity Configuration
+    discovery_match_threshold: float = 0.6  # title similarity that links discoveries to one entity; 1 links exact titles only
+    
+    # Search Configuration
+    search_fts_enabled: bool = True  # FTS5 index on SQLite; other databases scan with LIKE
+    
+    # Related Inventions Configuration
+    related_dimensions: int = 256  # hashed features per invention; memory is 4 bytes each per invention
+    
+    # LLM Response Cache Configuration
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 30 * 24 * 3600
+    llm_cache_max_entries: int = 10000
+    
+    # Pattern Analysis Configuration
+    pattern_concurrency: int = 6  # concurrent per-pattern LLM calls
+    pattern_chunk_tokens: int = 4000  # prompt budget for one batch of inventions
+    pattern_chunk_size: int = 100  # most inventions per batch, bounds the response size
+    pattern_chunk_concurrency: int = 4  # concurrent batch calls per pattern
+    
+    # Job Queue Configuration
+    job_workers: int = 2
+    job_poll_seconds: float = 2.0
+    job_heartbeat_seconds: float = 15.0
+    job_max_attempts: int = 3
+    
+    # Batch Analysis Configuration
+    batch_concurrency: int = 4  # concurrent LLM calls per batch
+    batch_tokens_per_minute: int = 0  # token budget per batch, 0 for none
+    batch_commit_size: int = 10  # analyses stored per transaction
+    batch_commit_seconds: float = 5.0  # longest a finished analysis waits to be stored
+    batch_max_names: int = 1000
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
 
-settings = Settings()
\ No newline at end of file
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """The process-wide settings, read from the environment on first use."""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()
+    return _settings
+
+
+class _LazySettings:
+    """Stands in for the ``Settings`` instance until an attribute is used.
+    
+    Importing a module that does ``from .config import settings`` reads
+    neither the environment nor ``.env``; the first attribute access does.
+    Reads and writes are forwarded to the instance ``get_settings`` caches.
+    """
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+    
+    def __setattr__(self, name: str, value: Any):
+        setattr(get_settings(), name, value)
+    
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
+settings = _LazySettings()
\ No newline at end of file
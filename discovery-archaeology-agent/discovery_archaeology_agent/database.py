@@ -1,22 +1,189 @@
 """Database connection and session management."""
-from sqlalchemy import create_engine
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from sqlalchemy import and_, create_engine, event, func, inspect, select, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session
+from .aggregates import backfill_aggregates
+from .entities import backfill_entities
+from .naming import backfill_names
+from .search import backfill_search, create_search_index
 from .models import Base
 from .config import settings
+from .metrics import count_query
+
+
+def _engine_options(database_url: str) -> dict:
+    """Connection and pool options for the configured database."""
+    url = make_url(database_url)
+    pool = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout
+    }
+    if url.get_backend_name() != "sqlite":
+        return {**pool, "pool_pre_ping": True}
+    
+    options = {
+        "connect_args": {
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout_ms / 1000
+        }
+    }
+    if url.database not in (None, "", ":memory:"):
+        # In-memory databases use a single shared connection instead
+        options.update(pool)
+    return options
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """Apply the production pragmas to every new SQLite connection.
+    
+    WAL lets readers run alongside the writer, ``synchronous=NORMAL`` is
+    durable across application crashes in WAL mode, and mmap plus a
+    larger page cache keep hot pages out of read() calls.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kib)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.close()
+
+
+# Created by get_engine on first use, so importing this module neither reads
+# settings nor touches the database
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+# SQLite allows one writer at a time; sending every write through one
+# thread queues them in-process instead of failing with "database is locked"
+_writer: Optional[ThreadPoolExecutor] = None
+
+
+def get_engine() -> Engine:
+    """The database engine, created on first use."""
+    global _engine, _writer
+    if _engine is not None:
+        return _engine
+    
+    with _engine_lock:
+        if _engine is None:
+            engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", _configure_sqlite)
+                if settings.sqlite_single_writer:
+                    _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+            if settings.metrics_enabled:
+                event.listen(engine, "before_cursor_execute", count_query)
+            SessionLocal.configure(bind=engine)
+            _engine = engine
+    return _engine
+
+
+def __getattr__(name: str) -> Any:
+    """``engine`` and ``is_sqlite``, created on first access."""
+    if name == "engine":
+        return get_engine()
+    if name == "is_sqlite":
+        return get_engine().dialect.name == "sqlite"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazySessionmaker(sessionmaker):
+    """A ``sessionmaker`` that creates the engine for its first session."""
+    
+    def __call__(self, **local_kw: Any) -> Session:
+        if _engine is None:
+            get_engine()
+        return super().__call__(**local_kw)
 
-# Create engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
 
 
 def init_db():
     """Initialize database tables."""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
+    _add_missing_columns()
+    _add_missing_indexes()
+    with get_engine().begin() as conn:
+        create_search_index(conn)
+    
+    with SessionLocal() as db:
+        backfill_aggregates(db)
+        backfill_names(db)
+        backfill_search(db)
+        backfill_entities(db)
+
+
+def _add_missing_columns():
+    """Add columns introduced after an existing database file was created.
+    
+    ``create_all`` only creates missing tables, so newer nullable columns
+    are added to older tables in place.
+    """
+    engine = get_engine()
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} "
+                    f"{column.type.compile(dialect=engine.dialect)}"
+                ))
+
+
+def _add_missing_indexes():
+    """Create indexes introduced after an existing database file was created.
+    
+    Duplicate rows are removed before a unique index is built over them,
+    keeping one copy of each.
+    """
+    engine = get_engine()
+    inspector = inspect(engine)
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name in existing:
+                    continue
+                if index.unique:
+                    _remove_duplicates(conn, table, list(index.columns))
+                index.create(bind=conn)
+
+
+def _remove_duplicates(conn, table, columns):
+    """Collapse rows that repeat the same values in ``columns`` into one."""
+    duplicates = conn.execute(
+        select(*columns).group_by(*columns).having(func.count() > 1)
+    ).all()
+    
+    for values in duplicates:
+        match = and_(*(column == value for column, value in zip(columns, values)))
+        rows = conn.execute(select(table).where(match)).all()
+        conn.execute(table.delete().where(match))
+        conn.execute(table.insert().values(**rows[0]._mapping))
 
 
 def get_db() -> Session:
@@ -25,4 +192,60 @@ def get_db() -> Session:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def _session_work(db: Optional[Session], func: Callable[..., Any], args: tuple) -> Callable[[], Any]:
+    """Wrap session work so it releases the session's connection when done."""
+    def work():
+        try:
+            return func(*args)
+        finally:
+            if db is not None:
+                db.rollback()
+    
+    return work
+
+
+async def run_in_session(db: Session, func: Callable[..., Any], *args: Any) -> Any:
+    """Run blocking session work in a worker thread.
+    
+    The session's connection is returned to the pool before the thread
+    finishes, so a request never holds one while it awaits something else
+    (such as an LLM call).
+    """
+    return await asyncio.to_thread(_session_work(db, func, args))
+
+
+async def run_write(db: Optional[Session], func: Callable[..., Any], *args: Any) -> Any:
+    """Run blocking work that writes to the database.
+    
+    Like ``run_in_session``, but on SQLite the work is queued on the single
+    writer thread so writes never contend for the database lock. ``db`` may
+    be ``None`` when ``func`` opens its own session.
+    """
+    work = _session_work(db, func, args)
+    get_engine()  # decides whether there is a writer thread
+    if _writer is None:
+        return await asyncio.to_thread(work)
+    
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_writer, functools.partial(context.run, work))
+
+
+def queue_write(func: Callable[..., Any], *args: Any):
+    """Run a best-effort write without waiting for it.
+    
+    For bookkeeping a caller does not need to see finish, from sync or
+    async code alike. On SQLite the work joins the writer thread's queue
+    and any error is dropped with its future; without a writer thread
+    the work runs here, as it would have before.
+    """
+    get_engine()  # decides whether there is a writer thread
+    if _writer is None:
+        func(*args)
+        return
+    
+    context = contextvars.copy_context()
+    _writer.submit(context.run, func, *args)
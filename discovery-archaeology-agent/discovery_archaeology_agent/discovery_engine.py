@@ -1,55 +1,483 @@
 """Core discovery engine for analyzing invention origins."""
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from typing import Any, AsyncIterator, List, Optional, Dict, Tuple
+from datetime import datetime
+import asyncio
+import base64
+import json
 import uuid
 
 from .schemas import (
-    InventionAnalysis, InventionRequest, InventionResponse,
-    PatternAnalysis, PatternType, Discovery, Connection, DiscoveryType
+    InventionAnalysis, InventionRequest, InventionResponse, FocusAnalysis, FocusDelta,
+    PatternAnalysis, PatternType, Discovery, Connection, DiscoveryType, RelatedInvention,
+    DiscoveryEntity
 )
 from .models import (
-    InventionModel, DiscoveryModel, ConnectionModel, PatternModel
+    InventionModel, DiscoveryModel, ConnectionModel, PatternModel, AnalysisVariantModel
 )
-from .openai_client import DiscoveryArchaeologyClient
-from .database import get_db
+from .aggregates import add_aggregates, count_pattern_links
+from .entities import get_entity, link_discoveries, shared_entities
+from .naming import add_alias, canonicalize, index_name, resolve_invention_id
+from .search import index_invention
+from .similarity import related_index
+from .openai_client import DiscoveryArchaeologyClient, get_client
+from .database import SessionLocal, get_db, run_in_session, run_write
+from .singleflight import SingleFlight, AnalysisLease
+from .streaming import IncrementalJSONScanner
+from .config import settings
+from .metrics import timed_stage
+
+
+# Columns that GET /inventions can return, and the ones it returns by default
+LIST_FIELDS = ("id", "name", "year", "summary", "key_lesson", "created_at", "updated_at")
+DEFAULT_LIST_FIELDS = ("id", "name", "year", "summary", "created_at")
+
+
+def _encode_cursor(created_at: datetime, invention_id: int) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor."""
+    raw = json.dumps([created_at.isoformat(), invention_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by ``_encode_cursor``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, invention_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(invention_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+# Top-level arrays of InventionAnalysis whose elements are streamed one by one
+STREAMED_ITEMS = {"discoveries": "discovery", "connections": "connection"}
+
+
+def _stream_event(kind: str, key: str, value: Any) -> Optional[Tuple[str, Any]]:
+    """Map a scanner event to a stream event, or None to skip it."""
+    if kind == "item" and key in STREAMED_ITEMS:
+        return STREAMED_ITEMS[key], value
+    if kind == "field" and key not in STREAMED_ITEMS:
+        return "field", {"name": key, "value": value}
+    return None
+
+
+def _replay_events(analysis: InventionAnalysis) -> List[Tuple[str, Any]]:
+    """The stream events for an analysis that is already stored."""
+    data = analysis.model_dump(mode="json")
+    events = [
+        (event, item) for key, event in STREAMED_ITEMS.items() for item in data.pop(key)
+    ]
+    events.extend(("field", {"name": name, "value": value}) for name, value in data.items())
+    return events
+
+
+# Analyses in flight in this process, keyed by ``analysis_key``
+_in_flight = SingleFlight()
+
+
+def focus_key(focus_areas: Optional[List[str]]) -> str:
+    """Normalize focus areas into an order-insensitive key ("" for none)."""
+    focus = sorted({" ".join(area.split()).casefold() for area in focus_areas or [] if area.strip()})
+    return "|".join(focus)
+
+
+def analysis_key(invention_name: str, focus_areas: Optional[List[str]] = None) -> str:
+    """Normalize an analysis request into a single-flight key."""
+    return "|".join(filter(None, [canonicalize(invention_name), focus_key(focus_areas)]))
+
+
+def _settle_delta(delta: FocusDelta, base: InventionAnalysis) -> FocusDelta:
+    """Renumber added discoveries and drop references to unknown ones.
+    
+    Added discoveries get ids that cannot clash with stored discovery ids;
+    connections and highlights must point at a discovery that exists.
+    """
+    known = {discovery.id for discovery in base.discoveries}
+    renamed = {}
+    discoveries = []
+    for number, discovery in enumerate(delta.discoveries, 1):
+        new_id = f"focus-{number}"
+        if discovery.id:
+            renamed[discovery.id] = new_id
+        discoveries.append(discovery.model_copy(update={"id": new_id}))
+    
+    def resolve(discovery_id: str) -> Optional[str]:
+        return renamed.get(discovery_id, discovery_id if discovery_id in known else None)
+    
+    connections = [
+        conn.model_copy(update={
+            "from_discovery_id": resolve(conn.from_discovery_id),
+            "to_discovery_id": resolve(conn.to_discovery_id)
+        })
+        for conn in delta.connections
+        if resolve(conn.from_discovery_id) and resolve(conn.to_discovery_id)
+    ]
+    return delta.model_copy(update={
+        "discoveries": discoveries,
+        "connections": connections,
+        "highlighted_discovery_ids": [i for i in delta.highlighted_discovery_ids if i in known]
+    })
+
+
+def _merge_focus(base: InventionResponse, focus_areas: List[str], delta: FocusDelta) -> InventionResponse:
+    """A base analysis with a focus delta's discoveries and insights added."""
+    analysis = base.analysis.model_copy(update={
+        "discoveries": base.analysis.discoveries + delta.discoveries,
+        "connections": base.analysis.connections + delta.connections
+    })
+    focus = FocusAnalysis(
+        focus_areas=focus_areas,
+        summary=delta.summary,
+        highlighted_discovery_ids=delta.highlighted_discovery_ids,
+        added_discovery_ids=[discovery.id for discovery in delta.discoveries],
+        insights=delta.insights
+    )
+    return base.model_copy(update={"analysis": analysis, "focus": focus})
 
 
 class DiscoveryEngine:
     """Core engine for discovering invention origins."""
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, client: Optional[DiscoveryArchaeologyClient] = None):
         self.db = db_session
-        self.client = DiscoveryArchaeologyClient()
+        self._client = client
+    
+    @property
+    def client(self) -> DiscoveryArchaeologyClient:
+        """The LLM client, created on the first LLM call; stored analyses are read without it."""
+        if self._client is None:
+            self._client = get_client()
+        return self._client
     
     def analyze_invention(self, request: InventionRequest) -> InventionResponse:
         """Analyze an invention and store results in database."""
         
+        if focus_key(request.focus_areas):
+            return self._analyze_focused(request)
+        
         # Check if invention already exists in database
-        existing = self.db.query(InventionModel).filter(
-            InventionModel.name == request.invention_name
-        ).first()
+        existing = self._find_existing(request.invention_name)
         
         if existing:
             # Return existing analysis
-            return self._model_to_response(existing)
+            return existing
         
         # Get analysis from OpenAI
         analysis = self.client.analyze_invention(
             invention_name=request.invention_name,
-            focus_areas=request.focus_areas
+            focus_areas=request.focus_areas,
+            refresh=request.refresh
+        )
+        
+        response = self._store_analysis(analysis)
+        if self._needs_alias(request.invention_name, response):
+            self._add_alias(request.invention_name, response.id)
+        return response
+    
+    async def aanalyze_invention(self, request: InventionRequest) -> InventionResponse:
+        """Analyze an invention without blocking the event loop.
+        
+        The LLM call is awaited natively; database work runs in a worker
+        thread. The session is only ever used by one thread at a time.
+        Concurrent requests for the same invention share one LLM call.
+        """
+        if focus_key(request.focus_areas):
+            return await self._aanalyze_focused(request)
+        
+        existing = await run_in_session(self.db, self._find_existing, request.invention_name)
+        
+        if existing:
+            return existing
+        
+        key = analysis_key(request.invention_name, request.focus_areas)
+        return await _in_flight.do(key, lambda: self._analyze_in_flight(request, key))
+    
+    async def astream_invention(self, request: InventionRequest) -> AsyncIterator[Tuple[str, Any]]:
+        """Analyze an invention, reporting each part as soon as it is known.
+        
+        Yields ``("discovery", dict)``, ``("connection", dict)`` and
+        ``("field", {"name": ..., "value": ...})`` events while the model
+        streams, then ``("result", InventionResponse)`` once the analysis is
+        stored through the same path as ``aanalyze_invention``. A stored
+        analysis is replayed as the same events, as is a focused analysis
+        once its (short) focus delta is stored.
+        """
+        if focus_key(request.focus_areas):
+            response = await self.aanalyze_invention(request)
+            for event in _replay_events(response.analysis):
+                yield event
+            yield "result", response
+            return
+        
+        existing = await run_in_session(self.db, self._find_existing, request.invention_name)
+        
+        if existing:
+            for event in _replay_events(existing.analysis):
+                yield event
+            yield "result", existing
+            return
+        
+        scanner = IncrementalJSONScanner()
+        async for part in self.client.astream_analysis(
+            invention_name=request.invention_name,
+            focus_areas=request.focus_areas,
+            refresh=request.refresh
+        ):
+            if isinstance(part, str):
+                for kind, key, value in scanner.feed(part):
+                    event = _stream_event(kind, key, value)
+                    if event:
+                        yield event
+            else:
+                yield "result", await self._astore_requested(request, part)
+    
+    def _analyze_focused(self, request: InventionRequest) -> InventionResponse:
+        """Analyze an invention with focus areas on top of its base analysis.
+        
+        The unfocused base analysis is stored once per invention (and made
+        first if need be); each focus set then only asks the model for what
+        it adds to the base discovery chain.
+        """
+        focused, base = self._find_focused(request.invention_name, request.focus_areas)
+        if focused:
+            return focused
+        
+        if base is None:
+            base = self.analyze_invention(request.model_copy(update={"focus_areas": None}))
+        delta = self.client.analyze_focus(base.analysis, request.focus_areas, refresh=request.refresh)
+        return self._save_variant(base, request.focus_areas, delta)
+    
+    async def _aanalyze_focused(self, request: InventionRequest) -> InventionResponse:
+        """Async counterpart of ``_analyze_focused``; identical requests share one call."""
+        focused, base = await run_in_session(
+            self.db, self._find_focused, request.invention_name, request.focus_areas
         )
+        if focused:
+            return focused
+        
+        key = analysis_key(request.invention_name, request.focus_areas)
+        return await _in_flight.do(key, lambda: self._focus_in_flight(request, base))
+    
+    async def _focus_in_flight(
+        self,
+        request: InventionRequest,
+        base: Optional[InventionResponse]
+    ) -> InventionResponse:
+        """Build and store a focused variant on its own session (see ``_analyze_in_flight``)."""
+        db = SessionLocal()
+        try:
+            engine = DiscoveryEngine(db, client=self._client)
+            if base is None:
+                base = await engine.aanalyze_invention(request.model_copy(update={"focus_areas": None}))
+            delta = await self.client.aanalyze_focus(base.analysis, request.focus_areas, refresh=request.refresh)
+            return await run_write(db, engine._save_variant, base, request.focus_areas, delta)
+        finally:
+            db.close()
+    
+    def _find_focused(
+        self,
+        invention_name: str,
+        focus_areas: List[str]
+    ) -> Tuple[Optional[InventionResponse], Optional[InventionResponse]]:
+        """The stored focused analysis, if any, and the base analysis it builds on.
+        
+        The variant is found with one query on its unique key; only a name
+        that is not the invention's own canonical name (an alias or a near
+        duplicate) is resolved to the invention first.
+        """
+        key = focus_key(focus_areas)
+        variant = self._find_variant(canonicalize(invention_name), key)
+        if variant is not None:
+            base = self.get_invention(variant.invention_id)
+        else:
+            base = self._find_existing(invention_name)
+            if base is None:
+                return None, None
+            canonical_name = canonicalize(base.analysis.invention_name)
+            if canonical_name != canonicalize(invention_name):
+                variant = self._find_variant(canonical_name, key)
+        
+        if variant is None or base is None:
+            return None, base
+        return _merge_focus(base, variant.focus_areas, FocusDelta(**variant.delta)), base
+    
+    def get_focused(self, variant_id: int) -> Optional[InventionResponse]:
+        """A stored focused analysis, merged onto the base analysis it builds on."""
+        variant = self.db.get(AnalysisVariantModel, variant_id)
+        if variant is None:
+            return None
+        base = self.get_invention(variant.invention_id)
+        if base is None:
+            return None
+        return _merge_focus(base, variant.focus_areas, FocusDelta(**variant.delta))
+    
+    def _find_variant(self, canonical_name: str, key: str) -> Optional[AnalysisVariantModel]:
+        """The stored variant for an invention, focus key and the configured model."""
+        return self.db.query(AnalysisVariantModel).filter(
+            AnalysisVariantModel.canonical_name == canonical_name,
+            AnalysisVariantModel.focus_key == key,
+            AnalysisVariantModel.model == settings.openai_model
+        ).first()
+    
+    @timed_stage("db_write")
+    def _save_variant(
+        self,
+        base: InventionResponse,
+        focus_areas: List[str],
+        delta: FocusDelta
+    ) -> InventionResponse:
+        """Store what focus areas add to a base analysis and return the merged analysis."""
+        delta = _settle_delta(delta, base.analysis)
+        canonical_name = canonicalize(base.analysis.invention_name)
+        key = focus_key(focus_areas)
+        try:
+            self.db.add(AnalysisVariantModel(
+                invention_id=base.id,
+                canonical_name=canonical_name,
+                focus_key=key,
+                model=settings.openai_model,
+                focus_areas=focus_areas,
+                delta=delta.model_dump(mode="json")
+            ))
+            self.db.commit()
+        except IntegrityError:
+            # Another request stored this variant first
+            self.db.rollback()
+            variant = self._find_variant(canonical_name, key)
+            focus_areas, delta = variant.focus_areas, FocusDelta(**variant.delta)
+        return _merge_focus(base, focus_areas, delta)
+    
+    async def _analyze_in_flight(self, request: InventionRequest, key: str) -> InventionResponse:
+        """Run a coalesced analysis on its own session.
+        
+        The shared work must outlive any single caller, so it cannot borrow
+        the session of the request that happened to start it.
+        """
+        db = SessionLocal()
+        try:
+            engine = DiscoveryEngine(db, client=self._client)
+            if not settings.analysis_lease_enabled:
+                return await engine._analyze_fresh(request)
+            return await engine._analyze_with_lease(request, key)
+        finally:
+            db.close()
+    
+    async def _analyze_with_lease(self, request: InventionRequest, key: str) -> InventionResponse:
+        """Coalesce with other worker processes through a lease row."""
+        lease = AnalysisLease(self.db, key, settings.analysis_lease_seconds)
+        
+        while not await run_write(self.db, lease.acquire):
+            # Another worker is analyzing this invention; wait for its result
+            await asyncio.sleep(settings.analysis_lease_poll_seconds)
+            existing = await run_in_session(self.db, self._find_existing, request.invention_name)
+            if existing:
+                return existing
+        
+        try:
+            # The previous holder may have finished just before we took over
+            existing = await run_in_session(self.db, self._find_existing, request.invention_name)
+            if existing:
+                return existing
+            return await self._analyze_fresh(request)
+        finally:
+            await run_write(self.db, lease.release)
+    
+    async def _analyze_fresh(self, request: InventionRequest) -> InventionResponse:
+        """Ask the LLM for a new analysis and store it."""
+        analysis = await self.client.aanalyze_invention(
+            invention_name=request.invention_name,
+            focus_areas=request.focus_areas,
+            refresh=request.refresh
+        )
+        
+        return await self._astore_requested(request, analysis)
+    
+    async def _astore_requested(self, request: InventionRequest, analysis: InventionAnalysis) -> InventionResponse:
+        """Store a fresh analysis, remembering the name it was requested under."""
+        response = await self._astore_analysis(analysis)
+        if self._needs_alias(request.invention_name, response):
+            await run_write(self.db, self._add_alias, request.invention_name, response.id)
+        return response
+    
+    @staticmethod
+    def _needs_alias(invention_name: str, response: InventionResponse) -> bool:
+        """Whether the analysis came back under a name the request won't resolve to."""
+        return canonicalize(invention_name) != canonicalize(response.analysis.invention_name)
+    
+    def _add_alias(self, invention_name: str, invention_id: int):
+        """Resolve ``invention_name`` to a stored invention from now on."""
+        try:
+            add_alias(self.db, invention_name, invention_id)
+            self.db.commit()
+        except IntegrityError:
+            # Another request recorded the same name first
+            self.db.rollback()
+    
+    def _find_existing(self, invention_name: str) -> Optional[InventionResponse]:
+        """Return the stored analysis for an invention name, if any.
+        
+        Names resolve through their canonical form, earlier requests and
+        near-duplicate matching (see ``naming``).
+        """
+        invention_id = resolve_invention_id(self.db, invention_name)
+        if invention_id is None:
+            return None
+        
+        existing = self._invention_graph().filter(
+            InventionModel.id == invention_id
+        ).first()
+        
+        if existing:
+            return self._model_to_response(existing)
+        return None
+    
+    def _store_analysis(self, analysis: InventionAnalysis) -> InventionResponse:
+        """Persist a fresh analysis and return it as stored."""
+        return self.get_invention(self._write_analysis(analysis))
+    
+    async def _astore_analysis(self, analysis: InventionAnalysis) -> InventionResponse:
+        """Persist a fresh analysis on the writer, then read it back.
+        
+        Only the writes are queued on the single writer; rebuilding the
+        response is read-only and runs alongside other requests.
+        """
+        invention_id = await run_write(self.db, self._write_analysis, analysis)
+        return await run_in_session(self.db, self.get_invention, invention_id)
+    
+    @timed_stage("db_write")
+    def _write_analysis(self, analysis: InventionAnalysis) -> int:
+        """Persist a fresh analysis and its pattern links, returning its id."""
         
         # Store in database
-        invention_model = self._save_analysis(analysis)
+        try:
+            invention_model = self._save_analysis(analysis)
+        except IntegrityError:
+            # Another request stored this invention first
+            self.db.rollback()
+            existing = self.db.query(InventionModel.id).filter(
+                InventionModel.name == analysis.invention_name
+            ).scalar()
+            if existing is not None:
+                return existing
+            raise
         
         # Update patterns
         self._update_patterns(invention_model, analysis)
-        
-        return self._model_to_response(invention_model)
+        return invention_model.id
+    
+    def invention_version(self, invention_id: int) -> Tuple[bool, Optional[datetime]]:
+        """Whether an invention exists, and its ``updated_at`` if so."""
+        row = self.db.query(InventionModel.updated_at).filter(
+            InventionModel.id == invention_id
+        ).first()
+        return (row is not None, row.updated_at if row else None)
     
     def get_invention(self, invention_id: int) -> Optional[InventionResponse]:
         """Get a specific invention analysis."""
-        invention = self.db.query(InventionModel).filter(
+        invention = self._invention_graph().filter(
             InventionModel.id == invention_id
         ).first()
         
@@ -57,23 +485,75 @@ class DiscoveryEngine:
             return self._model_to_response(invention)
         return None
     
-    def list_inventions(self) -> List[Dict]:
-        """List all analyzed inventions."""
-        inventions = self.db.query(InventionModel).all()
-        return [
-            {
-                "id": inv.id,
-                "name": inv.name,
-                "year": inv.year,
-                "summary": inv.summary,
-                "created_at": inv.created_at
-            }
-            for inv in inventions
+    def related_inventions(self, invention_id: int, limit: int = 10) -> Optional[List[RelatedInvention]]:
+        """Stored inventions most similar to one, best first; None if it is not stored."""
+        return related_index.related(self.db, invention_id, limit)
+    
+    def get_discovery_entity(self, entity_id: int) -> Optional[DiscoveryEntity]:
+        """A discovery shared across analyses, with the inventions that include it."""
+        return get_entity(self.db, entity_id)
+    
+    def shared_discoveries(self, invention_id: int) -> Optional[List[DiscoveryEntity]]:
+        """Discoveries of an invention that other inventions build on too; None if it is not stored."""
+        if self.db.get(InventionModel, invention_id) is None:
+            return None
+        return shared_entities(self.db, invention_id)
+    
+    def list_inventions(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        pattern: Optional[PatternType] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """List analyzed inventions one page at a time.
+        
+        Pages are keyset-paginated on (created_at, id) and only the requested
+        columns are selected, so the large text columns are never read.
+        Returns the page and the cursor for the next one (None at the end).
+        """
+        fields = fields or list(DEFAULT_LIST_FIELDS)
+        unknown = set(fields) - set(LIST_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        
+        # The keyset columns are always selected to build the next cursor
+        columns = [InventionModel.created_at, InventionModel.id] + [
+            getattr(InventionModel, field) for field in fields
         ]
+        query = self.db.query(*columns)
+        
+        if cursor:
+            created_at, invention_id = _decode_cursor(cursor)
+            query = query.filter(or_(
+                InventionModel.created_at > created_at,
+                and_(InventionModel.created_at == created_at, InventionModel.id > invention_id)
+            ))
+        if year_from is not None:
+            query = query.filter(InventionModel.year >= year_from)
+        if year_to is not None:
+            query = query.filter(InventionModel.year <= year_to)
+        if pattern is not None:
+            query = query.filter(InventionModel.patterns.any(PatternModel.pattern_type == pattern.value))
+        
+        # Fetch one extra row to learn whether another page exists
+        rows = query.order_by(InventionModel.created_at, InventionModel.id).limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][0], rows[-1][1])
+        
+        page = [dict(zip(fields, row[2:])) for row in rows]
+        return page, next_cursor
     
     def get_patterns(self) -> List[PatternAnalysis]:
         """Get all identified patterns across inventions."""
-        patterns = self.db.query(PatternModel).all()
+        patterns = self.db.query(PatternModel).options(
+            selectinload(PatternModel.inventions).load_only(InventionModel.name)
+        ).all()
         return [
             PatternAnalysis(
                 pattern_type=PatternType(p.pattern_type),
@@ -85,12 +565,42 @@ class DiscoveryEngine:
             for p in patterns
         ]
     
+    def _invention_graph(self):
+        """Query inventions with everything ``_model_to_response`` touches.
+        
+        Discoveries, their outgoing connections and patterns are each loaded
+        with one extra SELECT ... IN query, so serializing an invention costs
+        a constant number of queries however long its discovery chain is.
+        """
+        return self.db.query(InventionModel).options(
+            selectinload(InventionModel.discoveries).selectinload(DiscoveryModel.connections_from),
+            selectinload(InventionModel.patterns)
+        )
+    
     def _save_analysis(self, analysis: InventionAnalysis) -> InventionModel:
         """Save invention analysis to database."""
+        invention = self._add_analysis(analysis)
+        self.db.commit()
+        self.db.refresh(invention)
+        self._after_commit(invention.id, analysis)
+        
+        return invention
+    
+    def _after_commit(self, invention_id: int, analysis: InventionAnalysis):
+        """Bring in-memory indexes up to date with a newly committed analysis.
+        
+        Every path that stores analyses calls this once its transaction
+        commits, whether it stores them one at a time or in batches.
+        """
+        related_index.add_analysis(invention_id, analysis)
+    
+    def _add_analysis(self, analysis: InventionAnalysis) -> InventionModel:
+        """Add an invention and its discovery graph to the session, uncommitted."""
         
         # Create invention model
         invention = InventionModel(
             name=analysis.invention_name,
+            canonical_name=canonicalize(analysis.invention_name),
             year=analysis.invention_year,
             summary=analysis.summary,
             narrative=analysis.narrative,
@@ -122,6 +632,10 @@ class DiscoveryEngine:
             disc_id = disc.id or str(uuid.uuid4())
             discovery_map[disc_id] = discovery_model
         
+        # Shared discovery entities; linked before the flush so the
+        # discoveries are inserted with their entity ids
+        link_discoveries(self.db, invention.discoveries)
+        
         # Save to get IDs
         self.db.add(invention)
         self.db.flush()
@@ -137,33 +651,37 @@ class DiscoveryEngine:
                 )
                 self.db.add(connection)
         
-        self.db.commit()
-        self.db.refresh(invention)
+        # Name trigrams for near-duplicate lookup
+        index_name(self.db, invention)
+        
+        # Full-text search rows for the invention and its discoveries
+        index_invention(self.db, invention)
+        
+        # Theme tags and timeline row, read by /patterns/themes and /patterns/timeline
+        add_aggregates(
+            self.db,
+            invention,
+            analysis.discoveries[0].title if analysis.discoveries else None
+        )
         
         return invention
     
     def _update_patterns(self, invention: InventionModel, analysis: InventionAnalysis):
         """Update pattern analysis with new invention."""
+        self._link_patterns(invention, analysis)
+        self.db.commit()
+    
+    def _link_patterns(self, invention: InventionModel, analysis: InventionAnalysis):
+        """Link an invention to its patterns in the session, uncommitted."""
         
+        linked = 0
         for pattern_type in analysis.patterns_identified:
-            # Check if pattern exists
-            pattern = self.db.query(PatternModel).filter(
-                PatternModel.pattern_type == pattern_type.value
-            ).first()
-            
-            if not pattern:
-                # Create new pattern
-                pattern = PatternModel(
-                    pattern_type=pattern_type.value,
-                    description=f"Pattern: {pattern_type.value}",
-                    insights="",
-                    examples=[]
-                )
-                self.db.add(pattern)
+            pattern = self._get_or_create_pattern(pattern_type)
             
             # Add invention to pattern
             if invention not in pattern.inventions:
                 pattern.inventions.append(invention)
+                linked += 1
             
             # Update examples if we have pattern explanations
             if pattern_type.value in analysis.pattern_explanations:
@@ -175,8 +693,38 @@ class DiscoveryEngine:
                     "explanation": analysis.pattern_explanations[pattern_type.value]
                 })
         
-        self.db.commit()
+        count_pattern_links(self.db, invention.id, linked)
+        if linked:
+            # Cached representations of the invention include its patterns
+            invention.updated_at = datetime.utcnow()
     
+    def _get_or_create_pattern(self, pattern_type: PatternType) -> PatternModel:
+        """Fetch a pattern row, creating it if no request has yet."""
+        # Check if pattern exists
+        pattern = self.db.query(PatternModel).filter(
+            PatternModel.pattern_type == pattern_type.value
+        ).first()
+        
+        if pattern:
+            return pattern
+        
+        # Create new pattern; a concurrent analysis may win the insert
+        try:
+            with self.db.begin_nested():
+                pattern = PatternModel(
+                    pattern_type=pattern_type.value,
+                    description=f"Pattern: {pattern_type.value}",
+                    insights="",
+                    examples=[]
+                )
+                self.db.add(pattern)
+            return pattern
+        except IntegrityError:
+            return self.db.query(PatternModel).filter(
+                PatternModel.pattern_type == pattern_type.value
+            ).one()
+    
+    @timed_stage("serialize")
     def _model_to_response(self, invention: InventionModel) -> InventionResponse:
         """Convert database model to response schema."""
         
@@ -228,5 +776,10 @@ class DiscoveryEngine:
         return InventionResponse(
             analysis=analysis,
             id=invention.id,
-            created_at=invention.created_at
+            created_at=invention.created_at,
+            discovery_entities={
+                str(disc.id): disc.entity_id
+                for disc in invention.discoveries
+                if disc.entity_id is not None
+            }
         )
\ No newline at end of file
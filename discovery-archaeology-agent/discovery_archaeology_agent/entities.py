@@ -0,0 +1,273 @@
+"""Discovery entities: one row per discovery, however many analyses mention it."""
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import DiscoveryEntityKeyModel, DiscoveryEntityModel, DiscoveryModel, InventionModel
+from .naming import canonicalize, similarity, trigrams
+from .schemas import DiscoveryEntity, DiscoveryOccurrence
+
+# Words that say what kind of event a title describes rather than which
+# one ("Invention of the transistor" -> "transistor")
+TITLE_STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "by", "for", "and", "to", "from", "with", "as",
+    "discovery", "discovers", "discovered", "invention", "invents", "invented",
+    "first", "development", "develops", "developed"
+}
+
+_NUMBERS = re.compile(r"\d+")
+
+# Years two accounts of the same discovery may differ by
+YEAR_TOLERANCE = 1
+
+# Title similarity needed when the discoverers overlap, and when both
+# accounts name discoverers but none in common; discovery_match_threshold
+# applies when either names none
+SHARED_DISCOVERERS_THRESHOLD = 0.5
+DISJOINT_DISCOVERERS_THRESHOLD = 0.9
+
+# Most candidates, by blocking keys in common, compared per discovery
+MATCH_CANDIDATES = 10
+
+
+def canonical_title(title: str) -> str:
+    """A discovery title reduced to the words that tell discoveries apart."""
+    words = canonicalize(title or "").split()
+    kept = [word for word in words if word not in TITLE_STOPWORDS]
+    return " ".join(kept or words)
+
+
+def surnames(discoverers: Optional[Iterable[str]]) -> List[str]:
+    """Canonical last names of the discoverers ("J. Bardeen" -> "bardeen"), sorted."""
+    names = set()
+    for person in discoverers or []:
+        words = canonicalize(person).split() if person and person.strip() else []
+        if words:
+            names.add(words[-1])
+    return sorted(names)
+
+
+def _entity_keys(title: str, year: Optional[int], people: List[str]) -> Set[str]:
+    """Blocking keys stored for an account of a discovery.
+    
+    The exact title, and each title word and discoverer in the year (or
+    each discoverer alone when the year is unknown). A block holds the
+    discoveries of one word or person in one year, so blocks stay small
+    however large the corpus grows.
+    """
+    keys = {f"title:{title}"}
+    if year is not None:
+        keys.update(f"word:{word}:{year}" for word in title.split() if len(word) > 2)
+        keys.update(f"person:{name}:{year}" for name in people)
+    else:
+        keys.update(f"person:{name}" for name in people)
+    return keys
+
+
+def _lookup_keys(title: str, year: Optional[int], people: List[str]) -> Set[str]:
+    """Blocking keys of every stored account that may be the same discovery."""
+    keys = {f"title:{title}"}
+    keys.update(f"person:{name}" for name in people)
+    if year is not None:
+        for near in range(year - YEAR_TOLERANCE, year + YEAR_TOLERANCE + 1):
+            keys.update(f"word:{word}:{near}" for word in title.split() if len(word) > 2)
+            keys.update(f"person:{name}:{near}" for name in people)
+    return keys
+
+
+def _match_score(
+    title: str,
+    year: Optional[int],
+    people: List[str],
+    entity: DiscoveryEntityModel
+) -> Optional[float]:
+    """Title similarity to an entity, or None if they are different discoveries."""
+    if year is not None and entity.year is not None and abs(year - entity.year) > YEAR_TOLERANCE:
+        return None
+    if _NUMBERS.findall(title) != _NUMBERS.findall(entity.canonical_title):
+        return None
+    
+    threshold = settings.discovery_match_threshold
+    if threshold < 1:
+        known = entity.discoverers or []
+        if set(people) & set(known):
+            threshold = SHARED_DISCOVERERS_THRESHOLD
+        elif people and known:
+            threshold = DISJOINT_DISCOVERERS_THRESHOLD
+    
+    score = 1.0 if title == entity.canonical_title else similarity(trigrams(title), trigrams(entity.canonical_title))
+    return score if score >= threshold else None
+
+
+def link_discoveries(db: Session, discoveries: List[DiscoveryModel]):
+    """Link discoveries to the entities they are accounts of, uncommitted.
+    
+    Candidates are the entities sharing a blocking key with a discovery
+    (found through the key table's primary key, so the cost depends on
+    block sizes rather than the number of entities); the best match wins,
+    and a discovery matching none starts a new entity. Runs before or
+    after the discoveries are flushed; linking persistent ones updates
+    them.
+    """
+    accounts = [
+        (discovery, canonical_title(discovery.title), discovery.year, surnames(discovery.discoverers))
+        for discovery in discoveries
+        if discovery.entity_id is None and discovery.entity is None
+    ]
+    if not accounts:
+        return
+    lookups = [_lookup_keys(title, year, people) for _, title, year, people in accounts]
+    
+    blocks: Dict[str, List[int]] = {}
+    known: Set[Tuple[str, int]] = set()
+    for key, entity_id in db.query(
+        DiscoveryEntityKeyModel.key, DiscoveryEntityKeyModel.entity_id
+    ).filter(
+        DiscoveryEntityKeyModel.key.in_(set().union(*lookups))
+    ):
+        blocks.setdefault(key, []).append(entity_id)
+        known.add((key, entity_id))
+    
+    shortlists = [
+        [entity_id for entity_id, _ in Counter(
+            entity_id for key in keys for entity_id in blocks.get(key, ())
+        ).most_common(MATCH_CANDIDATES)]
+        for keys in lookups
+    ]
+    candidate_ids = {entity_id for shortlist in shortlists for entity_id in shortlist}
+    entities = {
+        entity.id: entity
+        for entity in db.query(DiscoveryEntityModel).filter(DiscoveryEntityModel.id.in_(candidate_ids))
+    } if candidate_ids else {}
+    
+    # Entities started by earlier discoveries of this call, with their keys
+    created: List[Tuple[DiscoveryEntityModel, Set[str]]] = []
+    for (discovery, title, year, people), keys, shortlist in zip(accounts, lookups, shortlists):
+        candidates = [entities[entity_id] for entity_id in shortlist if entity_id in entities]
+        candidates.extend(entity for entity, entity_keys in created if entity_keys & keys)
+        scored = [
+            (score, index, entity)
+            for index, entity in enumerate(candidates)
+            for score in [_match_score(title, year, people, entity)]
+            if score is not None
+        ]
+        stored_keys = _entity_keys(title, year, people)
+        if not scored:
+            entity = DiscoveryEntityModel(
+                title=discovery.title, canonical_title=title, year=year, discoverers=people,
+                keys=[DiscoveryEntityKeyModel(key=key) for key in stored_keys]
+            )
+            db.add(entity)
+            discovery.entity = entity
+            created.append((entity, stored_keys))
+            continue
+        
+        # Best score, then the earliest candidate (most keys in common)
+        _, _, entity = max(scored, key=lambda match: (match[0], -match[1]))
+        discovery.entity = entity
+        if entity.year is None and year is not None:
+            entity.year = year
+        merged = sorted(set(entity.discoverers or []) | set(people))
+        if merged != (entity.discoverers or []):
+            entity.discoverers = merged
+        
+        # This account's keys, so later variants of it find the entity
+        if entity.id is None:
+            for pending, pending_keys in created:
+                if pending is entity:
+                    entity.keys.extend(DiscoveryEntityKeyModel(key=key) for key in stored_keys - pending_keys)
+                    pending_keys.update(stored_keys)
+        else:
+            for key in stored_keys:
+                if (key, entity.id) not in known:
+                    db.add(DiscoveryEntityKeyModel(key=key, entity_id=entity.id))
+                    known.add((key, entity.id))
+
+
+def backfill_entities(db: Session, batch_size: int = 500) -> int:
+    """Link discoveries stored before discovery entities existed.
+    
+    Returns the number of discoveries linked.
+    """
+    missing = db.query(DiscoveryModel).filter(
+        DiscoveryModel.entity_id.is_(None)
+    ).order_by(DiscoveryModel.id)
+    
+    count = 0
+    while True:
+        discoveries = missing.limit(batch_size).all()
+        if not discoveries:
+            return count
+        link_discoveries(db, discoveries)
+        db.commit()
+        count += len(discoveries)
+
+
+def _occurrences(
+    db: Session,
+    entity_ids: Iterable[int],
+    exclude_invention_id: Optional[int] = None
+) -> Dict[int, List[DiscoveryOccurrence]]:
+    """The inventions whose analyses include each entity, oldest first."""
+    query = db.query(
+        DiscoveryModel.entity_id, DiscoveryModel.id, InventionModel.id, InventionModel.name, InventionModel.year
+    ).join(
+        InventionModel, InventionModel.id == DiscoveryModel.invention_id
+    ).filter(
+        DiscoveryModel.entity_id.in_(list(entity_ids))
+    )
+    if exclude_invention_id is not None:
+        query = query.filter(DiscoveryModel.invention_id != exclude_invention_id)
+    
+    occurrences: Dict[int, List[DiscoveryOccurrence]] = {}
+    for entity_id, discovery_id, invention_id, name, year in query.order_by(DiscoveryModel.id):
+        occurrences.setdefault(entity_id, []).append(DiscoveryOccurrence(
+            invention_id=invention_id, invention_name=name, invention_year=year, discovery_id=discovery_id
+        ))
+    return occurrences
+
+
+def _to_schema(entity: DiscoveryEntityModel, inventions: List[DiscoveryOccurrence]) -> DiscoveryEntity:
+    return DiscoveryEntity(
+        id=entity.id,
+        title=entity.title,
+        year=entity.year,
+        discoverers=entity.discoverers or [],
+        inventions=inventions
+    )
+
+
+def get_entity(db: Session, entity_id: int) -> Optional[DiscoveryEntity]:
+    """A discovery entity and every invention whose analysis includes it."""
+    entity = db.get(DiscoveryEntityModel, entity_id)
+    if entity is None:
+        return None
+    return _to_schema(entity, _occurrences(db, [entity_id]).get(entity_id, []))
+
+
+def shared_entities(db: Session, invention_id: int) -> List[DiscoveryEntity]:
+    """The discoveries of an invention that other inventions' analyses include too.
+    
+    Each lists the other inventions only; discoveries unique to this
+    invention are left out.
+    """
+    entity_ids = [
+        row.entity_id for row in db.query(DiscoveryModel.entity_id).filter(
+            DiscoveryModel.invention_id == invention_id,
+            DiscoveryModel.entity_id.isnot(None)
+        ).order_by(DiscoveryModel.id)
+    ]
+    if not entity_ids:
+        return []
+    occurrences = _occurrences(db, entity_ids, exclude_invention_id=invention_id)
+    shared = [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id in occurrences]
+    if not shared:
+        return []
+    entities = {
+        entity.id: entity
+        for entity in db.query(DiscoveryEntityModel).filter(DiscoveryEntityModel.id.in_(shared))
+    }
+    return [_to_schema(entities[entity_id], occurrences[entity_id]) for entity_id in shared]
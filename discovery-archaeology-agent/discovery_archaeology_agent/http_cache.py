@@ -0,0 +1,149 @@
+"""Serialized response bodies, ETags and conditional GETs for read endpoints."""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, NamedTuple, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from .config import settings
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson (the fast-json extra)
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode the values JSON has no type for, as FastAPI would."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def json_bytes(content: Any) -> bytes:
+    """Encode a response body as compact UTF-8 JSON.
+    
+    A pydantic model uses its compiled serializer; other payloads use
+    ``orjson`` when it is installed and the standard library otherwise.
+    """
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode()
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+class CachedBody(NamedTuple):
+    """A serialized response body and its strong ETag."""
+    body: bytes
+    etag: str
+
+
+def cached_body(body: bytes) -> CachedBody:
+    """Pair a body with a strong ETag derived from its bytes."""
+    return CachedBody(body, '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"')
+
+
+class BodyCache:
+    """Per-process LRU of serialized bodies, each valid for one row version.
+    
+    An entry is only returned while the row's ``updated_at`` still matches
+    the one it was built from, so a changed row is rebuilt on its next read.
+    Without ``max_entries`` the size is ``http_cache_max_entries``, read when
+    the cache is first used rather than when it is created.
+    """
+    
+    def __init__(self, max_entries: Optional[int] = None):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is None:
+            self._max_entries = settings.http_cache_max_entries
+        return self._max_entries
+    
+    def get(self, key: Any, version: Optional[datetime]) -> Optional[CachedBody]:
+        """The cached body for ``key`` at ``version``, if there is one."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: Any, version: Optional[datetime], body: bytes) -> CachedBody:
+        """Cache a body for ``key`` at ``version`` and return it with its ETag."""
+        cached = cached_body(body)
+        if self.max_entries <= 0:
+            return cached
+        with self._lock:
+            self._entries[key] = (version, cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+    
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Bodies of GET /inventions/{id}, keyed by invention id
+invention_bodies = BodyCache()
+
+
+def detail_cache_control() -> str:
+    """``Cache-Control`` for a stored analysis, which does not change."""
+    return (
+        f"public, max-age={settings.http_cache_max_age}, "
+        f"s-maxage={settings.http_cache_shared_max_age}"
+    )
+
+
+# Collections change as analyses are added; caches may store them but
+# must revalidate with the ETag before every reuse
+COLLECTION_CACHE_CONTROL = "public, no-cache"
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def conditional_response(
+    request: Request,
+    cached: CachedBody,
+    cache_control: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """A 200 with the body, or a bodiless 304 if the client already has it."""
+    headers = {**(headers or {}), "ETag": cached.etag, "Cache-Control": cache_control}
+    if _matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def json_response(
+    request: Request,
+    content: Any,
+    cache_control: str = COLLECTION_CACHE_CONTROL,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Encode ``content`` and answer with ``conditional_response``."""
+    return conditional_response(request, cached_body(json_bytes(content)), cache_control, headers)
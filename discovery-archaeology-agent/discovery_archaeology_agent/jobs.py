@@ -0,0 +1,215 @@
+"""Persistent job queue for background invention analysis."""
+import asyncio
+import functools
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import SessionLocal, run_in_session, run_write
+from .discovery_engine import DiscoveryEngine, focus_key
+from .models import JobModel
+from .naming import canonicalize
+from .schemas import InventionRequest, JobResponse, JobStatus
+
+
+class JobQueue:
+    """Bounded pool of workers draining analysis jobs stored in the database.
+    
+    Jobs survive restarts: a running job keeps a heartbeat, and any worker
+    (in this or another process) reclaims a running job whose heartbeat has
+    gone stale. Claims are conditional updates, so two workers never run
+    the same job.
+    """
+    
+    def __init__(self):
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+    
+    async def start(self):
+        """Start the worker pool."""
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(settings.job_workers)
+        ]
+    
+    async def stop(self):
+        """Stop the worker pool; interrupted jobs resume after a restart."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+    
+    async def submit(self, db: Session, request: InventionRequest) -> JobResponse:
+        """Queue an analysis and return its job.
+        
+        The insert goes through the writer thread like every other job
+        update, so a burst of submits never contends with running jobs.
+        """
+        job_id = await run_write(None, self._insert, request)
+        return await run_in_session(db, self.get, db, job_id)
+    
+    def _insert(self, request: InventionRequest) -> str:
+        with SessionLocal() as db:
+            job = JobModel(
+                id=uuid.uuid4().hex,
+                status=JobStatus.QUEUED.value,
+                invention_name=request.invention_name,
+                focus_areas=request.focus_areas,
+                refresh=request.refresh,
+                attempts=0
+            )
+            db.add(job)
+            db.commit()
+            return job.id
+    
+    def notify(self):
+        """Wake idle workers after a submit."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    def get(self, db: Session, job_id: str) -> Optional[JobResponse]:
+        """Get a job's status, with its result once done."""
+        job = db.query(JobModel).filter(JobModel.id == job_id).first()
+        if job:
+            return self._to_response(db, job)
+        return None
+    
+    async def _worker(self):
+        """Claim and run jobs until cancelled."""
+        while True:
+            job_id = await run_write(None, self._claim_next)
+            if job_id is None:
+                await self._idle()
+                continue
+            await self._run(job_id)
+    
+    async def _idle(self):
+        """Sleep until a submit or the next poll, whichever comes first."""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=settings.job_poll_seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    def _claim_next(self) -> Optional[str]:
+        """Mark the oldest runnable job as running and return its id."""
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.job_heartbeat_seconds * 3)
+        runnable = or_(
+            JobModel.status == JobStatus.QUEUED.value,
+            (JobModel.status == JobStatus.RUNNING.value) & (JobModel.heartbeat_at < stale)
+        )
+        
+        with SessionLocal() as db:
+            while True:
+                job = db.query(JobModel).filter(runnable).order_by(JobModel.created_at).first()
+                if job is None:
+                    return None
+                
+                if job.attempts >= settings.job_max_attempts:
+                    # Abandoned too many times; most likely it kills its worker
+                    job.status = JobStatus.FAILED.value
+                    job.error = "Job abandoned too many times"
+                    db.commit()
+                    continue
+                
+                claimed = db.query(JobModel).filter(
+                    JobModel.id == job.id, runnable
+                ).update({
+                    "status": JobStatus.RUNNING.value,
+                    "attempts": JobModel.attempts + 1,
+                    "heartbeat_at": now
+                }, synchronize_session=False)
+                db.commit()
+                if claimed == 1:
+                    return job.id
+    
+    async def _run(self, job_id: str):
+        """Run one claimed job and record its outcome."""
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        db = SessionLocal()
+        try:
+            job = await run_in_session(db, db.get, JobModel, job_id)
+            request = InventionRequest(
+                invention_name=job.invention_name,
+                focus_areas=job.focus_areas,
+                refresh=bool(job.refresh)
+            )
+            engine = DiscoveryEngine(db)
+            result = await engine.aanalyze_invention(request)
+            
+            # A focused result is stored as a variant of the base analysis
+            variant_id = None
+            if result.focus is not None:
+                variant = await run_in_session(
+                    db, engine._find_variant, canonicalize(result.analysis.invention_name), focus_key(job.focus_areas)
+                )
+                variant_id = variant.id if variant else None
+            await run_write(None, functools.partial(
+                self._finish, job_id, JobStatus.DONE, invention_id=result.id, variant_id=variant_id
+            ))
+        except asyncio.CancelledError:
+            # Shutting down; the stale heartbeat lets the job resume later
+            raise
+        except Exception as e:
+            await run_write(None, functools.partial(self._finish, job_id, JobStatus.FAILED, error=str(e)))
+        finally:
+            heartbeat.cancel()
+            db.close()
+    
+    async def _heartbeat(self, job_id: str):
+        """Keep a running job from looking abandoned."""
+        while True:
+            await asyncio.sleep(settings.job_heartbeat_seconds)
+            await run_write(None, self._touch, job_id)
+    
+    def _touch(self, job_id: str):
+        with SessionLocal() as db:
+            db.query(JobModel).filter(
+                JobModel.id == job_id,
+                JobModel.status == JobStatus.RUNNING.value
+            ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+    
+    def _finish(
+        self,
+        job_id: str,
+        status: JobStatus,
+        invention_id: Optional[int] = None,
+        variant_id: Optional[int] = None,
+        error: Optional[str] = None
+    ):
+        with SessionLocal() as db:
+            db.query(JobModel).filter(JobModel.id == job_id).update({
+                "status": status.value,
+                "invention_id": invention_id,
+                "variant_id": variant_id,
+                "error": error,
+                "updated_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+    
+    def _to_response(self, db: Session, job: JobModel) -> JobResponse:
+        result = None
+        if job.status == JobStatus.DONE.value and job.variant_id is not None:
+            result = DiscoveryEngine(db).get_focused(job.variant_id)
+        elif job.status == JobStatus.DONE.value and job.invention_id is not None:
+            result = DiscoveryEngine(db).get_invention(job.invention_id)
+        
+        return JobResponse(
+            id=job.id,
+            status=JobStatus(job.status),
+            invention_name=job.invention_name,
+            attempts=job.attempts or 0,
+            error=job.error,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+            result=result
+        )
+
+
+job_queue = JobQueue()
@@ -0,0 +1,155 @@
+"""Persistent LLM response cache keyed by prompt fingerprint."""
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from .config import settings
+from .database import SessionLocal, queue_write
+from .models import LLMCacheModel
+from .metrics import llm_cache
+
+# Only bump a hit entry's LRU timestamp once per interval, so hot
+# entries don't turn every cache hit into a write; the hits in between
+# are counted in memory and written with the next bump
+TOUCH_INTERVAL = timedelta(minutes=1)
+
+# ResponseCache counter -> daa_llm_cache_total result label
+CACHE_RESULTS = {"hits": "hit", "misses": "miss", "evictions": "eviction"}
+
+
+class ResponseCache:
+    """Content-addressed store of raw LLM completions in the app database.
+    
+    Entries are keyed by the model name, the rendered messages and the call
+    parameters. They expire after ``llm_cache_ttl_seconds`` and the least
+    recently used entries are evicted beyond ``llm_cache_max_entries``.
+    """
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._unwritten_hits: Dict[str, int] = {}  # per key, since its last bump
+    
+    @staticmethod
+    def key(model: str, messages: List[Any], params: Dict[str, Any]) -> str:
+        """Fingerprint a call from its model, messages and parameters."""
+        payload = json.dumps({
+            "model": model,
+            "messages": [[message.type, message.content] for message in messages],
+            "params": params
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for a key, or None on a miss.
+        
+        Only reads on the calling thread; dropping an expired entry and
+        bumping a hit's LRU timestamp are queued as writes.
+        """
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            entry = db.get(LLMCacheModel, key)
+            
+            expires = now - timedelta(seconds=settings.llm_cache_ttl_seconds)
+            if entry and entry.created_at < expires:
+                queue_write(self._expire, key, expires)
+                entry = None
+            
+            if not entry:
+                self._count("misses")
+                return None
+            
+            with self._lock:
+                hits = self._unwritten_hits.get(key, 0) + 1
+                due = entry.accessed_at < now - TOUCH_INTERVAL
+                if due:
+                    self._unwritten_hits.pop(key, None)
+                else:
+                    self._unwritten_hits[key] = hits
+            if due:
+                queue_write(self._touch, key, now, hits)
+            
+            self._count("hits")
+            return entry.content
+    
+    def _expire(self, key: str, expires: datetime):
+        """Delete an entry unless it was stored again since it expired."""
+        with SessionLocal() as db:
+            db.query(LLMCacheModel).filter(
+                LLMCacheModel.key == key,
+                LLMCacheModel.created_at < expires
+            ).delete(synchronize_session=False)
+            db.commit()
+    
+    def _touch(self, key: str, now: datetime, hits: int):
+        """Add the hits counted since the last bump and bump the LRU timestamp."""
+        with SessionLocal() as db:
+            db.query(LLMCacheModel).filter(LLMCacheModel.key == key).update({
+                "accessed_at": now,
+                "hits": func.coalesce(LLMCacheModel.hits, 0) + hits
+            }, synchronize_session=False)
+            db.commit()
+    
+    def put(self, key: str, model: str, content: str):
+        """Store a completion and evict the least recently used overflow."""
+        with SessionLocal() as db:
+            try:
+                db.merge(LLMCacheModel(
+                    key=key,
+                    model=model,
+                    content=content,
+                    hits=0,
+                    created_at=datetime.utcnow(),
+                    accessed_at=datetime.utcnow()
+                ))
+                db.commit()
+            except IntegrityError:
+                # A concurrent identical call stored the same key first
+                db.rollback()
+                return
+            
+            overflow = db.query(func.count(LLMCacheModel.key)).scalar() - settings.llm_cache_max_entries
+            if overflow > 0:
+                oldest = db.query(LLMCacheModel.key).order_by(LLMCacheModel.accessed_at).limit(overflow)
+                db.query(LLMCacheModel).filter(
+                    LLMCacheModel.key.in_(oldest.scalar_subquery())
+                ).delete(synchronize_session=False)
+                db.commit()
+                self._count("evictions", overflow)
+    
+    def clear(self):
+        """Drop every cached completion."""
+        with SessionLocal() as db:
+            db.query(LLMCacheModel).delete()
+            db.commit()
+        with self._lock:
+            self._unwritten_hits.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and the stored entry count."""
+        with SessionLocal() as db:
+            entries = db.query(func.count(LLMCacheModel.key)).scalar()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.llm_cache_enabled,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+    
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+        llm_cache.inc(amount, result=CACHE_RESULTS[counter])
+
+
+response_cache = ResponseCache()
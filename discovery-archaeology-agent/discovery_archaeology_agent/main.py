@@ -1,11 +1,16 @@
 """Main entry point for the Discovery Archaeology Agent."""
-import uvicorn
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
 from .config import settings
-from .api import app
 
 
-def main():
-    """Run the application."""
+def serve(args: argparse.Namespace):
+    """Run the API server."""
+    import uvicorn
+    
     uvicorn.run(
         "discovery_archaeology_agent.api:app",
         host=settings.api_host,
@@ -14,5 +19,81 @@ def main():
     )
 
 
+def read_names(names: List[str], file: Optional[str]) -> List[str]:
+    """Names from the command line plus one per line of a file ("-" for stdin)."""
+    names = list(names)
+    if file:
+        handle = sys.stdin if file == "-" else open(file, encoding="utf-8")
+        with handle:
+            names.extend(line.strip() for line in handle if line.strip() and not line.startswith("#"))
+    return names
+
+
+async def _run_batch(args: argparse.Namespace) -> int:
+    from .batch import BatchAnalyzer
+    from .database import SessionLocal, init_db
+    from .openai_client import close_client
+    
+    names = read_names(args.names, args.file)
+    if not names:
+        print("No invention names given", file=sys.stderr)
+        return 2
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        batch = BatchAnalyzer(
+            db,
+            concurrency=args.concurrency,
+            tokens_per_minute=args.tokens_per_minute,
+            commit_size=args.commit_size
+        )
+        async for progress in batch.run(names, focus_areas=args.focus, refresh=args.refresh):
+            detail = progress.error if progress.error else f"id={progress.invention_id}"
+            print(
+                f"[{progress.completed}/{progress.total}] {progress.status.value:<8} "
+                f"{progress.invention_name} ({detail})",
+                flush=True
+            )
+    finally:
+        db.close()
+        await close_client()
+    
+    summary = batch.summary
+    print(f"analyzed={summary.analyzed} skipped={summary.skipped} failed={summary.failed}")
+    return 1 if summary.failed else 0
+
+
+def batch(args: argparse.Namespace):
+    """Analyze many inventions from the command line."""
+    sys.exit(asyncio.run(_run_batch(args)))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command-line interface; with no command the API server runs."""
+    parser = argparse.ArgumentParser(prog="discovery_archaeology_agent", description=settings.app_name)
+    commands = parser.add_subparsers(dest="command")
+    
+    commands.add_parser("serve", help="run the API server").set_defaults(func=serve)
+    
+    batch_parser = commands.add_parser("batch", help="analyze many inventions")
+    batch_parser.add_argument("names", nargs="*", help="invention names")
+    batch_parser.add_argument("-f", "--file", help="file with one invention name per line, or - for stdin")
+    batch_parser.add_argument("--focus", action="append", help="focus area for every invention (repeatable)")
+    batch_parser.add_argument("--concurrency", type=int, help=f"concurrent LLM calls (default {settings.batch_concurrency})")
+    batch_parser.add_argument("--tokens-per-minute", type=int, help="token budget, 0 for none (default from settings)")
+    batch_parser.add_argument("--commit-size", type=int, help=f"analyses per transaction (default {settings.batch_commit_size})")
+    batch_parser.add_argument("--refresh", action="store_true", help="bypass the LLM response cache")
+    batch_parser.set_defaults(func=batch)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the application."""
+    args = build_parser().parse_args(argv)
+    getattr(args, "func", serve)(args)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,284 @@
+"""Prometheus metrics and per-request stage timings."""
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import settings
+
+# Seconds; spans in-process stages (sub-millisecond) through LLM calls (minutes)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels."""
+    
+    type = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+    
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in sorted(values):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets."""
+    
+    type = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels: str):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+    
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        for key, counts, total, count in sorted(values):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+
+
+class Registry:
+    """The metrics exposed on ``/metrics``."""
+    
+    def __init__(self):
+        self._metrics: List = []
+    
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "daa_http_request_seconds", "HTTP request latency.", ("method", "route", "status")
+)
+stage_seconds = registry.histogram(
+    "daa_stage_seconds", "Time spent in each processing stage.", ("stage",)
+)
+db_queries = registry.counter("daa_db_queries_total", "SQL statements executed.")
+db_queries_per_request = registry.histogram(
+    "daa_db_queries_per_request", "SQL statements executed per HTTP request.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+llm_requests = registry.counter("daa_llm_requests_total", "LLM API calls.", ("kind",))
+llm_tokens = registry.counter("daa_llm_tokens_total", "LLM tokens reported by the API.", ("direction",))
+llm_cache = registry.counter("daa_llm_cache_total", "LLM response cache lookups.", ("result",))
+parse_fallbacks = registry.counter(
+    "daa_parse_fallbacks_total", "Responses parsed only by extracting the outermost JSON object.", ("kind",)
+)
+parse_failures = registry.counter("daa_parse_failures_total", "Responses that could not be parsed.", ("kind",))
+
+
+class RequestStats:
+    """Stage timings and query count for the request being served."""
+    
+    __slots__ = ("stages", "queries")
+    
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.queries = 0
+    
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+    
+    def server_timing(self, total: float) -> str:
+        """A ``Server-Timing`` header value (durations in milliseconds)."""
+        parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items()]
+        parts.append(f'db-queries;desc="{self.queries}"')
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+# Set for the duration of each HTTP request; copied into worker threads
+# by asyncio.to_thread, run_write and Starlette's threadpool
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record time spent in a stage, globally and for the current request."""
+    stage_seconds.observe(seconds, stage=stage)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time the block as ``stage``."""
+    if not settings.metrics_enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def timed_stage(stage: str) -> Callable:
+    """Decorator form of ``timed`` for plain functions."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_query(*args):
+    """``before_cursor_execute`` listener counting statements."""
+    db_queries.inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+
+
+def record_usage(kind: str, response):
+    """Count an LLM call and the tokens its response reports."""
+    if not settings.metrics_enabled:
+        return
+    llm_requests.inc(kind=kind)
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        llm_tokens.inc(usage.get("input_tokens", 0), direction="in")
+        llm_tokens.inc(usage.get("output_tokens", 0), direction="out")
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request.
+    
+    Tracks a ``RequestStats`` for the request and, when enabled, reports it
+    in a ``Server-Timing`` response header. Streamed bodies are timed up to
+    the start of the response. ``metrics_enabled`` and, unless
+    ``server_timing`` is given, ``server_timing_enabled`` are read per
+    request, so adding the middleware reads no settings.
+    """
+    
+    def __init__(self, app, server_timing: Optional[bool] = None):
+        self.app = app
+        self.server_timing = server_timing
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.metrics_enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        server_timing = settings.server_timing_enabled if self.server_timing is None else self.server_timing
+        
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        status = {"code": 500}
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if server_timing:
+                    header = stats.server_timing(time.perf_counter() - start)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"])
+            )
+            db_queries_per_request.observe(stats.queries)
@@ -1,5 +1,5 @@
 """SQLAlchemy database models."""
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Table
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, JSON, ForeignKey, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -12,7 +12,11 @@ invention_patterns = Table(
     'invention_patterns',
     Base.metadata,
     Column('invention_id', Integer, ForeignKey('inventions.id')),
-    Column('pattern_id', Integer, ForeignKey('patterns.id'))
+    Column('pattern_id', Integer, ForeignKey('patterns.id')),
+    # A unique index rather than a constraint, so existing SQLite files can
+    # gain it with CREATE INDEX; it also serves lookups by invention
+    Index('uq_invention_patterns_invention_pattern', 'invention_id', 'pattern_id', unique=True),
+    Index('ix_invention_patterns_pattern_id', 'pattern_id')
 )
 
 
@@ -22,7 +26,8 @@ class InventionModel(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
-    year = Column(Integer, nullable=True)
+    canonical_name = Column(String, nullable=True, index=True)  # see naming.canonicalize
+    year = Column(Integer, nullable=True, index=True)
     summary = Column(Text)
     narrative = Column(Text)
     key_lesson = Column(Text)
@@ -40,6 +45,11 @@ class InventionModel(Base):
     # Relationships
     discoveries = relationship("DiscoveryModel", back_populates="invention", cascade="all, delete-orphan")
     patterns = relationship("PatternModel", secondary=invention_patterns, back_populates="inventions")
+    
+    __table_args__ = (
+        # Keyset pagination order for GET /inventions
+        Index("ix_inventions_created_at_id", "created_at", "id"),
+    )
 
 
 class DiscoveryModel(Base):
@@ -47,7 +57,8 @@ class DiscoveryModel(Base):
     __tablename__ = "discoveries"
     
     id = Column(Integer, primary_key=True, index=True)
-    invention_id = Column(Integer, ForeignKey("inventions.id"))
+    invention_id = Column(Integer, ForeignKey("inventions.id"), index=True)
+    entity_id = Column(Integer, ForeignKey("discovery_entities.id"), nullable=True, index=True)  # see entities.link_discoveries
     
     year = Column(Integer, nullable=True)
     title = Column(String)
@@ -63,6 +74,7 @@ class DiscoveryModel(Base):
     
     # Relationship
     invention = relationship("InventionModel", back_populates="discoveries")
+    entity = relationship("DiscoveryEntityModel")
     
     # Connections
     connections_from = relationship("ConnectionModel", foreign_keys="ConnectionModel.from_discovery_id", back_populates="from_discovery", cascade="all, delete-orphan")
@@ -74,8 +86,8 @@ class ConnectionModel(Base):
     __tablename__ = "connections"
     
     id = Column(Integer, primary_key=True, index=True)
-    from_discovery_id = Column(Integer, ForeignKey("discoveries.id"))
-    to_discovery_id = Column(Integer, ForeignKey("discoveries.id"))
+    from_discovery_id = Column(Integer, ForeignKey("discoveries.id"), index=True)
+    to_discovery_id = Column(Integer, ForeignKey("discoveries.id"), index=True)
     relationship_type = Column(String)
     description = Column(Text)
     
@@ -96,9 +108,136 @@ class PatternModel(Base):
     # JSON field for examples
     examples = Column(JSON)
     
+    # Hash of the member inventions and model behind the last LLM analysis
+    fingerprint = Column(String, nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship
-    inventions = relationship("InventionModel", secondary=invention_patterns, back_populates="patterns")
\ No newline at end of file
+    inventions = relationship("InventionModel", secondary=invention_patterns, back_populates="patterns")
+
+
+class NameTrigramModel(Base):
+    """Trigram of an invention's canonical name, for near-duplicate lookup."""
+    __tablename__ = "invention_name_trigrams"
+    
+    # Primary key order serves lookups by trigram
+    trigram = Column(String, primary_key=True)
+    invention_id = Column(Integer, ForeignKey("inventions.id"), primary_key=True)
+
+
+class NameAliasModel(Base):
+    """Another canonical name an invention was requested under."""
+    __tablename__ = "invention_name_aliases"
+    
+    canonical_name = Column(String, primary_key=True)
+    invention_id = Column(Integer, ForeignKey("inventions.id"), index=True)
+
+
+class DiscoveryEntityModel(Base):
+    """A discovery as it happened, shared by the analyses that mention it."""
+    __tablename__ = "discovery_entities"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String)  # as first stored
+    canonical_title = Column(String)  # see entities.canonical_title
+    year = Column(Integer, nullable=True)
+    discoverers = Column(JSON)  # surnames, see entities.surnames
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    keys = relationship("DiscoveryEntityKeyModel", cascade="all, delete-orphan")
+
+
+class DiscoveryEntityKeyModel(Base):
+    """Blocking key of a discovery entity; candidates for a new discovery share one."""
+    __tablename__ = "discovery_entity_keys"
+    
+    # Primary key order serves lookups by key
+    key = Column(String, primary_key=True)
+    entity_id = Column(Integer, ForeignKey("discovery_entities.id"), primary_key=True)
+
+
+class AnalysisVariantModel(Base):
+    """A focused analysis, stored as its difference from the base analysis."""
+    __tablename__ = "analysis_variants"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    invention_id = Column(Integer, ForeignKey("inventions.id"), index=True)
+    canonical_name = Column(String)  # the invention's, see naming.canonicalize
+    focus_key = Column(String)  # see discovery_engine.focus_key
+    model = Column(String)
+    focus_areas = Column(JSON)  # as first requested
+    delta = Column(JSON)  # a FocusDelta
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # One variant per focus set and model; serves the variant lookup
+        Index("uq_analysis_variants_key", "canonical_name", "focus_key", "model", unique=True),
+    )
+
+
+class InventionThemeModel(Base):
+    """A theme an invention shows, derived when the invention is stored."""
+    __tablename__ = "invention_themes"
+    
+    # Primary key order serves GET /patterns/themes, which reads by theme
+    theme = Column(String, primary_key=True)
+    invention_id = Column(Integer, ForeignKey("inventions.id"), primary_key=True)
+    invention_name = Column(String)
+
+
+class TimelineEntryModel(Base):
+    """An invention's row on the innovation timeline, kept up to date on write."""
+    __tablename__ = "timeline_entries"
+    
+    invention_id = Column(Integer, ForeignKey("inventions.id"), primary_key=True)
+    year = Column(Integer, nullable=True, index=True)
+    invention_name = Column(String)
+    key_discovery = Column(String)
+    pattern_count = Column(Integer, default=0)
+    prerequisite_count = Column(Integer, default=0)
+
+
+class AnalysisLeaseModel(Base):
+    """Cross-worker lease held while an analysis is in flight."""
+    __tablename__ = "analysis_leases"
+    
+    key = Column(String, primary_key=True)
+    owner = Column(String)
+    expires_at = Column(DateTime)
+
+
+class JobModel(Base):
+    """Database model for queued analysis jobs."""
+    __tablename__ = "jobs"
+    
+    id = Column(String, primary_key=True)
+    status = Column(String, index=True)
+    invention_name = Column(String)
+    focus_areas = Column(JSON, nullable=True)
+    refresh = Column(Boolean, default=False)  # bypass the LLM response cache
+    invention_id = Column(Integer, ForeignKey("inventions.id"), nullable=True)
+    variant_id = Column(Integer, ForeignKey("analysis_variants.id"), nullable=True)  # set for focused jobs
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+
+class LLMCacheModel(Base):
+    """Cached LLM responses keyed by prompt fingerprint."""
+    __tablename__ = "llm_cache"
+    
+    key = Column(String, primary_key=True)
+    model = Column(String)
+    content = Column(Text)
+    hits = Column(Integer, default=0)  # written with each LRU bump (see llm_cache.TOUCH_INTERVAL)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    accessed_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,193 @@
+"""Canonical invention names and near-duplicate name lookup."""
+import math
+import re
+import threading
+import time
+import unicodedata
+from typing import Callable, Dict, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import InventionModel, NameAliasModel, NameTrigramModel
+
+# Leading words dropped from names ("The Microwave" -> "microwave")
+ARTICLES = {"the", "a", "an"}
+
+# Apostrophes join their word ("Newton's" -> "newtons"); other punctuation
+# separates words ("X-ray" -> "x ray"), except + and # ("C++", "C#")
+_APOSTROPHES = re.compile(r"['‘’ʼ]")
+_SEPARATORS = re.compile(r"[^\w\s+#]|_")
+_NUMBERS = re.compile(r"\d+")
+
+# Most similar stored names compared exactly per lookup
+MATCH_CANDIDATES = 10
+
+
+def canonicalize(name: str) -> str:
+    """The form of an invention name used to recognize repeats.
+    
+    Unicode-normalized (NFKC), casefolded and stripped of accents,
+    punctuation, extra whitespace and leading articles.
+    """
+    text = unicodedata.normalize("NFKC", name).casefold()
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    words = _SEPARATORS.sub(" ", _APOSTROPHES.sub("", text)).split()
+    while len(words) > 1 and words[0] in ARTICLES:
+        words = words[1:]
+    return " ".join(words) or " ".join(name.split()).casefold()
+
+
+def trigrams(canonical_name: str) -> Set[str]:
+    """Trigrams of each word, padded like PostgreSQL's pg_trgm."""
+    grams = set()
+    for word in canonical_name.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Share of trigrams two names have in common (Jaccard index)."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class TrigramFrequencies:
+    """How many stored names contain each trigram, cached per process.
+    
+    Only used to pick the most selective trigrams to look candidates up
+    by. Lookups are exact whatever the counts, so they may lag behind
+    other workers' writes and are reloaded periodically.
+    """
+    
+    def __init__(self, max_age: float = 3600.0):
+        self.max_age = max_age
+        self._counts: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def get(self, db: Session) -> Callable[[str], int]:
+        """A trigram -> count function; unseen trigrams count as rarest."""
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age:
+                self._counts = dict(db.query(
+                    NameTrigramModel.trigram, func.count()
+                ).group_by(NameTrigramModel.trigram).all())
+                self._loaded_at = time.monotonic()
+            counts = self._counts
+        return lambda trigram: counts.get(trigram, 0)
+    
+    def add(self, grams: Set[str]):
+        """Count a newly indexed name."""
+        with self._lock:
+            for trigram in grams:
+                self._counts[trigram] = self._counts.get(trigram, 0) + 1
+
+
+trigram_frequencies = TrigramFrequencies()
+
+
+def index_name(db: Session, invention: InventionModel):
+    """Index the trigrams of a flushed invention's canonical name, uncommitted."""
+    grams = trigrams(invention.canonical_name)
+    for trigram in grams:
+        db.add(NameTrigramModel(trigram=trigram, invention_id=invention.id))
+    trigram_frequencies.add(grams)
+
+
+def add_alias(db: Session, invention_name: str, invention_id: int):
+    """Resolve a requested name to an invention from now on, uncommitted.
+    
+    Used when the analysis came back under a different name, so asking
+    again by the original name finds it. Names that already resolve
+    exactly are left alone.
+    """
+    canonical = canonicalize(invention_name)
+    if _resolve_exact(db, canonical) is None:
+        db.add(NameAliasModel(canonical_name=canonical, invention_id=invention_id))
+
+
+def _resolve_exact(db: Session, canonical: str) -> Optional[int]:
+    """The invention stored or requested under a canonical name."""
+    stored = db.query(InventionModel.id).filter(
+        InventionModel.canonical_name == canonical
+    ).order_by(InventionModel.id).first()
+    if stored:
+        return stored.id
+    alias = db.get(NameAliasModel, canonical)
+    return alias.invention_id if alias else None
+
+
+def resolve_invention_id(db: Session, invention_name: str) -> Optional[int]:
+    """The stored invention an analysis request refers to, if any.
+    
+    A stored or previously requested name with the same canonical form
+    matches; failing that, the stored name with the most trigrams in
+    common, if its similarity reaches ``name_match_threshold`` and it has
+    the same numbers ("Model 3" is not "Model 5").
+    """
+    canonical = canonicalize(invention_name)
+    exact = _resolve_exact(db, canonical)
+    if exact is not None:
+        return exact
+    
+    threshold = settings.name_match_threshold
+    grams = trigrams(canonical)
+    if threshold >= 1 or not grams:
+        return None
+    
+    # A stored name sharing fewer than ``needed`` trigrams cannot reach the
+    # threshold, and one sharing that many must share at least one of any
+    # len(grams) - needed + 1 of them: find candidates by the rarest few
+    needed = math.ceil(threshold * len(grams))
+    rarest = sorted(grams, key=trigram_frequencies.get(db))[:len(grams) - needed + 1]
+    candidates = db.query(NameTrigramModel.invention_id).filter(
+        NameTrigramModel.trigram.in_(rarest)
+    ).distinct()
+    
+    shared = func.count().label("shared")
+    rows = db.query(InventionModel.id, InventionModel.canonical_name).join(
+        NameTrigramModel, NameTrigramModel.invention_id == InventionModel.id
+    ).filter(
+        NameTrigramModel.trigram.in_(grams),
+        NameTrigramModel.invention_id.in_(candidates)
+    ).group_by(
+        InventionModel.id
+    ).having(
+        shared >= needed
+    ).order_by(shared.desc()).limit(MATCH_CANDIDATES).all()
+    numbers = _NUMBERS.findall(canonical)
+    scored = [
+        (similarity(grams, trigrams(row.canonical_name)), -row.id, row.id)
+        for row in rows
+        if _NUMBERS.findall(row.canonical_name) == numbers
+    ]
+    best = max(scored, default=None)
+    if best and best[0] >= threshold:
+        return best[2]
+    return None
+
+
+def backfill_names(db: Session, batch_size: int = 500) -> int:
+    """Canonicalize and index names stored before the name index existed.
+    
+    Returns the number of inventions backfilled.
+    """
+    missing = db.query(InventionModel).filter(
+        InventionModel.canonical_name.is_(None)
+    ).order_by(InventionModel.id)
+    
+    count = 0
+    while True:
+        inventions = missing.limit(batch_size).all()
+        if not inventions:
+            return count
+        for invention in inventions:
+            invention.canonical_name = canonicalize(invention.name)
+            index_name(db, invention)
+        db.commit()
+        count += len(inventions)
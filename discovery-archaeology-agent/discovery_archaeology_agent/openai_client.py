@@ -1,30 +1,40 @@
 """OpenAI O3 integration with structured outputs."""
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
-from typing import Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, List, NamedTuple, Optional, TypeVar, Union
+import asyncio
+import functools
 import json
 
-from .schemas import InventionAnalysis, Discovery, Connection, DiscoveryType, PatternType
+from .schemas import FocusDelta, InventionAnalysis, Discovery, Connection, DiscoveryType, PatternType
 from .config import settings
+from .llm_cache import response_cache
+from .database import queue_write, run_write
+from .rate_limit import RateLimiter
+from .metrics import parse_failures, parse_fallbacks, record_usage, timed
 
+if TYPE_CHECKING:
+    from langchain_core.output_parsers import PydanticOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
 
-class DiscoveryArchaeologyClient:
-    """Client for analyzing invention origins using OpenAI O3."""
-    
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.openai_model,
-            api_key=settings.openai_api_key,
-            max_tokens=16000
-        )
-        
-        # Create parser for structured output
-        self.parser = PydanticOutputParser(pydantic_object=InventionAnalysis)
-        
-        # Create the analysis prompt
-        self.analysis_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a Discovery Archaeology Agent that reverse-engineers the true origins of inventions.
+# langchain is imported when the first client is built, not with this module
+# (see get_templates); benchmarks replace this with a stub model class
+ChatOpenAI = None
+
+T = TypeVar("T")
+
+# Call parameters that change the completion, and so belong in cache keys
+LLM_PARAMS = {"max_tokens": 16000}
+
+# Returned when the model's pattern response cannot be parsed
+PATTERN_FALLBACK = {
+    "pattern_description": "Failed to analyze pattern",
+    "examples": [],
+    "insights": "Analysis failed"
+}
+
+
+# Prompt messages; compiled into templates by get_templates
+ANALYSIS_MESSAGES = [
+    ("system", """You are a Discovery Archaeology Agent that reverse-engineers the true origins of inventions.
 Your goal is to uncover the chain of serendipitous discoveries, failed experiments, and unintended consequences that made inventions possible.
 
 Focus on:
@@ -49,7 +59,7 @@ Be critical and evidence-based. If a pattern isn't clearly present, don't includ
 {format_instructions}
 
 Provide a comprehensive analysis that tells the meandering story of how the invention actually came to be, not the simplified version typically told."""),
-            ("human", """Analyze the invention: {invention_name}
+    ("human", """Analyze the invention: {invention_name}
 
 {focus_prompt}
 
@@ -59,10 +69,486 @@ Remember to:
 - Show how failures and mistakes led to breakthroughs
 - Identify patterns that recur across innovation history
 - Emphasize how the final invention couldn't have been planned""")
-        ])
+]
+
+# Asks only for what focus areas add to a stored analysis, which is sent as
+# a compact outline rather than regenerated
+FOCUS_MESSAGES = [
+    ("system", """You are a Discovery Archaeology Agent extending an existing analysis of an invention's origins.
+The discovery chain below is already known. Do not repeat it: look at the invention's history through the requested focus areas and report only what they add.
+
+- highlighted_discovery_ids: ids from the known chain that matter most for the focus areas
+- discoveries: events relevant to the focus areas that the known chain lacks (give each a new id such as "f1")
+- connections: how the new discoveries connect to each other or to known discoveries (use their ids)
+- insights: lessons specific to the focus areas
+
+Be critical and evidence-based; an empty list is better than an invented discovery.
+
+{format_instructions}"""),
+    ("human", """Invention: {invention_name}
+Focus areas: {focus_areas}
+
+Summary: {summary}
+
+Known discovery chain:
+{discovery_chain}""")
+]
+
+PATTERN_MESSAGES = [
+    ("system", """You are analyzing multiple inventions to identify recurring patterns in innovation.
+Focus on finding examples of the {pattern_type} pattern across the given inventions."""),
+    ("human", """Analyze these inventions for the {pattern_type} pattern:
+{inventions_list}
+
+For each invention, provide:
+1. A specific example of this pattern
+2. How it manifested in that invention's history
+3. The impact it had on the final innovation
+
+Return a JSON object with:
+- pattern_description: Overall description of this pattern
+- examples: List of {{"invention": "name", "example": "description", "impact": "result"}}
+- insights: What this pattern teaches about innovation""")
+]
+
+REDUCE_MESSAGES = [
+    ("system", """You are combining partial analyses of the {pattern_type} innovation pattern.
+Each partial analysis covers a different batch of inventions."""),
+    ("human", """Merge these partial analyses of the {pattern_type} pattern into one:
+{partials}
+
+Return a JSON object with:
+- pattern_description: Overall description of this pattern across every batch
+- insights: What this pattern teaches about innovation""")
+]
+
+
+class PromptTemplates(NamedTuple):
+    """Compiled prompt templates and output parsers."""
+    analysis_parser: "PydanticOutputParser"
+    focus_parser: "PydanticOutputParser"
+    analysis: "ChatPromptTemplate"
+    focus: "ChatPromptTemplate"
+    pattern: "ChatPromptTemplate"
+    reduce: "ChatPromptTemplate"
+
+
+@functools.lru_cache(maxsize=None)
+def get_templates() -> PromptTemplates:
+    """Compile the prompt templates once per process, on first use.
     
-    def analyze_invention(self, invention_name: str, focus_areas: Optional[list] = None) -> InventionAnalysis:
+    langchain is by far the slowest import in the package, so it waits for
+    the first client rather than module import. The JSON schema text in
+    the format instructions is rendered once here rather than on every call.
+    """
+    from langchain_core.output_parsers import PydanticOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+    
+    analysis_parser = PydanticOutputParser(pydantic_object=InventionAnalysis)
+    focus_parser = PydanticOutputParser(pydantic_object=FocusDelta)
+    return PromptTemplates(
+        analysis_parser=analysis_parser,
+        focus_parser=focus_parser,
+        analysis=ChatPromptTemplate.from_messages(ANALYSIS_MESSAGES).partial(
+            format_instructions=analysis_parser.get_format_instructions()
+        ),
+        focus=ChatPromptTemplate.from_messages(FOCUS_MESSAGES).partial(
+            format_instructions=focus_parser.get_format_instructions()
+        ),
+        pattern=ChatPromptTemplate.from_messages(PATTERN_MESSAGES),
+        reduce=ChatPromptTemplate.from_messages(REDUCE_MESSAGES)
+    )
+
+
+def _chat_model_class() -> type:
+    """``ChatOpenAI``, imported on first use unless a stub replaced it."""
+    global ChatOpenAI
+    if ChatOpenAI is None:
+        from langchain_openai import ChatOpenAI as chat_model_class
+        ChatOpenAI = chat_model_class
+    return ChatOpenAI
+
+
+def _call_kind(parse: Callable[[str], Any]) -> str:
+    """Metrics label for a call, from its parser (``_parse_pattern`` -> "pattern")."""
+    return parse.__name__.replace("_parse_", "", 1)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+def chunk_by_tokens(
+    items: List[T],
+    cost: Callable[[T], int],
+    budget: int,
+    min_size: int = 1,
+    max_size: Optional[int] = None
+) -> List[List[T]]:
+    """Split items into consecutive batches whose total cost fits a budget.
+    
+    A batch always takes at least ``min_size`` items, even over budget, and
+    at most ``max_size``.
+    """
+    chunks, chunk, used = [], [], 0
+    for item in items:
+        item_cost = cost(item)
+        full = (used + item_cost > budget) or (max_size is not None and len(chunk) >= max_size)
+        if chunk and len(chunk) >= min_size and full:
+            chunks.append(chunk)
+            chunk, used = [], 0
+        chunk.append(item)
+        used += item_cost
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _pattern_summary(pattern_data: dict) -> dict:
+    """The mergeable text fields of a pattern analysis."""
+    return {
+        "pattern_description": pattern_data.get("pattern_description", ""),
+        "insights": pattern_data.get("insights", "")
+    }
+
+
+def _render_summary(summary: dict) -> str:
+    return f"Description: {summary['pattern_description']}\nInsights: {summary['insights']}"
+
+
+def _join_summaries(summaries: list[dict]) -> dict:
+    """Fallback merge when the model's reduce response cannot be parsed."""
+    return {
+        "pattern_description": " ".join(s["pattern_description"] for s in summaries),
+        "insights": " ".join(s["insights"] for s in summaries)
+    }
+
+
+class DiscoveryArchaeologyClient:
+    """Client for analyzing invention origins using OpenAI O3."""
+    
+    def __init__(self):
+        import httpx  # like langchain, loaded once a client is needed
+        
+        if not settings.openai_api_key:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        
+        # Keep-alive connection pools shared by every call through this client
+        limits = httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_connections
+        )
+        self._http_client = httpx.Client(limits=limits, timeout=settings.openai_timeout_seconds)
+        self._http_async_client = httpx.AsyncClient(limits=limits, timeout=settings.openai_timeout_seconds)
+        
+        self.llm = _chat_model_class()(
+            model=settings.openai_model,
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            http_client=self._http_client,
+            http_async_client=self._http_async_client,
+            max_retries=0,  # retries and backoff are handled by self.limiter
+            stream_usage=True,  # token counts on the last streamed chunk
+            **LLM_PARAMS
+        )
+        self.limiter = RateLimiter.from_settings()
+        
+        # Prompts, parser and format instructions are built once per process
+        self.templates = get_templates()
+        self.parser = self.templates.analysis_parser
+        self.analysis_prompt = self.templates.analysis
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections."""
+        self._http_client.close()
+        await self._http_async_client.aclose()
+    
+    def analyze_invention(
+        self,
+        invention_name: str,
+        focus_areas: Optional[list] = None,
+        refresh: bool = False
+    ) -> InventionAnalysis:
         """Analyze an invention's true origins."""
+        formatted_prompt = self._analysis_messages(invention_name, focus_areas)
+        return self._cached_call(formatted_prompt, self._parse_analysis, refresh)
+    
+    async def aanalyze_invention(
+        self,
+        invention_name: str,
+        focus_areas: Optional[list] = None,
+        refresh: bool = False
+    ) -> InventionAnalysis:
+        """Analyze an invention's true origins without blocking the event loop."""
+        formatted_prompt = self._analysis_messages(invention_name, focus_areas)
+        return await self._acached_call(formatted_prompt, self._parse_analysis, refresh)
+    
+    def analyze_focus(
+        self,
+        analysis: InventionAnalysis,
+        focus_areas: list,
+        refresh: bool = False
+    ) -> FocusDelta:
+        """What focus areas add to an existing analysis of an invention."""
+        formatted_prompt = self._focus_messages(analysis, focus_areas)
+        return self._cached_call(formatted_prompt, self._parse_focus, refresh)
+    
+    async def aanalyze_focus(
+        self,
+        analysis: InventionAnalysis,
+        focus_areas: list,
+        refresh: bool = False
+    ) -> FocusDelta:
+        """Async counterpart of ``analyze_focus``."""
+        formatted_prompt = self._focus_messages(analysis, focus_areas)
+        return await self._acached_call(formatted_prompt, self._parse_focus, refresh)
+    
+    def estimate_analysis_tokens(self, invention_name: str, focus_areas: Optional[list] = None) -> int:
+        """Tokens an analysis call counts against a tokens-per-minute limit.
+        
+        Like the API's own limiter, this is the prompt plus the completion
+        allowance (``max_tokens``), since the completion length is not known
+        up front.
+        """
+        return self._call_tokens(self._analysis_messages(invention_name, focus_areas))
+    
+    async def astream_analysis(
+        self,
+        invention_name: str,
+        focus_areas: Optional[list] = None,
+        refresh: bool = False
+    ) -> AsyncIterator[Union[str, InventionAnalysis]]:
+        """Stream an invention analysis as it is generated.
+        
+        Yields the completion's text chunks as they arrive, then the parsed
+        ``InventionAnalysis``. The prompt, parsing and caching are the same
+        as ``aanalyze_invention``; a cache hit yields the whole text at once.
+        """
+        formatted_prompt = self._analysis_messages(invention_name, focus_areas)
+        key = response_cache.key(settings.openai_model, formatted_prompt, LLM_PARAMS)
+        
+        if settings.llm_cache_enabled and not refresh:
+            content = await asyncio.to_thread(response_cache.get, key)
+            if content is not None:
+                yield content
+                yield self._parse_analysis(content)
+                return
+        
+        parts = []
+        usage = None
+        with timed("llm"):
+            async with self.limiter.slot(self._call_tokens(formatted_prompt)):
+                async for chunk in self.llm.astream(formatted_prompt):
+                    if getattr(chunk, "usage_metadata", None):
+                        usage = chunk
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield chunk.content
+        record_usage("analysis", usage)
+        
+        content = "".join(parts)
+        with timed("parse"):
+            analysis = self._parse_analysis(content)
+        if settings.llm_cache_enabled:
+            await run_write(None, response_cache.put, key, settings.openai_model, content)
+        yield analysis
+    
+    def find_pattern_across_inventions(
+        self,
+        inventions: list[str],
+        pattern_type: PatternType,
+        refresh: bool = False
+    ) -> dict:
+        """Find a specific pattern across multiple inventions.
+        
+        Lists too long for one prompt are analyzed in token-budgeted chunks
+        whose partial results are then reduced into one.
+        """
+        partials = [
+            self._find_pattern_chunk(chunk, pattern_type, refresh)
+            for chunk in self._pattern_chunks(inventions)
+        ]
+        return self._reduce_patterns(partials, pattern_type, refresh)
+    
+    async def afind_pattern_across_inventions(
+        self,
+        inventions: list[str],
+        pattern_type: PatternType,
+        refresh: bool = False
+    ) -> dict:
+        """Find a specific pattern across multiple inventions without blocking the event loop.
+        
+        Chunks are analyzed concurrently, at most ``pattern_chunk_concurrency``
+        at a time.
+        """
+        semaphore = asyncio.Semaphore(settings.pattern_chunk_concurrency)
+        
+        async def analyze(chunk: list[str]) -> dict:
+            async with semaphore:
+                return await self._afind_pattern_chunk(chunk, pattern_type, refresh)
+        
+        partials = await asyncio.gather(*(analyze(chunk) for chunk in self._pattern_chunks(inventions)))
+        return await self._areduce_patterns(list(partials), pattern_type, refresh)
+    
+    def _pattern_chunks(self, inventions: list[str]) -> list[list[str]]:
+        """Split invention names into batches that fit one pattern prompt."""
+        return chunk_by_tokens(
+            inventions,
+            lambda name: estimate_tokens(f"- {name}\n"),
+            settings.pattern_chunk_tokens,
+            max_size=settings.pattern_chunk_size
+        )
+    
+    def _find_pattern_chunk(self, inventions: list[str], pattern_type: PatternType, refresh: bool) -> dict:
+        """Analyze one batch of inventions for a pattern."""
+        formatted_prompt = self._pattern_messages(inventions, pattern_type)
+        try:
+            return self._cached_call(formatted_prompt, self._parse_pattern, refresh)
+        except ValueError:
+            return dict(PATTERN_FALLBACK)
+    
+    async def _afind_pattern_chunk(self, inventions: list[str], pattern_type: PatternType, refresh: bool) -> dict:
+        """Async counterpart of ``_find_pattern_chunk``."""
+        formatted_prompt = self._pattern_messages(inventions, pattern_type)
+        try:
+            return await self._acached_call(formatted_prompt, self._parse_pattern, refresh)
+        except ValueError:
+            return dict(PATTERN_FALLBACK)
+    
+    def _reduce_patterns(self, partials: list[dict], pattern_type: PatternType, refresh: bool) -> dict:
+        """Combine per-chunk pattern analyses into one.
+        
+        Examples are per invention, so they are concatenated as-is; the
+        descriptions and insights are merged by the model in budgeted
+        groups, level by level, until one summary remains. If any chunk
+        failed the whole analysis fails, rather than passing off a merge of
+        some of the inventions as a pattern across all of them.
+        """
+        if not partials or PATTERN_FALLBACK in partials:
+            return dict(PATTERN_FALLBACK)
+        if len(partials) == 1:
+            return partials[0]
+        
+        summaries = [_pattern_summary(p) for p in partials]
+        while len(summaries) > 1:
+            summaries = [
+                self._merge_summaries(group, pattern_type, refresh)
+                for group in self._summary_groups(summaries)
+            ]
+        
+        return {**summaries[0], "examples": [e for p in partials for e in p.get("examples", [])]}
+    
+    async def _areduce_patterns(self, partials: list[dict], pattern_type: PatternType, refresh: bool) -> dict:
+        """Async counterpart of ``_reduce_patterns``; each level merges concurrently."""
+        if not partials or PATTERN_FALLBACK in partials:
+            return dict(PATTERN_FALLBACK)
+        if len(partials) == 1:
+            return partials[0]
+        
+        semaphore = asyncio.Semaphore(settings.pattern_chunk_concurrency)
+        
+        async def merge(group: list[dict]) -> dict:
+            async with semaphore:
+                return await self._amerge_summaries(group, pattern_type, refresh)
+        
+        summaries = [_pattern_summary(p) for p in partials]
+        while len(summaries) > 1:
+            summaries = list(await asyncio.gather(*(merge(group) for group in self._summary_groups(summaries))))
+        
+        return {**summaries[0], "examples": [e for p in partials for e in p.get("examples", [])]}
+    
+    def _summary_groups(self, summaries: list[dict]) -> list[list[dict]]:
+        """Group partial summaries for one reduce level.
+        
+        Groups hold at least two summaries so every level shrinks the list.
+        """
+        return chunk_by_tokens(
+            summaries,
+            lambda summary: estimate_tokens(_render_summary(summary)),
+            settings.pattern_chunk_tokens,
+            min_size=2
+        )
+    
+    def _merge_summaries(self, group: list[dict], pattern_type: PatternType, refresh: bool) -> dict:
+        """Ask the model to merge a group of partial summaries."""
+        if len(group) == 1:
+            return group[0]
+        formatted_prompt = self._reduce_messages(group, pattern_type)
+        try:
+            return _pattern_summary(self._cached_call(formatted_prompt, self._parse_pattern, refresh, kind="reduce"))
+        except ValueError:
+            return _join_summaries(group)
+    
+    async def _amerge_summaries(self, group: list[dict], pattern_type: PatternType, refresh: bool) -> dict:
+        """Async counterpart of ``_merge_summaries``."""
+        if len(group) == 1:
+            return group[0]
+        formatted_prompt = self._reduce_messages(group, pattern_type)
+        try:
+            return _pattern_summary(await self._acached_call(formatted_prompt, self._parse_pattern, refresh, kind="reduce"))
+        except ValueError:
+            return _join_summaries(group)
+    
+    def _cached_call(
+        self,
+        messages: list,
+        parse: Callable[[str], Any],
+        refresh: bool,
+        kind: Optional[str] = None
+    ) -> Any:
+        """Invoke the LLM through the response cache.
+        
+        Only responses that parse are stored, so a malformed completion is
+        retried on the next call rather than replayed. ``refresh`` skips the
+        lookup but still stores the fresh response, queued on the database
+        writer without waiting for it. ``kind`` labels the call in metrics
+        when the parser alone does not tell it apart.
+        """
+        key = response_cache.key(settings.openai_model, messages, LLM_PARAMS)
+        if settings.llm_cache_enabled and not refresh:
+            content = response_cache.get(key)
+            if content is not None:
+                return parse(content)
+        
+        with timed("llm"):
+            response = self.limiter.call(lambda: self.llm.invoke(messages), self._call_tokens(messages))
+        record_usage(kind or _call_kind(parse), response)
+        with timed("parse"):
+            result = parse(response.content)
+        if settings.llm_cache_enabled:
+            queue_write(response_cache.put, key, settings.openai_model, response.content)
+        return result
+    
+    async def _acached_call(
+        self,
+        messages: list,
+        parse: Callable[[str], Any],
+        refresh: bool,
+        kind: Optional[str] = None
+    ) -> Any:
+        """Async counterpart of ``_cached_call``."""
+        key = response_cache.key(settings.openai_model, messages, LLM_PARAMS)
+        if settings.llm_cache_enabled and not refresh:
+            content = await asyncio.to_thread(response_cache.get, key)
+            if content is not None:
+                return parse(content)
+        
+        with timed("llm"):
+            response = await self.limiter.acall(lambda: self.llm.ainvoke(messages), self._call_tokens(messages))
+        record_usage(kind or _call_kind(parse), response)
+        with timed("parse"):
+            result = parse(response.content)
+        if settings.llm_cache_enabled:
+            await run_write(None, response_cache.put, key, settings.openai_model, response.content)
+        return result
+    
+    def _call_tokens(self, messages: list) -> int:
+        """Estimated prompt tokens plus the completion allowance."""
+        return sum(estimate_tokens(message.content) for message in messages) + LLM_PARAMS["max_tokens"]
+    
+    def _analysis_messages(self, invention_name: str, focus_areas: Optional[list]) -> list:
+        """Render the analysis prompt for an invention."""
         
         # Build focus prompt if specific areas requested
         focus_prompt = ""
@@ -70,72 +556,105 @@ Remember to:
             focus_prompt = f"Pay special attention to: {', '.join(focus_areas)}"
         
         # Format the prompt with parser instructions
-        formatted_prompt = self.analysis_prompt.format_messages(
+        return self.analysis_prompt.format_messages(
             invention_name=invention_name,
-            focus_prompt=focus_prompt,
-            format_instructions=self.parser.get_format_instructions()
+            focus_prompt=focus_prompt
         )
+    
+    def _focus_messages(self, analysis: InventionAnalysis, focus_areas: list) -> list:
+        """Render the prompt for what focus areas add to an analysis."""
         
-        # Get response from LLM
-        response = self.llm.invoke(formatted_prompt)
-        
-        # Parse the response into structured data
+        discovery_chain = "\n".join(
+            f"- [{d.id}] {d.year or 'undated'}: {d.title} ({d.discovery_type.value})"
+            for d in analysis.discoveries
+        )
+        return self.templates.focus.format_messages(
+            invention_name=analysis.invention_name,
+            focus_areas=", ".join(focus_areas),
+            summary=analysis.summary,
+            discovery_chain=discovery_chain or "(none)"
+        )
+    
+    def _parse_analysis(self, content: str) -> InventionAnalysis:
+        """Parse the LLM response into structured data."""
+        return self._parse_structured(content, self.parser, InventionAnalysis, "analysis")
+    
+    def _parse_focus(self, content: str) -> FocusDelta:
+        """Parse the response to a focus prompt."""
+        return self._parse_structured(content, self.templates.focus_parser, FocusDelta, "focus")
+    
+    def _parse_structured(self, content: str, parser: "PydanticOutputParser", schema: type, kind: str) -> Any:
+        """Parse a response with ``parser``, falling back to its outermost JSON object."""
         try:
             # Try to parse the response content
-            analysis = self.parser.parse(response.content)
-            return analysis
+            return parser.parse(content)
         except Exception as e:
             # If parsing fails, try to extract JSON from the response
             try:
                 # Look for JSON in the response
-                content = response.content
                 start_idx = content.find('{')
                 end_idx = content.rfind('}') + 1
                 if start_idx != -1 and end_idx > start_idx:
                     json_str = content[start_idx:end_idx]
                     data = json.loads(json_str)
-                    return InventionAnalysis(**data)
+                    result = schema(**data)
+                    parse_fallbacks.inc(kind=kind)
+                    return result
             except:
-                raise ValueError(f"Failed to parse LLM response: {e}")
+                pass
+            parse_failures.inc(kind=kind)
+            raise ValueError(f"Failed to parse LLM response: {e}")
     
-    def find_pattern_across_inventions(self, inventions: list[str], pattern_type: PatternType) -> dict:
-        """Find a specific pattern across multiple inventions."""
+    def _pattern_messages(self, inventions: list[str], pattern_type: PatternType) -> list:
+        """Render the cross-invention pattern prompt."""
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are analyzing multiple inventions to identify recurring patterns in innovation.
-Focus on finding examples of the {pattern_type} pattern across the given inventions."""),
-            ("human", """Analyze these inventions for the {pattern_type} pattern:
-{inventions_list}
-
-For each invention, provide:
-1. A specific example of this pattern
-2. How it manifested in that invention's history
-3. The impact it had on the final innovation
-
-Return a JSON object with:
-- pattern_description: Overall description of this pattern
-- examples: List of {{"invention": "name", "example": "description", "impact": "result"}}
-- insights: What this pattern teaches about innovation""")
-        ])
-        
-        formatted_prompt = prompt.format_messages(
+        return self.templates.pattern.format_messages(
             pattern_type=pattern_type.value,
             inventions_list="\n".join(f"- {inv}" for inv in inventions)
         )
+    
+    def _reduce_messages(self, summaries: list[dict], pattern_type: PatternType) -> list:
+        """Render the prompt that merges partial pattern analyses."""
         
-        response = self.llm.invoke(formatted_prompt)
-        
+        return self.templates.reduce.format_messages(
+            pattern_type=pattern_type.value,
+            partials="\n\n".join(
+                f"{i}. {_render_summary(summary)}" for i, summary in enumerate(summaries, 1)
+            )
+        )
+    
+    def _parse_pattern(self, content: str) -> dict:
+        """Parse the JSON object returned for a pattern analysis."""
+        start_idx = content.find('{')
+        end_idx = content.rfind('}') + 1
+        if start_idx == -1 or end_idx <= start_idx:
+            parse_failures.inc(kind="pattern")
+            raise ValueError("No JSON object in pattern response")
         try:
-            # Parse JSON response
-            content = response.content
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-        except:
-            return {
-                "pattern_description": "Failed to analyze pattern",
-                "examples": [],
-                "insights": "Analysis failed"
-            }
\ No newline at end of file
+            return json.loads(content[start_idx:end_idx])
+        except ValueError:
+            parse_failures.inc(kind="pattern")
+            raise
+
+
+_client: Optional[DiscoveryArchaeologyClient] = None
+
+
+def get_client() -> DiscoveryArchaeologyClient:
+    """The process-wide client, created on first use.
+    
+    Engines and analyzers share it, so requests reuse one set of HTTP
+    connections instead of paying a new pool and TLS handshake each time.
+    """
+    global _client
+    if _client is None:
+        _client = DiscoveryArchaeologyClient()
+    return _client
+
+
+async def close_client():
+    """Close the process-wide client; the next ``get_client`` makes a new one."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
@@ -1,72 +1,165 @@
 """Pattern analysis across multiple inventions."""
 from sqlalchemy.orm import Session
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional, Tuple
 from collections import defaultdict
+import asyncio
+import hashlib
+import json
 
-from .models import InventionModel, PatternModel
+from .models import InventionModel, InventionThemeModel, PatternModel, TimelineEntryModel
 from .schemas import PatternType, PatternAnalysis
-from .openai_client import DiscoveryArchaeologyClient
+from .openai_client import DiscoveryArchaeologyClient, PATTERN_FALLBACK, get_client
+from .database import run_in_session, run_write
+from .config import settings
+
+
+class PatternPlan(NamedTuple):
+    """What ``PatternAnalyzer`` will do for one pattern type."""
+    pattern_type: PatternType
+    invention_names: List[str]
+    fingerprint: str
+    stored: Optional[PatternAnalysis]  # set when no LLM call is needed
+
+
+def membership_fingerprint(members: List[Tuple[int, str]]) -> str:
+    """Fingerprint a pattern's member inventions and the analyzing model."""
+    payload = json.dumps({"model": settings.openai_model, "members": members})
+    return hashlib.sha256(payload.encode()).hexdigest()
 
 
 class PatternAnalyzer:
     """Analyze patterns across multiple inventions."""
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, client: Optional[DiscoveryArchaeologyClient] = None):
         self.db = db_session
-        self.client = DiscoveryArchaeologyClient()
+        self._client = client
+    
+    @property
+    def client(self) -> DiscoveryArchaeologyClient:
+        """The LLM client, created when a pattern first needs the model."""
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+    
+    def analyze_all_patterns(self, refresh: bool = False) -> List[PatternAnalysis]:
+        """Analyze all patterns across all inventions in database.
+        
+        Pattern types whose member inventions (and the model) are unchanged
+        since their last analysis are returned from the database without an
+        LLM call. ``refresh`` re-analyzes every pattern type.
+        """
+        plans = self._plan_patterns(refresh)
+        
+        # Use LLM to find deeper connections
+        pending = [plan for plan in plans if not plan.stored]
+        pattern_data = [
+            self.client.find_pattern_across_inventions(
+                plan.invention_names,
+                plan.pattern_type,
+                refresh=refresh
+            )
+            for plan in pending
+        ]
+        
+        saved = self._save_patterns(list(zip(pending, pattern_data)))
+        return [plan.stored or saved[plan.pattern_type] for plan in plans]
     
-    def analyze_all_patterns(self) -> List[PatternAnalysis]:
-        """Analyze all patterns across all inventions in database."""
+    async def aanalyze_all_patterns(self, refresh: bool = False) -> List[PatternAnalysis]:
+        """Analyze all patterns without blocking the event loop.
+        
+        The per-pattern LLM calls are independent, so they run concurrently
+        (at most ``pattern_concurrency`` at a time) and their results are
+        then applied in a single transaction.
+        """
+        plans = await run_in_session(self.db, self._plan_patterns, refresh)
+        pending = [plan for plan in plans if not plan.stored]
+        semaphore = asyncio.Semaphore(settings.pattern_concurrency)
+        
+        async def analyze(plan: PatternPlan) -> dict:
+            async with semaphore:
+                return await self.client.afind_pattern_across_inventions(
+                    plan.invention_names,
+                    plan.pattern_type,
+                    refresh=refresh
+                )
+        
+        pattern_data = await asyncio.gather(*(analyze(plan) for plan in pending))
+        
+        saved = await run_write(self.db, self._save_patterns, list(zip(pending, pattern_data)))
+        return [plan.stored or saved[plan.pattern_type] for plan in plans]
+    
+    def _plan_patterns(self, refresh: bool) -> List[PatternPlan]:
+        """Work out which pattern types need a fresh LLM analysis.
         
-        # Get all inventions
-        inventions = self.db.query(InventionModel).all()
+        Membership of every pattern type comes from a single join over the
+        invention/pattern links, ordered so fingerprints are stable.
+        """
+        rows = self.db.query(
+            PatternModel.pattern_type, InventionModel.id, InventionModel.name
+        ).join(PatternModel.inventions).order_by(InventionModel.id).all()
         
-        if len(inventions) < 2:
-            return []  # Need at least 2 inventions for pattern analysis
+        members = defaultdict(list)
+        for pattern_type, invention_id, name in rows:
+            members[pattern_type].append((invention_id, name))
         
-        # Analyze each pattern type
-        results = []
-        for pattern_type in PatternType:
-            analysis = self._analyze_pattern_type(inventions, pattern_type)
-            if analysis:
-                results.append(analysis)
+        stored = {
+            p.pattern_type: p for p in self.db.query(PatternModel).all()
+        }
         
-        return results
+        plans = []
+        for pattern_type in PatternType:
+            pattern_members = members.get(pattern_type.value, [])
+            if len(pattern_members) < 2:
+                continue  # Need at least 2 inventions for pattern analysis
+            
+            invention_names = [name for _, name in pattern_members]
+            fingerprint = membership_fingerprint(pattern_members)
+            pattern_model = stored.get(pattern_type.value)
+            
+            unchanged = pattern_model is not None and pattern_model.fingerprint == fingerprint
+            plans.append(PatternPlan(
+                pattern_type=pattern_type,
+                invention_names=invention_names,
+                fingerprint=fingerprint,
+                stored=self._to_analysis(pattern_model, invention_names) if unchanged and not refresh else None
+            ))
+        
+        return plans
     
-    def _analyze_pattern_type(
-        self, 
-        inventions: List[InventionModel], 
-        pattern_type: PatternType
-    ) -> Optional[PatternAnalysis]:
-        """Analyze a specific pattern type across inventions."""
-        
-        # Get inventions that have this pattern
-        relevant_inventions = []
-        for inv in inventions:
-            if inv.patterns:
-                for pattern in inv.patterns:
-                    if pattern.pattern_type == pattern_type.value:
-                        relevant_inventions.append(inv)
-                        break
-        
-        if len(relevant_inventions) < 2:
-            return None
+    def _save_patterns(
+        self,
+        results: List[Tuple[PatternPlan, dict]]
+    ) -> Dict[PatternType, PatternAnalysis]:
+        """Apply fresh pattern analyses in one transaction."""
+        if not results:
+            return {}
+        
+        stored = {
+            p.pattern_type: p for p in self.db.query(PatternModel).filter(
+                PatternModel.pattern_type.in_([plan.pattern_type.value for plan, _ in results])
+            ).all()
+        }
+        
+        saved = {}
+        for plan, pattern_data in results:
+            pattern_model = self._apply_pattern(stored.get(plan.pattern_type.value), plan, pattern_data)
+            saved[plan.pattern_type] = self._to_analysis(pattern_model, plan.invention_names)
         
-        # Use LLM to find deeper connections
-        invention_names = [inv.name for inv in relevant_inventions]
-        pattern_data = self.client.find_pattern_across_inventions(
-            invention_names, 
-            pattern_type
-        )
+        self.db.commit()
+        return saved
+    
+    def _apply_pattern(
+        self,
+        pattern_model: Optional[PatternModel],
+        plan: PatternPlan,
+        pattern_data: dict
+    ) -> PatternModel:
+        """Write the LLM's view of a pattern and its membership fingerprint."""
         
         # Update or create pattern in database
-        pattern_model = self.db.query(PatternModel).filter(
-            PatternModel.pattern_type == pattern_type.value
-        ).first()
-        
         if not pattern_model:
             pattern_model = PatternModel(
-                pattern_type=pattern_type.value,
+                pattern_type=plan.pattern_type.value,
                 description=pattern_data.get("pattern_description", ""),
                 insights=pattern_data.get("insights", ""),
                 examples=pattern_data.get("examples", [])
@@ -77,15 +170,17 @@ class PatternAnalyzer:
             pattern_model.insights = pattern_data.get("insights", pattern_model.insights)
             pattern_model.examples = pattern_data.get("examples", pattern_model.examples)
         
-        # Ensure all relevant inventions are linked
-        for inv in relevant_inventions:
-            if inv not in pattern_model.inventions:
-                pattern_model.inventions.append(inv)
-        
-        self.db.commit()
+        # Members are the inventions already linked to this pattern, so there
+        # is nothing to link; a failed analysis leaves the fingerprint unset
+        # so the next run retries it
+        pattern_model.fingerprint = None if pattern_data == PATTERN_FALLBACK else plan.fingerprint
         
+        return pattern_model
+    
+    def _to_analysis(self, pattern_model: PatternModel, invention_names: List[str]) -> PatternAnalysis:
+        """Convert a stored pattern to its response schema."""
         return PatternAnalysis(
-            pattern_type=pattern_type,
+            pattern_type=PatternType(pattern_model.pattern_type),
             description=pattern_model.description,
             inventions=invention_names,
             examples=pattern_model.examples or [],
@@ -93,48 +188,41 @@ class PatternAnalyzer:
         )
     
     def find_common_themes(self) -> Dict[str, List[str]]:
-        """Find common themes across all inventions."""
+        """Find common themes across all inventions.
+        
+        Themes are tagged when each invention is stored (see
+        ``aggregates``), so this is one read of the theme index.
+        """
         
         themes = defaultdict(list)
-        inventions = self.db.query(InventionModel).all()
-        
-        for inv in inventions:
-            # Check serendipity moments
-            if inv.serendipity_moments:
-                for moment in inv.serendipity_moments:
-                    if "accident" in moment.lower():
-                        themes["Accidental Discoveries"].append(inv.name)
-                    if "fail" in moment.lower():
-                        themes["Failures Leading to Success"].append(inv.name)
-            
-            # Check prerequisites
-            if inv.critical_prerequisites:
-                themes["Built on Prerequisites"].append(inv.name)
-            
-            # Check objective blindness
-            if inv.objective_blindness_examples:
-                themes["Missed Initial Opportunities"].append(inv.name)
+        rows = self.db.query(
+            InventionThemeModel.theme, InventionThemeModel.invention_name
+        ).order_by(InventionThemeModel.theme, InventionThemeModel.invention_id)
         
-        # Remove duplicates
-        for theme in themes:
-            themes[theme] = list(set(themes[theme]))
+        for theme, invention_name in rows:
+            themes[theme].append(invention_name)
         
         return dict(themes)
     
     def get_innovation_timeline(self) -> List[Dict]:
-        """Create a timeline of innovations showing connections."""
-        
-        inventions = self.db.query(InventionModel).order_by(InventionModel.year).all()
-        
-        timeline = []
-        for inv in inventions:
-            if inv.year:
-                timeline.append({
-                    "year": inv.year,
-                    "invention": inv.name,
-                    "key_discovery": inv.discoveries[0].title if inv.discoveries else "Unknown",
-                    "pattern_count": len(inv.patterns),
-                    "prerequisite_count": len(inv.critical_prerequisites) if inv.critical_prerequisites else 0
-                })
-        
-        return timeline
\ No newline at end of file
+        """Create a timeline of innovations showing connections.
+        
+        Reads the timeline rows maintained as inventions and their pattern
+        links are stored, in year order.
+        """
+        
+        entries = self.db.query(TimelineEntryModel).filter(
+            TimelineEntryModel.year.isnot(None),
+            TimelineEntryModel.year != 0
+        ).order_by(TimelineEntryModel.year, TimelineEntryModel.invention_id)
+        
+        return [
+            {
+                "year": entry.year,
+                "invention": entry.invention_name,
+                "key_discovery": entry.key_discovery,
+                "pattern_count": entry.pattern_count,
+                "prerequisite_count": entry.prerequisite_count
+            }
+            for entry in entries
+        ]
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""Client-side rate limiting, retries and adaptive concurrency for LLM calls."""
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, TypeVar
+
+from .config import settings
+
+T = TypeVar("T")
+
+
+class RateLimitExceeded(Exception):
+    """The LLM API kept rate limiting a call after every retry."""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMUnavailable(Exception):
+    """The LLM API kept failing with transient errors after every retry."""
+
+
+class TokenBucket:
+    """Budget of units per minute (requests or tokens), refilled continuously.
+    
+    The bucket holds up to one minute of units. ``reserve`` always takes
+    what it is asked for, letting the balance go negative, and returns how
+    long the caller must wait before using it; later callers queue behind
+    earlier ones in reservation order. A rate of 0 disables the bucket.
+    """
+    
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._available = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self, amount: float = 1) -> float:
+        """Take ``amount`` units; return the seconds to wait before using them."""
+        if self.per_minute <= 0:
+            return 0.0
+        
+        with self._lock:
+            now = time.monotonic()
+            self._available = min(
+                self.per_minute,
+                self._available + (now - self._updated) * self.per_minute / 60
+            )
+            self._updated = now
+            self._available -= amount
+            return max(0.0, -self._available * 60 / self.per_minute)
+    
+    async def acquire(self, amount: float = 1):
+        """Wait until ``amount`` units may be used."""
+        delay = self.reserve(amount)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on concurrent calls.
+    
+    Every call that succeeds within the latency target raises the limit by
+    about one per limit's worth of calls (additive increase); a 429, or a
+    call slower than the target, halves it (multiplicative decrease), at
+    most once per round trip (the smoothed call latency, or ``cooldown``
+    until one is known) so one burst of 429s counts once.
+    Waiters are plain futures, so the limiter works from any event loop.
+    """
+    
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: Optional[int] = None,
+        latency_target: float = 0.0,
+        cooldown: float = 1.0
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum or initial)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._round_trip: Optional[float] = None
+        self._waiters: List[asyncio.Future] = []
+        self._lock = threading.Lock()
+    
+    async def acquire(self):
+        """Wait for a free slot and take it."""
+        while True:
+            with self._lock:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+    
+    def release(self, overloaded: bool = False, latency: Optional[float] = None):
+        """Give back a slot, adjusting the limit from how the call went."""
+        with self._lock:
+            self.in_flight -= 1
+            slow = bool(self.latency_target) and latency is not None and latency > self.latency_target
+            now = time.monotonic()
+            if latency is not None:
+                self._round_trip = latency if self._round_trip is None else 0.8 * self._round_trip + 0.2 * latency
+            
+            if overloaded or slow:
+                if now - self._last_decrease >= (self._round_trip or self.cooldown):
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._last_decrease = now
+            elif latency is not None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+    
+    def _wake(self):
+        """Wake as many waiters as there are free slots."""
+        free = int(self.limit) - self.in_flight
+        for waiter in self._waiters[:max(free, 0)]:
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(_resolve, waiter)
+
+
+def _resolve(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """The server's requested wait, from Retry-After headers, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    """A 429 that waiting can fix (an exhausted quota cannot)."""
+    import openai  # loaded with the LLM client; not needed until a call fails
+    
+    return isinstance(error, openai.RateLimitError) and getattr(error, "code", None) != "insufficient_quota"
+
+
+def _is_transient(error: Exception) -> bool:
+    """Timeouts, dropped connections and 5xx responses."""
+    import openai
+    
+    return isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError))
+
+
+class RateLimiter:
+    """Requests/tokens-per-minute budgets, retries and adaptive concurrency.
+    
+    Every LLM call reserves one request and its estimated tokens, then
+    (async calls only) waits for an AIMD concurrency slot. 429s and
+    transient errors are retried with full-jitter exponential backoff,
+    never sooner than the server's Retry-After; when retries run out the
+    error is raised as ``RateLimitExceeded`` or ``LLMUnavailable``.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        concurrency: Optional[AdaptiveConcurrency] = None
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.concurrency = concurrency or AdaptiveConcurrency(initial=1_000_000)
+        self.retries = 0
+        self.rate_limited = 0
+    
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        """Build the limiter configured in settings."""
+        return cls(
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute,
+            max_retries=settings.llm_max_retries,
+            backoff_base=settings.llm_backoff_base_seconds,
+            backoff_max=settings.llm_backoff_max_seconds,
+            concurrency=AdaptiveConcurrency(
+                initial=settings.llm_max_concurrency,
+                minimum=settings.llm_min_concurrency,
+                maximum=settings.llm_max_concurrency,
+                latency_target=settings.llm_latency_target_seconds
+            )
+        )
+    
+    def call(self, func: Callable[[], T], tokens: int) -> T:
+        """Make a blocking LLM call within the budgets, retrying as needed."""
+        for attempt in range(self.max_retries + 1):
+            time.sleep(max(self.requests.reserve(1), self.tokens.reserve(tokens)))
+            try:
+                return func()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+            time.sleep(delay)
+    
+    async def acall(self, func: Callable[[], Awaitable[T]], tokens: int) -> T:
+        """Make an async LLM call within the budgets and concurrency limit."""
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(max(self.requests.reserve(1), self.tokens.reserve(tokens)))
+            await self.concurrency.acquire()
+            start = time.monotonic()
+            try:
+                result = await func()
+            except BaseException as e:
+                self.concurrency.release(overloaded=_is_rate_limit(e))
+                if not isinstance(e, Exception):
+                    raise
+                delay = self._retry_delay(e, attempt)
+            else:
+                self.concurrency.release(latency=time.monotonic() - start)
+                return result
+            await asyncio.sleep(delay)
+    
+    @asynccontextmanager
+    async def slot(self, tokens: int) -> AsyncIterator[None]:
+        """Budgets and a concurrency slot for a call that is not retried.
+        
+        For streams, which cannot be replayed once output has been passed
+        on. Errors are mapped as they would be after the last retry.
+        """
+        await asyncio.sleep(max(self.requests.reserve(1), self.tokens.reserve(tokens)))
+        await self.concurrency.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.concurrency.release(overloaded=_is_rate_limit(e))
+            self._retry_delay(e, self.max_retries)
+            raise
+        except BaseException:
+            self.concurrency.release()
+            raise
+        else:
+            self.concurrency.release(latency=time.monotonic() - start)
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """How long to back off before retrying ``error``, or raise it."""
+        rate_limited = _is_rate_limit(error)
+        if not rate_limited and not _is_transient(error):
+            raise error
+        
+        retry_after = _retry_after(error)
+        if rate_limited:
+            self.rate_limited += 1
+        if attempt >= self.max_retries:
+            if rate_limited:
+                raise RateLimitExceeded("LLM API rate limit exceeded", retry_after) from error
+            raise LLMUnavailable(f"LLM API unavailable: {error}") from error
+        
+        self.retries += 1
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(backoff, retry_after or 0.0)
+    
+    def stats(self) -> dict:
+        """Current limit and counters."""
+        return {
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited
+        }
@@ -71,10 +71,29 @@ class InventionAnalysis(BaseModel):
     key_lesson: str = Field(..., description="Main lesson about innovation from this invention")
 
 
+class FocusDelta(BaseModel):
+    """What a focused analysis adds to an invention's base analysis."""
+    summary: str = Field(..., description="The invention's history seen through the focus areas")
+    highlighted_discovery_ids: List[str] = Field(default_factory=list, description="Ids of base discoveries that matter most for the focus areas")
+    discoveries: List[Discovery] = Field(default_factory=list, description="Discoveries relevant to the focus areas that the base analysis lacks")
+    connections: List[Connection] = Field(default_factory=list, description="Connections to or from the new discoveries; may use base discovery ids")
+    insights: List[str] = Field(default_factory=list, description="Lessons specific to the focus areas")
+
+
+class FocusAnalysis(BaseModel):
+    """The focus-specific part of a focused analysis."""
+    focus_areas: List[str]
+    summary: str
+    highlighted_discovery_ids: List[str] = Field(default_factory=list, description="Base discoveries most relevant to the focus areas")
+    added_discovery_ids: List[str] = Field(default_factory=list, description="Discoveries the focus added to the base chain")
+    insights: List[str] = Field(default_factory=list)
+
+
 class InventionRequest(BaseModel):
     """Request to analyze an invention."""
     invention_name: str = Field(..., description="Name of the invention to analyze")
     focus_areas: Optional[List[str]] = Field(None, description="Specific aspects to focus on")
+    refresh: bool = Field(False, description="Bypass the LLM response cache")
 
 
 class InventionResponse(BaseModel):
@@ -82,12 +101,111 @@ class InventionResponse(BaseModel):
     analysis: InventionAnalysis
     id: int
     created_at: datetime
-    
-    
+    focus: Optional[FocusAnalysis] = Field(None, description="Set when focus areas were requested")
+    discovery_entities: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Discovery entity id of each discovery, by discovery id"
+    )
+
+
 class PatternAnalysis(BaseModel):
     """Cross-invention pattern analysis."""
     pattern_type: PatternType
     description: str
     inventions: List[str] = Field(..., description="Inventions that exhibit this pattern")
     examples: List[Dict[str, str]] = Field(..., description="Specific examples from each invention")
-    insights: str = Field(..., description="What this pattern teaches about innovation")
\ No newline at end of file
+    insights: str = Field(..., description="What this pattern teaches about innovation")
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a queued analysis job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JobResponse(BaseModel):
+    """Status of a queued analysis job."""
+    id: str
+    status: JobStatus
+    invention_name: str
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    result: Optional[InventionResponse] = Field(None, description="The analysis once the job is done")
+
+
+class BatchRequest(BaseModel):
+    """Request to analyze many inventions."""
+    invention_names: List[str] = Field(..., min_length=1, description="Names of the inventions to analyze")
+    focus_areas: Optional[List[str]] = Field(None, description="Specific aspects to focus on, for every invention")
+    refresh: bool = Field(False, description="Bypass the LLM response cache")
+
+
+class BatchItemStatus(str, Enum):
+    """Outcome of one invention in a batch."""
+    SKIPPED = "skipped"  # already stored
+    ANALYZED = "analyzed"
+    FAILED = "failed"
+
+
+class BatchProgress(BaseModel):
+    """Progress report for one invention in a batch."""
+    invention_name: str
+    status: BatchItemStatus
+    invention_id: Optional[int] = None
+    error: Optional[str] = None
+    completed: int = Field(..., description="Inventions finished so far, this one included")
+    total: int
+
+
+class BatchSummary(BaseModel):
+    """Totals for a finished batch."""
+    total: int
+    analyzed: int
+    skipped: int
+    failed: int
+
+
+class SearchHitKind(str, Enum):
+    """What a search hit points at."""
+    INVENTION = "invention"
+    DISCOVERY = "discovery"
+
+
+class SearchHit(BaseModel):
+    """One invention or discovery matching a search."""
+    kind: SearchHitKind
+    invention_id: int
+    invention_name: str
+    discovery_id: Optional[int] = None
+    title: str = Field(..., description="Invention name or discovery title, matches marked")
+    snippet: str = Field(..., description="Matching text around the first match, matches marked")
+    score: Optional[float] = Field(None, description="Relevance (higher is better); null when results are unranked")
+
+
+class RelatedInvention(BaseModel):
+    """A stored invention similar to another one."""
+    id: int
+    name: str
+    year: Optional[int] = None
+    score: float = Field(..., description="Cosine similarity of the two analyses, 0 to 1")
+
+
+class DiscoveryOccurrence(BaseModel):
+    """An invention whose analysis includes a discovery entity."""
+    invention_id: int
+    invention_name: str
+    invention_year: Optional[int] = None
+    discovery_id: int = Field(..., description="The discovery as stored in this invention's analysis")
+
+
+class DiscoveryEntity(BaseModel):
+    """A discovery shared by the analyses of every invention that builds on it."""
+    id: int
+    title: str
+    year: Optional[int] = None
+    discoverers: List[str] = Field(default_factory=list, description="Surnames of the discoverers")
+    inventions: List[DiscoveryOccurrence]
@@ -0,0 +1,316 @@
+"""Full-text search over invention narratives, discoveries and lessons."""
+import html
+import re
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import literal, or_, select, text, union_all
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, selectinload
+
+from .config import settings
+from .models import DiscoveryModel, InventionModel
+from .schemas import SearchHit, SearchHitKind
+
+# One row per invention (name; summary, narrative, key lesson) and per
+# discovery (title; description, significance). Invention rows use the
+# negated invention id as rowid and discovery rows the discovery id, so a
+# row can be found, replaced or checked for without another index.
+SEARCH_TABLE = "search_index"
+CREATE_SEARCH_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    title, body, invention_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+INSERT_ROW = text(
+    f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, title, body, invention_id) "
+    "VALUES (:rowid, :title, :body, :invention_id)"
+)
+
+# bm25 weights of the title and body columns
+TITLE_WEIGHT = 4.0
+BODY_WEIGHT = 1.0
+
+# Matches are wrapped in these markers in titles and snippets
+MARK_START = "<mark>"
+MARK_END = "</mark>"
+
+# Stand-ins for the markers until the stored text around them is escaped
+_SENTINEL_START = "\x02"
+_SENTINEL_END = "\x03"
+ELLIPSIS = "…"
+SNIPPET_TOKENS = 16
+
+# A query is words and "quoted phrases"; a trailing * matches prefixes
+_TERMS = re.compile(r'"([^"]*)"\*?|(\S+)')
+
+# Whether the FTS5 table exists; decided by create_search_index or on first use
+_fts_available: Optional[bool] = None
+
+
+def create_search_index(conn) -> bool:
+    """Create the FTS5 table on SQLite. Returns whether full-text search is available."""
+    global _fts_available
+    _fts_available = False
+    if conn.dialect.name == "sqlite" and settings.search_fts_enabled:
+        try:
+            conn.exec_driver_sql(CREATE_SEARCH_TABLE)
+            _fts_available = True
+        except OperationalError:
+            # SQLite built without FTS5; search falls back to LIKE
+            pass
+    return _fts_available
+
+
+def fts_enabled(db: Session) -> bool:
+    """Whether searches and writes go through the FTS5 index."""
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = db.get_bind().dialect.name == "sqlite" and db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": SEARCH_TABLE}
+        ).first() is not None
+    return _fts_available and settings.search_fts_enabled
+
+
+def _plain(value: Optional[str]) -> str:
+    """Text with any stray sentinel characters dropped."""
+    return (value or "").replace(_SENTINEL_START, "").replace(_SENTINEL_END, "")
+
+
+def _join(*parts: Optional[str]) -> str:
+    return "\n".join(_plain(part) for part in parts if part)
+
+
+def index_invention(db: Session, invention: InventionModel):
+    """Add an invention and its discoveries to the search index, uncommitted.
+    
+    Needs the ids, so runs after the invention and discoveries are flushed.
+    """
+    if not fts_enabled(db):
+        return
+    rows = [{
+        "rowid": -invention.id,
+        "title": _plain(invention.name),
+        "body": _join(invention.summary, invention.narrative, invention.key_lesson),
+        "invention_id": invention.id
+    }]
+    rows.extend({
+        "rowid": discovery.id,
+        "title": _plain(discovery.title),
+        "body": _join(discovery.description, discovery.significance),
+        "invention_id": invention.id
+    } for discovery in invention.discoveries)
+    db.execute(INSERT_ROW, rows)
+
+
+def backfill_search(db: Session, batch_size: int = 500) -> int:
+    """Index inventions stored before the search index existed (or while it was off).
+    
+    Returns the number of inventions backfilled.
+    """
+    if not fts_enabled(db):
+        return 0
+    missing = db.query(InventionModel).filter(
+        text(f"NOT EXISTS (SELECT 1 FROM {SEARCH_TABLE} WHERE rowid = -inventions.id)")
+    ).options(
+        selectinload(InventionModel.discoveries)
+    ).order_by(InventionModel.id)
+    
+    count = 0
+    while True:
+        inventions = missing.limit(batch_size).all()
+        if not inventions:
+            return count
+        for invention in inventions:
+            index_invention(db, invention)
+        db.commit()
+        count += len(inventions)
+
+
+def parse_query(query: str) -> List[Tuple[str, bool]]:
+    """Split a query into (term, is_prefix) pairs; quoted phrases stay whole."""
+    terms = []
+    for match in _TERMS.finditer(query):
+        phrase, word = match.group(1), match.group(2)
+        term = phrase if phrase is not None else word
+        prefix = match.group(0).endswith("*")
+        term = " ".join(term.rstrip("*").replace('"', " ").split())
+        if term:
+            terms.append((term, prefix))
+    if not terms:
+        raise ValueError("Empty search query")
+    return terms
+
+
+def _fts_query(terms: List[Tuple[str, bool]]) -> str:
+    """An FTS5 MATCH expression requiring every term; user text is always quoted."""
+    return " ".join(f'"{term}"' + ("*" if prefix else "") for term, prefix in terms)
+
+
+def search(
+    db: Session,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    kind: Optional[SearchHitKind] = None
+) -> Tuple[List[SearchHit], bool]:
+    """Inventions and discoveries matching every term of ``query``.
+    
+    With FTS5 the hits are ranked by bm25 (titles weigh more than text) and
+    carry highlighted snippets. Other backends, or SQLite without FTS5,
+    scan with LIKE and return hits in storage order, inventions first.
+    Returns one page of hits and whether another page follows.
+    """
+    terms = parse_query(query)
+    if fts_enabled(db):
+        rows = _fts_search(db, terms, limit + 1, offset, kind)
+    else:
+        rows = _like_search(db, terms, limit + 1, offset, kind)
+    return rows[:limit], len(rows) > limit
+
+
+def _fts_search(
+    db: Session,
+    terms: List[Tuple[str, bool]],
+    limit: int,
+    offset: int,
+    kind: Optional[SearchHitKind]
+) -> List[SearchHit]:
+    kind_filter = {
+        None: "",
+        SearchHitKind.INVENTION: f"AND {SEARCH_TABLE}.rowid < 0",
+        SearchHitKind.DISCOVERY: f"AND {SEARCH_TABLE}.rowid > 0"
+    }[kind]
+    statement = text(f"""
+        SELECT {SEARCH_TABLE}.rowid AS rowid, {SEARCH_TABLE}.invention_id AS invention_id,
+               inventions.name AS invention_name,
+               highlight({SEARCH_TABLE}, 0, :mark_start, :mark_end) AS title,
+               snippet({SEARCH_TABLE}, 1, :mark_start, :mark_end, :ellipsis, :tokens) AS snippet,
+               rank
+        FROM {SEARCH_TABLE}
+        JOIN inventions ON inventions.id = {SEARCH_TABLE}.invention_id
+        WHERE {SEARCH_TABLE} MATCH :query AND rank MATCH :ranking {kind_filter}
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    """)
+    try:
+        rows = db.execute(statement, {
+            "query": _fts_query(terms),
+            "ranking": f"bm25({TITLE_WEIGHT}, {BODY_WEIGHT})",
+            "mark_start": _SENTINEL_START,
+            "mark_end": _SENTINEL_END,
+            "ellipsis": ELLIPSIS,
+            "tokens": SNIPPET_TOKENS,
+            "limit": limit,
+            "offset": offset
+        }).all()
+    except OperationalError as e:
+        raise ValueError(f"Invalid search query: {e.orig}")
+    
+    return [
+        SearchHit(
+            kind=SearchHitKind.INVENTION if row.rowid < 0 else SearchHitKind.DISCOVERY,
+            invention_id=row.invention_id,
+            invention_name=row.invention_name,
+            discovery_id=row.rowid if row.rowid > 0 else None,
+            title=_marked(row.title),
+            snippet=_marked(row.snippet),
+            score=-row.rank
+        )
+        for row in rows
+    ]
+
+
+def _like_search(
+    db: Session,
+    terms: List[Tuple[str, bool]],
+    limit: int,
+    offset: int,
+    kind: Optional[SearchHitKind]
+) -> List[SearchHit]:
+    def matches_all(columns: List[Any]):
+        return [or_(*(column.ilike(_like_pattern(term), escape="\\") for column in columns)) for term, _ in terms]
+    
+    inventions = select(
+        literal(0).label("kind"),
+        InventionModel.id.label("invention_id"),
+        InventionModel.name.label("invention_name"),
+        literal(None).label("discovery_id"),
+        InventionModel.name.label("title"),
+        InventionModel.summary, InventionModel.narrative, InventionModel.key_lesson
+    ).where(*matches_all([
+        InventionModel.name, InventionModel.summary, InventionModel.narrative, InventionModel.key_lesson
+    ]))
+    discoveries = select(
+        literal(1).label("kind"),
+        InventionModel.id.label("invention_id"),
+        InventionModel.name.label("invention_name"),
+        DiscoveryModel.id.label("discovery_id"),
+        DiscoveryModel.title.label("title"),
+        DiscoveryModel.description, DiscoveryModel.significance, literal(None)
+    ).join(
+        InventionModel, InventionModel.id == DiscoveryModel.invention_id
+    ).where(*matches_all([
+        DiscoveryModel.title, DiscoveryModel.description, DiscoveryModel.significance
+    ]))
+    
+    parts = {
+        None: [inventions, discoveries],
+        SearchHitKind.INVENTION: [inventions],
+        SearchHitKind.DISCOVERY: [discoveries]
+    }[kind]
+    combined = union_all(*parts).subquery()
+    rows = db.execute(
+        select(combined).order_by(combined.c.kind, combined.c.invention_id, combined.c.discovery_id)
+        .limit(limit).offset(offset)
+    ).all()
+    
+    words = [term for term, _ in terms]
+    return [
+        SearchHit(
+            kind=SearchHitKind.INVENTION if row[0] == 0 else SearchHitKind.DISCOVERY,
+            invention_id=row[1],
+            invention_name=row[2],
+            discovery_id=row[3],
+            title=_marked(_highlight(_plain(row[4]), words)),
+            snippet=_marked(_snippet(_join(*row[5:]), words)),
+            score=None
+        )
+        for row in rows
+    ]
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _marked(value: Optional[str]) -> str:
+    """Stored text made safe to render as HTML, with its matches in ``<mark>``.
+    
+    Titles and snippets are model output; they are escaped before the
+    sentinels are turned into tags, so only the markers are markup.
+    """
+    escaped = html.escape(value or "", quote=False)
+    return escaped.replace(_SENTINEL_START, MARK_START).replace(_SENTINEL_END, MARK_END)
+
+
+def _highlight(value: str, words: List[str]) -> str:
+    """Mark every occurrence of the search terms, ignoring case."""
+    pattern = re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+    return pattern.sub(lambda match: f"{_SENTINEL_START}{match.group(0)}{_SENTINEL_END}", value)
+
+
+def _snippet(value: str, words: List[str]) -> str:
+    """About ``SNIPPET_TOKENS`` words around the first match, highlighted."""
+    tokens = value.split()
+    lowered = [token.casefold() for token in tokens]
+    first = next(
+        (i for i, token in enumerate(lowered) if any(word.split()[0].casefold() in token for word in words)),
+        0
+    )
+    start = max(0, min(first - SNIPPET_TOKENS // 4, len(tokens) - SNIPPET_TOKENS))
+    window = " ".join(tokens[start:start + SNIPPET_TOKENS])
+    prefix = ELLIPSIS if start > 0 else ""
+    suffix = ELLIPSIS if start + SNIPPET_TOKENS < len(tokens) else ""
+    return prefix + _highlight(window, words) + suffix
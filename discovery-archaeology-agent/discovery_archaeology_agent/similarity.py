@@ -0,0 +1,364 @@
+"""Related inventions from hashed TF-IDF vectors of the stored analyses."""
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+
+from .config import settings
+from .database import SessionLocal
+from .models import ConnectionModel, DiscoveryModel, InventionModel, PatternModel, invention_patterns
+from .naming import canonicalize
+from .schemas import InventionAnalysis, RelatedInvention
+
+# Feature groups and their share of an invention's vector. Each group is
+# normalized on its own before they are added up, so a long narrative
+# cannot drown out the patterns or the prerequisites.
+TEXT = 0  # name, summary, narrative, lesson, serendipity and blindness examples
+CHAIN = 1  # discovery text, types and discoverers, and the steps between discoveries
+PATTERNS = 2
+PREREQUISITES = 3
+GROUP_WEIGHTS = np.array([1.0, 1.0, 0.5, 0.75])
+
+_WORDS = re.compile(r"\w\w+")
+
+# Terms are hashed with Python's string hash, which is fixed for the life
+# of the process (the index is never persisted). Document frequencies are
+# counted per hashed term in this many slots, salted by group so the same
+# word in two groups counts separately.
+FREQUENCY_SLOTS = 1 << 20
+_GROUP_SALTS = np.array([0, 0x5BD1E995, 0x27D4EB2F, 0x165667B1], dtype=np.int64)
+_SIGN_BIT = 1 << 40
+
+# Inventions read from the database per query while loading
+LOAD_BATCH_SIZE = 2000
+
+# The index is rebuilt in the background, recomputing every IDF weight,
+# once the corpus has grown this many times over since the last build; in
+# between, new inventions are weighted with the frequencies of the moment
+REBUILD_GROWTH = 2.0
+
+
+def _words(texts: Iterable[Optional[str]]) -> List[str]:
+    return _WORDS.findall(" ".join(text for text in texts if text).casefold())
+
+
+def features(
+    texts: Iterable[Optional[str]],
+    chain_texts: Iterable[Optional[str]],
+    chain_terms: Iterable[str],
+    patterns: Iterable[str],
+    prerequisites: Iterable[str]
+) -> Tuple[Counter, ...]:
+    """Count the terms of one analysis, per feature group.
+    
+    ``chain_terms`` are whole terms (discovery types, discoverers and
+    ``type>relationship>type`` steps); prerequisites count both as a whole
+    and word by word.
+    """
+    prerequisites = list(prerequisites)
+    chain = Counter(_words(chain_texts))
+    chain.update("=" + term for term in chain_terms)
+    required = Counter(_words(prerequisites))
+    required.update("=" + canonicalize(prerequisite) for prerequisite in prerequisites)
+    return Counter(_words(texts)), chain, Counter(pattern for pattern in patterns), required
+
+
+def _discovery_terms(discovery_type: Optional[str], discoverers: Optional[List[str]]) -> List[str]:
+    terms = [f"type {discovery_type}"] if discovery_type else []
+    terms.extend(f"by {canonicalize(person)}" for person in discoverers or [] if person)
+    return terms
+
+
+def analysis_features(analysis: InventionAnalysis) -> Tuple[Counter, ...]:
+    """Features of an analysis that is about to be stored."""
+    types = {discovery.id: discovery.discovery_type.value for discovery in analysis.discoveries}
+    chain_terms = []
+    for discovery in analysis.discoveries:
+        chain_terms.extend(_discovery_terms(discovery.discovery_type.value, discovery.discoverers))
+    chain_terms.extend(
+        f"{types.get(connection.from_discovery_id)}>{connection.relationship_type}>"
+        f"{types.get(connection.to_discovery_id)}"
+        for connection in analysis.connections
+    )
+    return features(
+        [analysis.invention_name, analysis.summary, analysis.narrative, analysis.key_lesson,
+         *analysis.serendipity_moments, *analysis.objective_blindness_examples],
+        [text for discovery in analysis.discoveries for text in (
+            discovery.title, discovery.description, discovery.significance,
+            discovery.original_goal, discovery.actual_outcome
+        )],
+        chain_terms,
+        [pattern.value for pattern in analysis.patterns_identified],
+        analysis.critical_prerequisites
+    )
+
+
+def _grown(array: np.ndarray, size: int) -> np.ndarray:
+    """``array`` with room for at least ``size`` rows, doubling as it grows."""
+    if size <= len(array):
+        return array
+    grown = np.zeros((max(size, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _load(db: Session, after_id: int) -> Iterator[Tuple[int, str, Optional[int], Tuple[Counter, ...]]]:
+    """Names, years and features of the stored inventions with an id above ``after_id``, in id order."""
+    source, target = aliased(DiscoveryModel), aliased(DiscoveryModel)
+    while True:
+        inventions = db.execute(
+            select(
+                InventionModel.id, InventionModel.name, InventionModel.year,
+                InventionModel.summary, InventionModel.narrative, InventionModel.key_lesson,
+                InventionModel.serendipity_moments, InventionModel.objective_blindness_examples,
+                InventionModel.critical_prerequisites
+            ).where(InventionModel.id > after_id).order_by(InventionModel.id).limit(LOAD_BATCH_SIZE)
+        ).all()
+        if not inventions:
+            return
+        first, last = inventions[0].id, inventions[-1].id
+        
+        chain_texts: Dict[int, List[Optional[str]]] = {}
+        chain_terms: Dict[int, List[str]] = {}
+        for row in db.execute(
+            select(
+                DiscoveryModel.invention_id, DiscoveryModel.title, DiscoveryModel.description,
+                DiscoveryModel.significance, DiscoveryModel.original_goal, DiscoveryModel.actual_outcome,
+                DiscoveryModel.discovery_type, DiscoveryModel.discoverers
+            ).where(DiscoveryModel.invention_id.between(first, last))
+        ):
+            chain_texts.setdefault(row.invention_id, []).extend(row[1:6])
+            chain_terms.setdefault(row.invention_id, []).extend(
+                _discovery_terms(row.discovery_type, row.discoverers)
+            )
+        for invention_id, from_type, relationship_type, to_type in db.execute(
+            select(
+                source.invention_id, source.discovery_type,
+                ConnectionModel.relationship_type, target.discovery_type
+            ).join(
+                source, source.id == ConnectionModel.from_discovery_id
+            ).join(
+                target, target.id == ConnectionModel.to_discovery_id
+            ).where(source.invention_id.between(first, last))
+        ):
+            chain_terms.setdefault(invention_id, []).append(f"{from_type}>{relationship_type}>{to_type}")
+        
+        patterns: Dict[int, List[str]] = {}
+        for invention_id, pattern_type in db.execute(
+            select(invention_patterns.c.invention_id, PatternModel.pattern_type).join(
+                PatternModel, PatternModel.id == invention_patterns.c.pattern_id
+            ).where(invention_patterns.c.invention_id.between(first, last))
+        ):
+            patterns.setdefault(invention_id, []).append(pattern_type)
+        
+        for row in inventions:
+            yield row.id, row.name, row.year, features(
+                [row.name, row.summary, row.narrative, row.key_lesson,
+                 *(row.serendipity_moments or []), *(row.objective_blindness_examples or [])],
+                chain_texts.get(row.id, []),
+                chain_terms.get(row.id, []),
+                patterns.get(row.id, []),
+                row.critical_prerequisites or []
+            )
+        after_id = last
+
+
+class _Corpus:
+    """Unit-length vectors of the stored inventions, one matrix row each."""
+    
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        self.matrix = np.zeros((0, dimensions), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.names: List[str] = []
+        self.years: List[Optional[int]] = []
+        self.rows: Dict[int, int] = {}
+        self.size = 0
+        self.frequencies = np.zeros(FREQUENCY_SLOTS, dtype=np.int32)
+        self.documents = 0
+        self.watermark = 0  # highest invention id loaded from the database
+        self.built_size = 0
+    
+    @classmethod
+    def build(cls, db: Session, dimensions: int) -> "_Corpus":
+        """Load every stored invention, weighting all of them with the final IDF."""
+        corpus = cls(dimensions)
+        documents = []
+        for invention_id, name, year, groups in _load(db, 0):
+            terms = corpus._terms(groups)
+            corpus._count(*terms[:2])
+            documents.append((invention_id, name, year, terms))
+            corpus.watermark = invention_id
+        for invention_id, name, year, terms in documents:
+            corpus._append(invention_id, name, year, corpus._vector(*terms))
+        corpus.built_size = corpus.size
+        return corpus
+    
+    def _terms(self, groups: Tuple[Counter, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Hashes, groups and counts of the terms of one analysis."""
+        sizes = [len(terms) for terms in groups]
+        hashes = np.fromiter(
+            (value for terms in groups for value in map(hash, terms)), dtype=np.int64, count=sum(sizes)
+        )
+        counts = np.fromiter(
+            (count for terms in groups for count in terms.values()), dtype=np.float64, count=sum(sizes)
+        )
+        return hashes, np.repeat(np.arange(len(groups)), sizes), counts
+    
+    def _slots(self, hashes: np.ndarray, groups: np.ndarray) -> np.ndarray:
+        return (hashes ^ _GROUP_SALTS[groups]) % FREQUENCY_SLOTS
+    
+    def _count(self, hashes: np.ndarray, groups: np.ndarray):
+        self.frequencies[np.unique(self._slots(hashes, groups))] += 1
+        self.documents += 1
+    
+    def _vector(self, hashes: np.ndarray, groups: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Sublinear TF times smoothed IDF, hashed into ``dimensions`` signed buckets."""
+        idf = np.log((1 + self.documents) / (1 + self.frequencies[self._slots(hashes, groups)])) + 1
+        weights = (1 + np.log(counts)) * idf * np.where(hashes & _SIGN_BIT, 1.0, -1.0)
+        slots = groups * self.dimensions + hashes % self.dimensions
+        grouped = np.bincount(
+            slots, weights, minlength=len(GROUP_WEIGHTS) * self.dimensions
+        ).reshape(len(GROUP_WEIGHTS), self.dimensions)
+        norms = np.linalg.norm(grouped, axis=1, keepdims=True)
+        vector = GROUP_WEIGHTS @ (grouped / np.where(norms > 0, norms, 1))
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm > 0 else vector).astype(np.float32)
+    
+    def _append(self, invention_id: int, name: str, year: Optional[int], vector: np.ndarray):
+        # Rows past ``size`` are never read, so lookups holding the old
+        # matrix are unaffected; growing copies it into a new one
+        row = self.size
+        self.matrix = _grown(self.matrix, row + 1)
+        self.ids = _grown(self.ids, row + 1)
+        self.matrix[row] = vector
+        self.ids[row] = invention_id
+        self.names.append(name)
+        self.years.append(year)
+        self.rows[invention_id] = row
+        self.size = row + 1
+    
+    def add(self, invention_id: int, name: str, year: Optional[int], groups: Tuple[Counter, ...]):
+        """Add one invention, counting its terms into the document frequencies."""
+        if invention_id in self.rows:
+            return
+        terms = self._terms(groups)
+        self._count(*terms[:2])
+        self._append(invention_id, name, year, self._vector(*terms))
+    
+    def catch_up(self, db: Session):
+        """Load inventions stored since the last load."""
+        latest = db.scalar(select(func.max(InventionModel.id))) or 0
+        if latest <= self.watermark:
+            return
+        for invention_id, name, year, groups in _load(db, self.watermark):
+            self.add(invention_id, name, year, groups)
+            self.watermark = invention_id
+    
+    @property
+    def stale(self) -> bool:
+        """Whether the corpus has outgrown the frequencies it was built with."""
+        return self.size >= REBUILD_GROWTH * max(self.built_size, 1)
+
+
+class RelatedIndex:
+    """Hashed TF-IDF vectors of every stored invention, held in memory.
+    
+    Built from the database on first use (or at startup with ``warm``) and
+    kept per process. Inventions stored by this worker, singly or in
+    batches, are added as they are committed; every lookup also loads
+    inventions with a higher id than the index has seen, which covers other
+    workers and anything skipped while a lookup held the index. Lookups score
+    every invention with one matrix-vector product and select the top k
+    with ``argpartition``. Rebuilds run in a background thread while
+    lookups use the current index.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()  # guards the corpus while it grows
+        self._build_lock = threading.Lock()  # one build at a time
+        self._corpus: Optional[_Corpus] = None
+        self._rebuilding = False
+    
+    def _build(self, if_missing: bool = False):
+        with self._build_lock:
+            try:
+                if if_missing and self._corpus is not None:
+                    return
+                with SessionLocal() as db:
+                    corpus = _Corpus.build(db, settings.related_dimensions)
+                with self._lock:
+                    self._corpus = corpus
+            finally:
+                self._rebuilding = False
+    
+    def _rebuild_in_background(self):
+        threading.Thread(target=self._build, name="related-index", daemon=True).start()
+    
+    def warm(self):
+        """Start building the index in the background, if it is not built yet."""
+        with self._lock:
+            if self._corpus is not None or self._rebuilding:
+                return
+            self._rebuilding = True
+        self._rebuild_in_background()
+    
+    def add_analysis(self, invention_id: int, analysis: InventionAnalysis):
+        """Add a just-stored analysis, if the index is built.
+        
+        Never waits: while a lookup holds the index the invention is left
+        for the next lookup to load.
+        """
+        if self._corpus is None or not self._lock.acquire(blocking=False):
+            return
+        try:
+            corpus = self._corpus
+            corpus.add(invention_id, analysis.invention_name, analysis.invention_year, analysis_features(analysis))
+            if invention_id == corpus.watermark + 1:
+                corpus.watermark = invention_id
+        finally:
+            self._lock.release()
+    
+    def related(self, db: Session, invention_id: int, limit: int = 10) -> Optional[List[RelatedInvention]]:
+        """The ``limit`` inventions most similar to one, best first; None if it is not stored."""
+        if self._corpus is None:
+            self._build(if_missing=True)
+        
+        with self._lock:
+            corpus = self._corpus
+            corpus.catch_up(db)
+            row = corpus.rows.get(invention_id)
+            refresh = corpus.stale and not self._rebuilding
+            if refresh:
+                self._rebuilding = True
+            size, matrix, ids, names, years = corpus.size, corpus.matrix, corpus.ids, corpus.names, corpus.years
+        if refresh:
+            self._rebuild_in_background()
+        if row is None:
+            return None
+        
+        scores = matrix[:size] @ matrix[row]
+        scores[row] = -math.inf
+        k = min(limit, size - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [
+            RelatedInvention(id=int(ids[i]), name=names[i], year=years[i], score=round(float(scores[i]), 4))
+            for i in top if scores[i] > 0
+        ]
+    
+    def clear(self):
+        """Drop the index; the next lookup builds it again."""
+        with self._build_lock, self._lock:
+            self._corpus = None
+
+
+# Shared by every session of the process
+related_index = RelatedIndex()
@@ -0,0 +1,76 @@
+"""Single-flight coalescing of identical in-flight work."""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .models import AnalysisLeaseModel
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key.
+    
+    The first caller for a key starts the work; later callers await the
+    same task and receive its result (or exception). The task is shielded,
+    so a cancelled caller does not cancel the work for everyone else.
+    """
+    
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+    
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``func`` once per key among concurrent callers."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    def in_flight(self) -> int:
+        """Number of keys currently being worked on."""
+        return len(self._in_flight)
+
+
+class AnalysisLease:
+    """Cross-worker lease on a single-flight key, stored as a database row.
+    
+    Each worker process has its own ``SingleFlight``; the lease row stops
+    two processes from analyzing the same key at once. Leases expire so a
+    crashed worker cannot block a key forever.
+    """
+    
+    def __init__(self, db: Session, key: str, ttl_seconds: int):
+        self.db = db
+        self.key = key
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.owner = uuid.uuid4().hex
+    
+    def acquire(self) -> bool:
+        """Try to take the lease; return False if another worker holds it."""
+        now = datetime.utcnow()
+        try:
+            self.db.add(AnalysisLeaseModel(key=self.key, owner=self.owner, expires_at=now + self.ttl))
+            self.db.commit()
+            return True
+        except IntegrityError:
+            self.db.rollback()
+        
+        # Take over an expired lease left by a crashed worker
+        taken = self.db.query(AnalysisLeaseModel).filter(
+            AnalysisLeaseModel.key == self.key,
+            AnalysisLeaseModel.expires_at < now
+        ).update({"owner": self.owner, "expires_at": now + self.ttl})
+        self.db.commit()
+        return taken == 1
+    
+    def release(self):
+        """Drop the lease if this worker still owns it."""
+        self.db.query(AnalysisLeaseModel).filter(
+            AnalysisLeaseModel.key == self.key,
+            AnalysisLeaseModel.owner == self.owner
+        ).delete()
+        self.db.commit()
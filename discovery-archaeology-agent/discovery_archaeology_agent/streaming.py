@@ -0,0 +1,164 @@
+"""Incremental parsing of a streamed JSON object."""
+import json
+from typing import Any, List, Optional, Tuple
+
+# (kind, key, value): "item" for each finished element of a top-level
+# array of objects, "field" for each finished top-level value
+ScanEvent = Tuple[str, str, Any]
+
+
+class IncrementalJSONScanner:
+    """Report parts of a top-level JSON object as soon as they are complete.
+    
+    Text is fed in arbitrary chunks, as it streams from the model. Anything
+    before the first ``{`` (such as a Markdown code fence) is skipped, as is
+    anything after the object closes (a fence, or a note from the model). The
+    scanner only tracks nesting and string state; each finished piece is
+    handed to ``json.loads``, so it accepts exactly what the final parse
+    will accept. A piece that does not parse is skipped, and the final
+    parse, with its fallbacks, decides what to make of it.
+    
+    Chunks are kept in a list and only joined when a piece is loaded, and
+    text before the earliest value still open is dropped, so the cost stays
+    linear in the length of the response.
+    """
+    
+    def __init__(self):
+        self._parts: List[str] = []  # chunks not yet joined onto _buffer
+        self._buffer = ""
+        self._base = 0  # offset of _buffer in the whole text
+        self._length = 0  # characters fed since the first {
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        
+        # Top-level object state
+        self._key: Optional[str] = None
+        self._expect_key = True
+        self._value_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+    
+    def feed(self, chunk: str) -> List[ScanEvent]:
+        """Consume a chunk of text and return the events it completed."""
+        if self._done:
+            return []
+        if not self._started:
+            brace = chunk.find("{")
+            if brace == -1:
+                return []
+            chunk = chunk[brace:]
+            self._started = True
+        
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        events = []
+        for index, char in enumerate(chunk):
+            self._pos = offset + index
+            self._step(char, events)
+            if self._done:
+                break
+        self._trim()
+        return events
+    
+    def _step(self, char: str, events: List[ScanEvent]):
+        depth = len(self._stack)
+        
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if depth == 1 and self._expect_key:
+                    self._key = self._load(self._string_start, self._pos + 1)
+                elif depth == 1:
+                    self._emit_field(events, self._pos + 1)
+            return
+        
+        if char == '"':
+            self._in_string = True
+            self._string_start = self._pos
+            if depth == 1 and not self._expect_key and self._value_start is None:
+                self._value_start = self._pos
+        elif char in "{[":
+            if depth == 1 and self._value_start is None:
+                self._value_start = self._pos
+            elif depth == 2 and self._stack[1] == "[" and char == "{":
+                self._item_start = self._pos
+            self._stack.append(char)
+        elif char in "}]":
+            if depth == 1:
+                # End of the top-level object closes any bare scalar value
+                self._end_scalar(events)
+            self._stack.pop()
+            depth = len(self._stack)
+            if depth == 0:
+                # The top-level object is complete; ignore what follows
+                self._done = True
+            elif depth == 2 and self._item_start is not None:
+                item = self._load(self._item_start, self._pos + 1)
+                if item is not None:
+                    events.append(("item", self._key, item))
+                self._item_start = None
+            elif depth == 1:
+                self._emit_field(events, self._pos + 1)
+        elif depth == 1:
+            if char == ":":
+                self._expect_key = False
+            elif char == ",":
+                self._end_scalar(events)
+                self._expect_key = True
+            elif not char.isspace() and self._value_start is None and not self._expect_key:
+                # Start of a number, true, false or null
+                self._value_start = self._pos
+    
+    def _end_scalar(self, events: List[ScanEvent]):
+        """Emit a pending number, true, false or null at a , or }."""
+        if self._value_start is not None:
+            self._emit_field(events, self._pos)
+    
+    def _emit_field(self, events: List[ScanEvent], end: int):
+        text = self._text(self._value_start, end)
+        self._value_start = None
+        try:
+            events.append(("field", self._key, json.loads(text)))
+        except ValueError:
+            pass
+    
+    def _load(self, start: int, end: int) -> Any:
+        """Parse a finished piece; None if it is not valid JSON."""
+        try:
+            return json.loads(self._text(start, end))
+        except ValueError:
+            return None
+    
+    def _text(self, start: int, end: int) -> str:
+        self._join()
+        return self._buffer[start - self._base:end - self._base]
+    
+    def _join(self):
+        if self._parts:
+            self._buffer += "".join(self._parts)
+            self._parts = []
+    
+    def _trim(self):
+        """Drop text no open value can still need.
+        
+        Only once at least half the held text can go, so each character is
+        copied a bounded number of times however small the chunks are.
+        """
+        starts = [start for start in (self._value_start, self._item_start) if start is not None]
+        if self._in_string:
+            starts.append(self._string_start)
+        keep = min(starts, default=self._pos + 1)
+        if 2 * (keep - self._base) < self._length - self._base:
+            return
+        self._join()
+        self._buffer = self._buffer[keep - self._base:]
+        self._base = keep
@@ -0,0 +1,80 @@
+"""Shared fixtures: a throwaway SQLite database and a canned LLM.
+
+Tests never talk to OpenAI. The helpers in ``benchmarks/_stub.py`` are
+reused, so tests and benchmarks run against the same stubs.
+"""
+import pytest
+
+from benchmarks._stub import StubChatModel, canned_analysis, configure_environment
+
+# Before anything reads settings
+configure_environment()
+
+
+def _reset_engine():
+    """Drop the engine, the writer thread and every per-database cache."""
+    from discovery_archaeology_agent import database, search
+    from discovery_archaeology_agent.http_cache import invention_bodies
+    from discovery_archaeology_agent.similarity import related_index
+
+    if database._writer is not None:
+        database._writer.shutdown(wait=True)
+        database._writer = None
+    if database._engine is not None:
+        database._engine.dispose()
+        database._engine = None
+    search._fts_available = None
+    related_index.clear()
+    invention_bodies.clear()
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh, initialized database file for one test."""
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.database import init_db
+
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path / 'test.db'}")
+    _reset_engine()
+    init_db()
+    yield
+    _reset_engine()
+
+
+@pytest.fixture
+def drain_writer(database):
+    """Returns a function that waits for every write queued so far."""
+    from discovery_archaeology_agent import database as db_module
+
+    def drain():
+        if db_module._writer is not None:
+            db_module._writer.submit(lambda: None).result()
+    return drain
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """``ChatOpenAI`` replaced by ``StubChatModel``; returns the stub class."""
+    from discovery_archaeology_agent import openai_client
+
+    StubChatModel.reset()
+    monkeypatch.setattr(openai_client, "ChatOpenAI", StubChatModel)
+    monkeypatch.setattr(openai_client, "_client", None)
+    return StubChatModel
+
+
+@pytest.fixture
+def seed(database, stub_llm):
+    """Store canned analyses; returns their invention ids."""
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+
+    def store(*names: str, discoveries: int = 5):
+        with SessionLocal() as db:
+            engine = DiscoveryEngine(db)
+            return [
+                engine._write_analysis(InventionAnalysis(**canned_analysis(name, discoveries=discoveries)))
+                for name in names
+            ]
+    return store
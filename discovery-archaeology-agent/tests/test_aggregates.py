@@ -0,0 +1,86 @@
+"""The theme and timeline tables agree with a full scan of the stored inventions."""
+import asyncio
+from collections import defaultdict
+
+from fastapi.testclient import TestClient
+
+from benchmarks._stub import canned_analysis
+
+
+def _full_scan() -> tuple:
+    """Themes and timeline computed from scratch over every stored invention."""
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.models import InventionModel
+
+    themes = defaultdict(list)
+    timeline = []
+    with SessionLocal() as db:
+        for invention in db.query(InventionModel).order_by(InventionModel.id):
+            moments = " ".join(invention.serendipity_moments or []).lower()
+            if "accident" in moments:
+                themes["Accidental Discoveries"].append(invention.name)
+            if "fail" in moments:
+                themes["Failures Leading to Success"].append(invention.name)
+            if invention.critical_prerequisites:
+                themes["Built on Prerequisites"].append(invention.name)
+            if invention.objective_blindness_examples:
+                themes["Missed Initial Opportunities"].append(invention.name)
+            if invention.year:
+                first = min(invention.discoveries, key=lambda discovery: discovery.id, default=None)
+                timeline.append({
+                    "year": invention.year,
+                    "invention": invention.name,
+                    "key_discovery": first.title if first else "Unknown",
+                    "pattern_count": len(invention.patterns),
+                    "prerequisite_count": len(invention.critical_prerequisites or [])
+                })
+    timeline.sort(key=lambda entry: entry["year"])
+    return dict(themes), timeline
+
+
+def test_aggregates_match_a_full_scan(seed, stub_llm):
+    from discovery_archaeology_agent.api import app
+    from discovery_archaeology_agent.batch import BatchAnalyzer
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.models import InventionModel
+    from discovery_archaeology_agent.schemas import InventionAnalysis, InventionRequest
+
+    [velcro, _] = seed("Velcro", "Nylon")
+    with SessionLocal() as db:
+        engine = DiscoveryEngine(db)
+
+        # An analysis showing fewer themes
+        engine._write_analysis(InventionAnalysis(**{
+            **canned_analysis("Teflon"),
+            "serendipity_moments": ["A patient search"],
+            "critical_prerequisites": [],
+            "objective_blindness_examples": []
+        }))
+
+        # Duplicates: the same analysis again, and a variant of a stored name
+        assert engine._write_analysis(InventionAnalysis(**canned_analysis("Velcro"))) == velcro
+        assert engine.analyze_invention(InventionRequest(invention_name="  velcro ")).id == velcro
+
+        # Re-analysis linking a pattern the invention did not have
+        engine._update_patterns(
+            db.get(InventionModel, velcro),
+            InventionAnalysis(**canned_analysis("Velcro", patterns=["cross_pollination"]))
+        )
+
+        # A focused variant is not a new invention
+        engine.analyze_invention(InventionRequest(invention_name="Nylon", focus_areas=["accidents"]))
+
+    async def batch():
+        with SessionLocal() as db:
+            analyzer = BatchAnalyzer(db)
+            return [p async for p in analyzer.run(["Nylon", "Kevlar", "kevlar", "Post-it"])]
+
+    asyncio.run(batch())
+
+    themes, timeline = _full_scan()
+    api = TestClient(app)
+
+    assert api.get("/patterns/themes").json() == themes
+    assert api.get("/patterns/timeline").json() == timeline
+    assert [entry["invention"] for entry in timeline].count("Velcro") == 1
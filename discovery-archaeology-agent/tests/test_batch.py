@@ -0,0 +1,72 @@
+"""Bulk analysis through the batch endpoint."""
+import asyncio
+import json
+
+import httpx
+
+
+def _post_batch(payload: dict) -> list:
+    """Post a batch and return its server-sent events as (event, data) pairs."""
+    from discovery_archaeology_agent.api import app
+
+    async def post():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            return (await client.post("/inventions/analyze/batch", json=payload)).text
+
+    events = []
+    for block in asyncio.run(post()).strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_batch_skips_stored_names_and_survives_a_failure(seed, stub_llm, monkeypatch):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+
+    [stored_id] = seed("Velcro")
+    respond = stub_llm._respond
+
+    def failing(self, messages):
+        if "Doomed" in messages[-1].content:
+            raise ValueError("the model gave up")
+        return respond(self, messages)
+
+    monkeypatch.setattr(stub_llm, "_respond", failing)
+    names = ["Velcro", "Nylon", "Doomed", "Teflon"]
+
+    events = _post_batch({"invention_names": names})
+
+    progress = [data for event, data in events if event == "progress"]
+    assert sorted(item["invention_name"] for item in progress) == sorted(names)
+    assert [item["completed"] for item in progress] == [1, 2, 3, 4]
+    statuses = {item["invention_name"]: item for item in progress}
+    assert statuses["Velcro"]["status"] == "skipped"
+    assert statuses["Velcro"]["invention_id"] == stored_id
+    assert statuses["Doomed"]["status"] == "failed"
+    assert statuses["Nylon"]["status"] == statuses["Teflon"]["status"] == "analyzed"
+
+    assert events[-1] == ("summary", {"total": 4, "analyzed": 2, "skipped": 1, "failed": 1})
+    # Only the three new names reached the model
+    assert stub_llm.calls == 3
+
+    with SessionLocal() as db:
+        engine = DiscoveryEngine(db)
+        assert engine.get_invention(statuses["Nylon"]["invention_id"]).analysis.invention_name == "Nylon"
+        assert engine.get_invention(statuses["Teflon"]["invention_id"]).analysis.invention_name == "Teflon"
+
+
+def test_batch_stored_inventions_join_the_related_index(seed, stub_llm):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.similarity import related_index
+
+    [stored_id] = seed("Velcro")
+    with SessionLocal() as db:
+        related_index.related(db, stored_id)
+
+    events = _post_batch({"invention_names": ["Nylon", "Teflon"]})
+
+    added = [data["invention_id"] for event, data in events if event == "progress"]
+    # In the index at once, without waiting for a lookup to catch up
+    assert set(added) <= set(related_index._corpus.rows)
@@ -0,0 +1,60 @@
+"""Accounts of one discovery in different analyses link to one entity."""
+from benchmarks._stub import canned_analysis
+
+
+def _analysis(name, discoveries):
+    """A canned analysis whose discoveries have the given (title, year, discoverers)."""
+    payload = canned_analysis(name, discoveries=len(discoveries))
+    for discovery, (title, year, people) in zip(payload["discoveries"], discoveries):
+        discovery.update(title=title, year=year, discoverers=people)
+    return payload
+
+
+def test_variant_accounts_link_and_distinct_discoveries_do_not(database, stub_llm):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+
+    analyses = {
+        "Transistor Radio": [
+            ("Invention of the point-contact transistor", 1947, ["John Bardeen", "Walter Brattain"]),
+            ("Discovery of X-rays", 1895, ["Wilhelm Röntgen"]),
+        ],
+        "Pocket Calculator": [
+            ("The first point-contact transistors", 1948, ["J. Bardeen"]),
+            ("Junction transistor", 1948, ["William Shockley"]),
+            ("Discovery of radioactivity", 1896, ["Henri Becquerel"]),
+        ],
+    }
+    with SessionLocal() as db:
+        engine = DiscoveryEngine(db)
+        ids = {
+            name: engine._write_analysis(InventionAnalysis(**_analysis(name, discoveries)))
+            for name, discoveries in analyses.items()
+        }
+
+        def entity_ids(name):
+            response = engine.get_invention(ids[name])
+            titles = {str(d.id): d.title for d in response.analysis.discoveries}
+            return {titles[discovery_id]: entity for discovery_id, entity in response.discovery_entities.items()}
+
+        radio, calculator = entity_ids("Transistor Radio"), entity_ids("Pocket Calculator")
+
+        # Variant wording, a plural, a year apart and with a subset of the discoverers
+        transistor = radio["Invention of the point-contact transistor"]
+        assert calculator["The first point-contact transistors"] == transistor
+        entity = engine.get_discovery_entity(transistor)
+        assert [occurrence.invention_name for occurrence in entity.inventions] == [
+            "Transistor Radio", "Pocket Calculator"
+        ]
+        assert entity.discoverers == ["bardeen", "brattain"]
+
+        # Similar titles or years, but different discoveries
+        assert calculator["Junction transistor"] != transistor
+        assert calculator["Discovery of radioactivity"] != radio["Discovery of X-rays"]
+        assert len(set(radio.values()) | set(calculator.values())) == 4
+
+        shared = engine.shared_discoveries(ids["Pocket Calculator"])
+        assert [(e.id, [o.invention_name for o in e.inventions]) for e in shared] == [
+            (transistor, ["Transistor Radio"])
+        ]
@@ -0,0 +1,61 @@
+"""ETags and conditional GETs on the read endpoints."""
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks._stub import canned_analysis
+
+
+@pytest.fixture
+def api(seed):
+    from discovery_archaeology_agent.api import app
+
+    return TestClient(app)
+
+
+def test_matching_if_none_match_gets_an_empty_304(api, seed):
+    [invention_id] = seed("Velcro")
+
+    first = api.get(f"/inventions/{invention_id}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = api.get(f"/inventions/{invention_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    stale = api.get(f"/inventions/{invention_id}", headers={"If-None-Match": '"something-else"'})
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
+
+
+def test_detail_etag_changes_with_a_new_pattern_link(api, seed):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.models import InventionModel
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+
+    [invention_id] = seed("Velcro")
+    before = api.get(f"/inventions/{invention_id}")
+
+    analysis = InventionAnalysis(**canned_analysis("Velcro", patterns=["cross_pollination"]))
+    with SessionLocal() as db:
+        DiscoveryEngine(db)._update_patterns(db.get(InventionModel, invention_id), analysis)
+
+    after = api.get(f"/inventions/{invention_id}", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert "cross_pollination" in after.json()["analysis"]["patterns_identified"]
+
+
+def test_list_etag_changes_when_a_row_is_added(api, seed):
+    seed("Velcro")
+    before = api.get("/inventions")
+    assert api.get("/inventions", headers={"If-None-Match": before.headers["etag"]}).status_code == 304
+
+    seed("Nylon")
+    after = api.get("/inventions", headers={"If-None-Match": before.headers["etag"]})
+
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert len(after.json()) == 2
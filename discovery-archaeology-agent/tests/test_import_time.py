@@ -0,0 +1,75 @@
+"""Import-time budget for the package, the CLI and the API worker.
+
+Each module is imported in a fresh interpreter under ``python -X
+importtime`` with ``OPENAI_API_KEY`` unset; the median cumulative import
+time of a few runs must stay within budget. Set ``IMPORT_TIME_BUDGET_SCALE``
+to multiply every budget on slow machines.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import time budgets, in milliseconds
+BUDGETS_MS = {
+    "discovery_archaeology_agent": 50,
+    "discovery_archaeology_agent.main": 600,
+    "discovery_archaeology_agent.api": 1800,
+}
+
+# Loaded on first use (the first LLM client, or the server); never by imports
+DEFERRED = ("langchain", "langchain_core", "langchain_openai", "openai", "uvicorn")
+
+RUNS = 3
+
+
+def _environment() -> dict:
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env.pop("PYTHONIMPORTTIME", None)
+    return env
+
+
+def import_profile(module: str) -> tuple:
+    """Cumulative import time (ms) of ``module`` and the deferred modules it loaded."""
+    code = (
+        f"import {module}, sys; "
+        f"print(' '.join(sorted({{m.split('.')[0] for m in sys.modules}} & set({DEFERRED!r}))))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=_environment(), check=True
+    )
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative = int(fields[1])
+    return cumulative / 1000, result.stdout.split()
+
+
+@pytest.mark.parametrize("module", list(BUDGETS_MS))
+def test_import_stays_within_budget(module):
+    budget = BUDGETS_MS[module] * float(os.environ.get("IMPORT_TIME_BUDGET_SCALE", "1"))
+    runs = [import_profile(module) for _ in range(RUNS)]
+
+    assert sorted({name for _, loaded in runs for name in loaded}) == []
+    assert statistics.median(ms for ms, _ in runs) <= budget
+
+
+def test_help_works_without_an_api_key():
+    cli = subprocess.run(
+        [sys.executable, "-m", "discovery_archaeology_agent", "--help"],
+        capture_output=True, text=True, env=_environment()
+    )
+    assert cli.returncode == 0, cli.stderr
+
+
+@pytest.mark.parametrize("module", list(BUDGETS_MS))
+def test_import_reads_no_settings(module):
+    code = f"import {module}; from discovery_archaeology_agent import config; print(config._settings is None)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=_environment(), check=True)
+
+    assert result.stdout.strip() == "True"
@@ -0,0 +1,138 @@
+"""Background analysis jobs return what the equivalent synchronous request would."""
+import asyncio
+
+import httpx
+
+
+async def _run_job(payload: dict) -> dict:
+    from discovery_archaeology_agent.api import app
+    from discovery_archaeology_agent.jobs import job_queue
+
+    await job_queue.start()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            job = (await client.post("/inventions/analyze/jobs", json=payload)).json()
+            job_queue.notify()
+            while job["status"] in ("queued", "running"):
+                await asyncio.sleep(0.05)
+                job = (await client.get(f"/jobs/{job['id']}")).json()
+            return job
+    finally:
+        await job_queue.stop()
+
+
+def test_focused_job_returns_the_focused_analysis(database, stub_llm):
+    job = asyncio.run(_run_job({"invention_name": "Velcro", "focus_areas": ["accidents"]}))
+
+    assert job["status"] == "done"
+    assert job["result"]["focus"]["focus_areas"] == ["accidents"]
+    assert any(d["id"].startswith("focus-") for d in job["result"]["analysis"]["discoveries"])
+
+
+def test_refresh_reaches_the_analysis(database, stub_llm, monkeypatch):
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+
+    requests = []
+    analyze = DiscoveryEngine.aanalyze_invention
+
+    async def spy(self, request):
+        requests.append(request)
+        return await analyze(self, request)
+
+    monkeypatch.setattr(DiscoveryEngine, "aanalyze_invention", spy)
+
+    job = asyncio.run(_run_job({"invention_name": "Velcro", "refresh": True}))
+
+    assert job["status"] == "done"
+    assert job["result"]["focus"] is None
+    assert requests[0].refresh is True
+
+
+def test_submit_writes_on_the_writer_thread(database, stub_llm, monkeypatch):
+    import threading
+
+    from discovery_archaeology_agent.jobs import JobQueue
+
+    threads = []
+    insert = JobQueue._insert
+
+    def spy(self, request):
+        threads.append(threading.current_thread().name)
+        return insert(self, request)
+
+    monkeypatch.setattr(JobQueue, "_insert", spy)
+
+    job = asyncio.run(_run_job({"invention_name": "Velcro"}))
+
+    assert job["status"] == "done"
+    assert threads and threads[0].startswith("db-writer")
+
+
+def _store_job(status: str, heartbeat_age: float, attempts: int) -> str:
+    """A job row as a worker left it, heartbeat ``heartbeat_age`` seconds ago."""
+    import uuid
+    from datetime import datetime, timedelta
+
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.models import JobModel
+
+    with SessionLocal() as db:
+        job = JobModel(
+            id=uuid.uuid4().hex, status=status, invention_name=f"Velcro {uuid.uuid4().hex[:6]}",
+            attempts=attempts, heartbeat_at=datetime.utcnow() - timedelta(seconds=heartbeat_age)
+        )
+        db.add(job)
+        db.commit()
+        return job.id
+
+
+def _job(job_id: str):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.jobs import job_queue
+
+    with SessionLocal() as db:
+        return job_queue.get(db, job_id)
+
+
+def test_stale_running_job_is_reclaimed(database, stub_llm):
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.jobs import JobQueue
+
+    # Its worker died mid-run; another is still alive and heartbeating
+    stale = _store_job("running", settings.job_heartbeat_seconds * 3 + 1, attempts=1)
+    alive = _store_job("running", 0, attempts=1)
+
+    async def finished():
+        while _job(stale).status.value in ("queued", "running"):
+            await asyncio.sleep(0.05)
+
+    async def resume():
+        queue = JobQueue()
+        await queue.start()
+        try:
+            await asyncio.wait_for(finished(), timeout=10)
+        finally:
+            await queue.stop()
+
+    asyncio.run(resume())
+
+    job = _job(stale)
+    assert job.status.value == "done"
+    assert job.attempts == 2
+    assert job.result.analysis.invention_name == job.invention_name
+    assert (_job(alive).status.value, _job(alive).attempts) == ("running", 1)
+
+
+def test_job_abandoned_too_often_fails(database, stub_llm):
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.jobs import JobQueue
+
+    job_id = _store_job("running", settings.job_heartbeat_seconds * 3 + 1, attempts=settings.job_max_attempts)
+
+    assert JobQueue()._claim_next() is None
+    job = _job(job_id)
+    assert job.status.value == "failed"
+    assert job.attempts == settings.job_max_attempts
+    assert job.error == "Job abandoned too many times"
+    assert stub_llm.calls == 0
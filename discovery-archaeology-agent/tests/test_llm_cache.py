@@ -0,0 +1,81 @@
+"""The LLM response cache only reads on the calling thread."""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def cache(database):
+    from discovery_archaeology_agent.llm_cache import ResponseCache
+
+    return ResponseCache()
+
+
+def _writer_threads(monkeypatch, cache, name):
+    threads = []
+    write = getattr(cache, name)
+
+    def spy(*args):
+        threads.append(threading.current_thread().name)
+        return write(*args)
+
+    monkeypatch.setattr(cache, name, spy)
+    return threads
+
+
+def _entry(key):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.models import LLMCacheModel
+
+    with SessionLocal() as db:
+        return db.get(LLMCacheModel, key)
+
+
+def _age(key, **columns):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.models import LLMCacheModel
+
+    with SessionLocal() as db:
+        db.query(LLMCacheModel).filter(LLMCacheModel.key == key).update(columns)
+        db.commit()
+
+
+def test_hits_are_counted_on_the_writer_thread(cache, drain_writer, monkeypatch):
+    threads = _writer_threads(monkeypatch, cache, "_touch")
+    cache.put("key", "model", "content")
+    _age("key", accessed_at=datetime.utcnow() - timedelta(hours=1))
+
+    assert cache.get("key") == "content"
+    drain_writer()
+
+    assert threads and threads[0].startswith("db-writer")
+    assert _entry("key").hits == 1
+
+
+def test_hits_between_bumps_are_written_with_the_next_bump(cache, drain_writer):
+    cache.put("key", "model", "content")
+    for _ in range(5):
+        assert cache.get("key") == "content"
+    drain_writer()
+    assert _entry("key").hits == 0
+
+    _age("key", accessed_at=datetime.utcnow() - timedelta(hours=1))
+    assert cache.get("key") == "content"
+    drain_writer()
+
+    assert _entry("key").hits == 6
+
+
+def test_expired_entries_are_dropped_on_the_writer_thread(cache, drain_writer, monkeypatch):
+    from discovery_archaeology_agent.config import settings
+
+    threads = _writer_threads(monkeypatch, cache, "_expire")
+    cache.put("key", "model", "content")
+    _age("key", created_at=datetime.utcnow() - timedelta(seconds=settings.llm_cache_ttl_seconds + 60))
+
+    assert cache.get("key") is None
+    drain_writer()
+
+    assert threads and threads[0].startswith("db-writer")
+    assert _entry("key") is None
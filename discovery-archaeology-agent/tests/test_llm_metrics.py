@@ -0,0 +1,36 @@
+"""LLM calls are counted under the right kind, with the tokens they used."""
+import asyncio
+
+
+def test_streamed_analysis_records_its_tokens(database, stub_llm):
+    from discovery_archaeology_agent.metrics import llm_requests, llm_tokens
+    from discovery_archaeology_agent.openai_client import DiscoveryArchaeologyClient
+
+    requests, tokens_in, tokens_out = (
+        llm_requests.value(kind="analysis"), llm_tokens.value(direction="in"), llm_tokens.value(direction="out")
+    )
+
+    async def stream():
+        return [part async for part in DiscoveryArchaeologyClient().astream_analysis("Velcro")]
+
+    asyncio.run(stream())
+
+    assert llm_requests.value(kind="analysis") == requests + 1
+    assert llm_tokens.value(direction="in") > tokens_in
+    assert llm_tokens.value(direction="out") > tokens_out
+
+
+def test_reduce_calls_have_their_own_kind(database, stub_llm, monkeypatch):
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.metrics import llm_requests
+    from discovery_archaeology_agent.openai_client import DiscoveryArchaeologyClient
+    from discovery_archaeology_agent.schemas import PatternType
+
+    monkeypatch.setattr(settings, "pattern_chunk_size", 10)
+    names = [f"Invention {i}" for i in range(30)]
+    patterns, reduces = llm_requests.value(kind="pattern"), llm_requests.value(kind="reduce")
+
+    asyncio.run(DiscoveryArchaeologyClient().afind_pattern_across_inventions(names, PatternType.CROSS_POLLINATION))
+
+    assert llm_requests.value(kind="pattern") == patterns + 3
+    assert llm_requests.value(kind="reduce") > reduces
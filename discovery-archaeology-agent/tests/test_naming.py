@@ -0,0 +1,79 @@
+"""Invention names resolve through canonical forms, aliases and trigram matches."""
+import pytest
+
+from discovery_archaeology_agent.naming import canonicalize
+
+
+@pytest.mark.parametrize("name, canonical", [
+    ("Microwave Oven", "microwave oven"),
+    ("  MICROWAVE   oven ", "microwave oven"),
+    ("The Microwave Oven", "microwave oven"),
+    ("Ｍｉｃｒｏｗａｖｅ Ｏｖｅｎ", "microwave oven"),
+    ("Café Coffee Filter", "cafe coffee filter"),
+    ("Newton’s Cradle", "newtons cradle"),
+    ("Post-it_Notes", "post it notes"),
+    ("C++", "c++"),
+    ("The", "the"),
+    ("A Team", "team"),
+])
+def test_canonicalize(name, canonical):
+    assert canonicalize(name) == canonical
+
+
+@pytest.fixture
+def resolve(seed):
+    """Store a few inventions; returns a name resolver and their ids."""
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.naming import resolve_invention_id
+
+    ids = dict(zip(("Microwave Oven", "Model 3", "Post-it Notes"), seed("Microwave Oven", "Model 3", "Post-it Notes")))
+
+    def resolve(name):
+        with SessionLocal() as db:
+            return resolve_invention_id(db, name)
+    return resolve, ids
+
+
+def test_exact_match_through_canonical_name(resolve):
+    resolve, ids = resolve
+    assert resolve("the microwave  OVEN") == ids["Microwave Oven"]
+    assert resolve("Post-It notes") == ids["Post-it Notes"]
+
+
+def test_alias_match(resolve):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.naming import add_alias
+
+    resolve, ids = resolve
+    assert resolve("Sticky Notes") is None
+    with SessionLocal() as db:
+        add_alias(db, "Sticky Notes", ids["Post-it Notes"])
+        # Already resolves exactly, so no alias is recorded
+        add_alias(db, "The Microwave Oven", ids["Post-it Notes"])
+        db.commit()
+    assert resolve("sticky notes") == ids["Post-it Notes"]
+    assert resolve("The Microwave Oven") == ids["Microwave Oven"]
+
+
+def test_trigram_match(resolve, monkeypatch):
+    from discovery_archaeology_agent.config import settings
+
+    resolve, ids = resolve
+    monkeypatch.setattr(settings, "name_match_threshold", 0.75)
+    assert resolve("Microwave Ovens") == ids["Microwave Oven"]
+    assert resolve("Post-it Note") == ids["Post-it Notes"]
+
+    # Off at a threshold of 1: only exact matches
+    monkeypatch.setattr(settings, "name_match_threshold", 1.0)
+    assert resolve("Microwave Ovens") is None
+
+
+def test_near_misses_do_not_match(resolve, monkeypatch):
+    from discovery_archaeology_agent.config import settings
+
+    resolve, ids = resolve
+    monkeypatch.setattr(settings, "name_match_threshold", 0.75)
+    assert resolve("Toaster Oven") is None
+    assert resolve("Microwave Radar") is None
+    # Close in trigrams, but a different number
+    assert resolve("Model 5") is None
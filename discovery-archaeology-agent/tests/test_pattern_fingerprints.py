@@ -0,0 +1,50 @@
+"""Pattern analysis only calls the model for pattern types whose members changed."""
+from benchmarks._stub import canned_analysis
+
+
+def test_unchanged_patterns_make_no_llm_calls(database, stub_llm, monkeypatch):
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.openai_client import DiscoveryArchaeologyClient
+    from discovery_archaeology_agent.pattern_analyzer import PatternAnalyzer
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+
+    # Fingerprints alone must skip the calls, not the response cache
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+
+    analyzed = []
+    find = DiscoveryArchaeologyClient.find_pattern_across_inventions
+
+    def spy(self, inventions, pattern_type, refresh=False):
+        analyzed.append(pattern_type.value)
+        return find(self, inventions, pattern_type, refresh)
+
+    monkeypatch.setattr(DiscoveryArchaeologyClient, "find_pattern_across_inventions", spy)
+
+    def store(name, patterns):
+        with SessionLocal() as db:
+            DiscoveryEngine(db)._write_analysis(InventionAnalysis(**canned_analysis(name, patterns=patterns)))
+
+    def analyze_all():
+        calls, analyzed[:] = stub_llm.calls, []
+        with SessionLocal() as db:
+            results = PatternAnalyzer(db).analyze_all_patterns()
+        return stub_llm.calls - calls, sorted(analyzed), {r.pattern_type.value: r for r in results}
+
+    for name in ("Velcro", "Nylon", "Teflon"):
+        store(name, ["accident_to_innovation", "prerequisite_chain"])
+
+    calls, types, first = analyze_all()
+    assert calls == 2
+    assert types == ["accident_to_innovation", "prerequisite_chain"]
+
+    calls, types, second = analyze_all()
+    assert (calls, types) == (0, [])
+    assert second == first
+
+    store("Penicillin", ["accident_to_innovation"])
+    calls, types, third = analyze_all()
+    assert (calls, types) == (1, ["accident_to_innovation"])
+    assert "Penicillin" in third["accident_to_innovation"].inventions
+    assert third["prerequisite_chain"] == first["prerequisite_chain"]
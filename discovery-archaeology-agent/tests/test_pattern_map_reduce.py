@@ -0,0 +1,42 @@
+"""Map-reduce pattern analysis over a corpus too large for one prompt."""
+import asyncio
+
+
+def test_ten_thousand_inventions_are_chunked_and_reduced(database, stub_llm):
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.openai_client import DiscoveryArchaeologyClient
+    from discovery_archaeology_agent.schemas import PatternType
+
+    names = [f"Synthetic invention number {i} with a moderately long name" for i in range(10000)]
+    client = DiscoveryArchaeologyClient()
+
+    result = asyncio.run(client.afind_pattern_across_inventions(names, PatternType.CROSS_POLLINATION))
+
+    assert len(client._pattern_chunks(names)) > 1
+    # The fixed prompt text around the invention list, plus the list itself
+    assert stub_llm.max_prompt_chars <= 4 * settings.pattern_chunk_tokens + 1000
+    assert {example["invention"] for example in result["examples"]} == set(names)
+    assert "pattern_description" in result
+
+
+def test_a_failed_chunk_fails_the_whole_analysis(database, stub_llm, monkeypatch):
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.openai_client import PATTERN_FALLBACK, DiscoveryArchaeologyClient
+    from discovery_archaeology_agent.schemas import PatternType
+
+    monkeypatch.setattr(settings, "pattern_chunk_size", 10)
+    names = [f"Invention {i}" for i in range(30)]
+    client = DiscoveryArchaeologyClient()
+    find_chunk, afind_chunk = client._find_pattern_chunk, client._afind_pattern_chunk
+
+    def failing(chunk, *args):
+        return dict(PATTERN_FALLBACK) if "Invention 10" in chunk else find_chunk(chunk, *args)
+
+    async def afailing(chunk, *args):
+        return dict(PATTERN_FALLBACK) if "Invention 10" in chunk else await afind_chunk(chunk, *args)
+
+    monkeypatch.setattr(client, "_find_pattern_chunk", failing)
+    monkeypatch.setattr(client, "_afind_pattern_chunk", afailing)
+
+    assert client.find_pattern_across_inventions(names, PatternType.CROSS_POLLINATION) == PATTERN_FALLBACK
+    assert asyncio.run(client.afind_pattern_across_inventions(names, PatternType.CROSS_POLLINATION)) == PATTERN_FALLBACK
@@ -0,0 +1,60 @@
+"""Read paths issue a constant number of queries, however long the discovery chains."""
+from contextlib import contextmanager
+
+from benchmarks._stub import canned_analysis
+
+CHAIN_LENGTHS = [1, 5, 20, 40]
+
+
+@contextmanager
+def count_queries(engine):
+    """Count statements executed on ``engine`` inside the block."""
+    from sqlalchemy import event
+
+    counter = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_read_paths_do_not_grow_with_discoveries(database, stub_llm, drain_writer):
+    from discovery_archaeology_agent.database import SessionLocal, get_engine
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.pattern_analyzer import PatternAnalyzer
+    from discovery_archaeology_agent.schemas import InventionAnalysis, InventionRequest
+
+    counts = {}
+    for length in CHAIN_LENGTHS:
+        name = f"Invention with {length} discoveries"
+        with SessionLocal() as db:
+            engine = DiscoveryEngine(db)
+            stored = engine._store_analysis(InventionAnalysis(**canned_analysis(name, discoveries=length)))
+            focused = InventionRequest(invention_name=name, focus_areas=["accidents"])
+            engine.analyze_invention(focused)
+        # Cache puts are queued on the writer; keep them out of the counts
+        drain_writer()
+
+        paths = {
+            "get_invention": lambda e: e.get_invention(stored.id),
+            "analyze_invention (cached)": lambda e: e.analyze_invention(InventionRequest(invention_name=name)),
+            "analyze_invention (focused)": lambda e: e.analyze_invention(focused),
+            "get_patterns": lambda e: e.get_patterns(),
+            "find_common_themes": lambda e: PatternAnalyzer(e.db).find_common_themes(),
+            "get_innovation_timeline": lambda e: PatternAnalyzer(e.db).get_innovation_timeline(),
+        }
+        for label, call in paths.items():
+            with SessionLocal() as db:
+                engine = DiscoveryEngine(db)
+                with count_queries(get_engine()) as counter:
+                    call(engine)
+                counts.setdefault(label, []).append(counter["queries"])
+
+    # Each step also stores one more invention, so this covers both
+    grows = {label: series for label, series in counts.items() if len(set(series)) > 1}
+    assert not grows, f"query counts grow with the discovery chain: {grows}"
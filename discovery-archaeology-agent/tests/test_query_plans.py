@@ -0,0 +1,116 @@
+"""EXPLAIN QUERY PLAN for every query the engine and analyzer issue.
+
+Runs each read and write path while recording its SQL, then fails if a
+statement scans one of the large tables without an index, apart from the
+paths that read a whole table by design.
+"""
+import re
+from contextlib import contextmanager
+
+from benchmarks._stub import canned_analysis
+
+SEED_INVENTIONS = 300
+
+# Tables that grow with the number of analyses
+LARGE_TABLES = {
+    "inventions", "discoveries", "connections", "invention_patterns",
+    "invention_themes", "timeline_entries", "analysis_variants"
+}
+
+# Paths that return every row of a table, where a scan is the right plan
+WHOLE_TABLE_READS = {
+    ("find_common_themes", "invention_themes"),
+    ("search (LIKE fallback)", "inventions"),
+    ("search (LIKE fallback)", "discoveries"),
+}
+
+SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)(.*)")
+
+
+@contextmanager
+def record_statements(engine):
+    """Collect (statement, parameters) pairs executed on ``engine``."""
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany and parameters and isinstance(parameters[0], (list, tuple)):
+            parameters = parameters[0]
+        statements.append((statement, tuple(parameters)))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def full_scans(conn, statement: str, parameters: tuple) -> list:
+    """Large tables that ``statement`` reads without an index."""
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    scans = []
+    for row in plan:
+        match = SCAN.search(row[-1])
+        if match and match.group(1) in LARGE_TABLES and "INDEX" not in match.group(2):
+            scans.append((match.group(1), row[-1]))
+    return scans
+
+
+def test_no_unindexed_scans_of_large_tables(seed, monkeypatch):
+    from discovery_archaeology_agent.config import settings
+    from discovery_archaeology_agent.database import SessionLocal, get_engine
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.pattern_analyzer import PatternAnalyzer
+    from discovery_archaeology_agent.schemas import InventionAnalysis, InventionRequest, PatternType
+    from discovery_archaeology_agent.search import search
+
+    seed(*(f"Seed {i}" for i in range(SEED_INVENTIONS)))
+    with SessionLocal() as db:
+        first = DiscoveryEngine(db).list_inventions(limit=1)[0][0]["id"]
+        _, cursor = DiscoveryEngine(db).list_inventions(limit=10)
+        DiscoveryEngine(db).analyze_invention(InventionRequest(invention_name="Seed 2", focus_areas=["accidents"]))
+
+    def like_search(db, query):
+        with monkeypatch.context() as patch:
+            patch.setattr(settings, "search_fts_enabled", False)
+            return search(db, query)
+
+    paths = {
+        "get_invention": lambda e, a: e.get_invention(first),
+        "analyze_invention (stored)": lambda e, a: e.analyze_invention(InventionRequest(invention_name="Seed 1")),
+        "analyze_invention (focused)": lambda e, a: e.analyze_invention(
+            InventionRequest(invention_name="Seed 2", focus_areas=["accidents"])
+        ),
+        "store_analysis": lambda e, a: e._store_analysis(InventionAnalysis(**canned_analysis("Fresh invention"))),
+        "list_inventions": lambda e, a: e.list_inventions(limit=20),
+        "list_inventions (cursor)": lambda e, a: e.list_inventions(limit=20, cursor=cursor),
+        "list_inventions (years)": lambda e, a: e.list_inventions(limit=20, year_from=1950, year_to=1960),
+        "list_inventions (pattern)": lambda e, a: e.list_inventions(limit=20, pattern=PatternType.PREREQUISITE_CHAIN),
+        "get_patterns": lambda e, a: e.get_patterns(),
+        "analyze_all_patterns": lambda e, a: a.analyze_all_patterns(refresh=True),
+        "find_common_themes": lambda e, a: a.find_common_themes(),
+        "get_innovation_timeline": lambda e, a: a.get_innovation_timeline(),
+        "related_inventions": lambda e, a: e.related_inventions(first),
+        "shared_discoveries": lambda e, a: e.shared_discoveries(first),
+        "get_discovery_entity": lambda e, a: e.get_discovery_entity(1),
+        "search": lambda e, a: search(e.db, "discovery 12"),
+        "search (LIKE fallback)": lambda e, a: like_search(e.db, "discovery 12"),
+    }
+
+    engine = get_engine()
+    problems = []
+    for label, call in paths.items():
+        with SessionLocal() as db:
+            with record_statements(engine) as statements:
+                call(DiscoveryEngine(db), PatternAnalyzer(db))
+
+        with engine.connect() as conn:
+            for statement, parameters in dict.fromkeys(statements):
+                if not statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE")):
+                    continue
+                for table, detail in full_scans(conn, statement, parameters):
+                    if (label, table) not in WHOLE_TABLE_READS:
+                        problems.append(f"{label}: {detail}\n    {' '.join(statement.split())[:160]}")
+
+    assert not problems, "full-table scans:\n" + "\n".join(problems)
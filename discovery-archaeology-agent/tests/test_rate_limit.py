@@ -0,0 +1,77 @@
+"""Retries, backoff and adaptive concurrency against a server that returns 429s.
+
+Runs the real ``ChatOpenAI`` client against ``benchmarks.stub_openai``.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks._stub import LiveServer
+from benchmarks.stub_openai import StubOpenAI
+
+SERVER_CONCURRENCY = 4
+
+
+@pytest.fixture
+def llm_server(database, monkeypatch):
+    """A local OpenAI stub that 429s requests beyond its concurrency; the shared client points at it."""
+    from discovery_archaeology_agent import openai_client
+    from discovery_archaeology_agent.config import settings
+
+    for name, value in {
+        "llm_cache_enabled": False,
+        "llm_max_retries": 20,
+        "llm_backoff_base_seconds": 0.05,
+        "llm_backoff_max_seconds": 1.0,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+    stub = StubOpenAI(latency=0.1, max_concurrency=SERVER_CONCURRENCY, retry_after=0.05)
+    with LiveServer(stub.app()) as server:
+        monkeypatch.setattr(settings, "openai_base_url", f"{server.url}/v1")
+        monkeypatch.setattr(openai_client, "_client", None)
+        yield stub
+
+
+def test_analyses_succeed_through_429s(llm_server):
+    from discovery_archaeology_agent import openai_client
+
+    async def run():
+        client = openai_client.get_client()
+        try:
+            results = await asyncio.gather(
+                *(client.aanalyze_invention(f"Invention {i}", refresh=True) for i in range(24)),
+                return_exceptions=True
+            )
+            return results, client.limiter.stats()
+        finally:
+            await openai_client.close_client()
+
+    results, stats = asyncio.run(run())
+
+    assert [r for r in results if isinstance(r, Exception)] == []
+    assert llm_server.rate_limited > 0
+    assert stats["retries"] > 0
+    assert stats["concurrency_limit"] <= SERVER_CONCURRENCY * 2
+
+
+def test_exhausted_retries_answer_429_with_retry_after(llm_server):
+    from discovery_archaeology_agent import openai_client
+    from discovery_archaeology_agent.api import app
+
+    llm_server.always_429 = True
+
+    async def run():
+        openai_client.get_client().limiter.max_retries = 2
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as api:
+                return await api.post("/inventions/analyze", json={"invention_name": "Unlucky", "refresh": True})
+        finally:
+            await openai_client.close_client()
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
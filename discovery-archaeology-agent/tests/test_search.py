@@ -0,0 +1,50 @@
+"""Full-text search, through FTS5 and through the LIKE fallback."""
+import pytest
+
+from benchmarks._stub import canned_analysis
+
+
+@pytest.fixture
+def store(database, stub_llm):
+    """Store canned analyses with the given summaries."""
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+
+    def store(**summaries: str):
+        with SessionLocal() as db:
+            engine = DiscoveryEngine(db)
+            for name, summary in summaries.items():
+                engine._write_analysis(InventionAnalysis(**{**canned_analysis(name), "summary": summary}))
+    return store
+
+
+def _search(query: str, **options):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.search import search
+
+    with SessionLocal() as db:
+        hits, _ = search(db, query, **options)
+    return hits
+
+
+def test_like_wildcards_match_literally(store, monkeypatch):
+    from discovery_archaeology_agent.config import settings
+
+    store(Dynamo="Output rose 50% overnight.", Lathe="Output rose 5000 units.", Kiln="A 5_0 batch.")
+    monkeypatch.setattr(settings, "search_fts_enabled", False)
+
+    assert [hit.invention_name for hit in _search("50%")] == ["Dynamo"]
+    assert [hit.invention_name for hit in _search("5_0")] == ["Kiln"]
+
+
+@pytest.mark.parametrize("fts", [True, False], ids=["fts5", "like"])
+def test_stored_markup_is_escaped(store, monkeypatch, fts):
+    from discovery_archaeology_agent.config import settings
+
+    store(**{"<script>alert(1)</script> Loom": "A <b>loom</b> & a shuttle."})
+    monkeypatch.setattr(settings, "search_fts_enabled", fts)
+
+    [hit] = _search("loom", kind="invention")
+    assert hit.title == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>Loom</mark>"
+    assert "&lt;b&gt;<mark>loom</mark>&lt;/b&gt; &amp; a shuttle." in hit.snippet
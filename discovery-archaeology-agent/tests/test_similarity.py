@@ -0,0 +1,23 @@
+"""Feature extraction for related inventions."""
+from benchmarks._stub import canned_analysis
+
+
+def test_patterns_come_from_the_identified_patterns(database, stub_llm):
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.schemas import InventionAnalysis
+    from discovery_archaeology_agent.similarity import PATTERNS, _load, analysis_features
+
+    # Explanations are optional; the identified patterns are what counts
+    data = canned_analysis("Velcro")
+    analysis = InventionAnalysis(**{**data, "pattern_explanations": {}})
+    identified = {pattern.value for pattern in analysis.patterns_identified}
+    assert identified
+
+    assert set(analysis_features(analysis)[PATTERNS]) == identified
+
+    with SessionLocal() as db:
+        DiscoveryEngine(db)._write_analysis(analysis)
+        [(_, _, _, groups)] = list(_load(db, 0))
+
+    assert groups == analysis_features(analysis)
@@ -0,0 +1,32 @@
+"""Concurrent identical analyses collapse into one LLM call."""
+import asyncio
+
+import httpx
+import pytest
+
+SPELLINGS = ["Microwave Oven", "microwave  oven", " MICROWAVE OVEN "]
+
+
+async def _analyze_concurrently(requests: int) -> list:
+    from discovery_archaeology_agent.api import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        return await asyncio.gather(*[
+            client.post("/inventions/analyze", json={"invention_name": SPELLINGS[i % len(SPELLINGS)]})
+            for i in range(requests)
+        ])
+
+
+@pytest.mark.parametrize("lease", [False, True], ids=["in-process", "lease"])
+def test_concurrent_requests_share_one_llm_call(database, stub_llm, monkeypatch, lease):
+    from discovery_archaeology_agent.config import settings
+
+    monkeypatch.setattr(settings, "analysis_lease_enabled", lease)
+    stub_llm.delay = 0.2
+
+    responses = asyncio.run(_analyze_concurrently(50))
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert stub_llm.calls == 1
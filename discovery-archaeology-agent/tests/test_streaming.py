@@ -0,0 +1,71 @@
+"""Incremental parsing of a streamed analysis."""
+import json
+
+from benchmarks._stub import canned_analysis
+from discovery_archaeology_agent.streaming import IncrementalJSONScanner
+
+
+def _scan(chunks) -> list:
+    scanner = IncrementalJSONScanner()
+    return [event for chunk in chunks for event in scanner.feed(chunk)]
+
+
+def test_events_do_not_depend_on_chunking():
+    text = "```json\n" + json.dumps(canned_analysis("Velcro")) + "\n```"
+    whole = _scan([text])
+
+    assert _scan(text[i:i + 7] for i in range(0, len(text), 7)) == whole
+    assert [value["title"] for kind, key, value in whole if kind == "item" and key == "discoveries"] == [
+        f"Velcro discovery {i}" for i in range(5)
+    ]
+    assert ("field", "key_lesson", "Follow the surprises.") in whole
+
+
+def test_trailing_prose_after_the_object_is_ignored():
+    events = _scan(['{"a": 1, "b": [{"c": 2}]}', '\nNote: the list ] ends here "quoted', " } {"])
+
+    assert events == [("field", "a", 1), ("item", "b", {"c": 2}), ("field", "b", [{"c": 2}])]
+
+
+def test_malformed_values_are_skipped_not_fatal():
+    events = _scan(['{"a": tru', 'e, "b": nope, "c": [{"d": 1}, {"e": }], "f": "ok"}'])
+
+    assert events == [("field", "a", True), ("item", "c", {"d": 1}), ("field", "f", "ok")]
+
+
+def test_long_responses_are_not_held_whole():
+    text = json.dumps({f"field{i}": "x" * 100 for i in range(2000)})
+    scanner = IncrementalJSONScanner()
+    held = 0
+    for i in range(0, len(text), 5):
+        scanner.feed(text[i:i + 5])
+        held = max(held, len(scanner._buffer) + sum(map(len, scanner._parts)))
+
+    assert held < 1000
+
+
+def test_streamed_result_matches_the_stored_analysis(database, stub_llm):
+    import asyncio
+
+    from discovery_archaeology_agent.database import SessionLocal
+    from discovery_archaeology_agent.discovery_engine import DiscoveryEngine
+    from discovery_archaeology_agent.schemas import InventionRequest
+
+    async def stream():
+        with SessionLocal() as db:
+            return [event async for event in DiscoveryEngine(db).astream_invention(InventionRequest(invention_name="Velcro"))]
+
+    events = asyncio.run(stream())
+    kind, streamed = events[-1]
+    assert kind == "result"
+
+    with SessionLocal() as db:
+        engine = DiscoveryEngine(db)
+        stored = engine.get_invention(streamed.id)
+        blocking = engine.analyze_invention(InventionRequest(invention_name="Velcro"))
+
+    assert streamed == stored == blocking
+    # Discoveries streamed piece by piece are the ones stored (ids aside: the
+    # model's are replaced by database ids when stored)
+    streamed_titles = [data["title"] for event, data in events if event == "discovery"]
+    assert streamed_titles == [discovery.title for discovery in stored.analysis.discoveries]
@@ -0,0 +1,35 @@
+"""Stored analyses are served without an OpenAI API key; only new analyses need one."""
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def no_api_key(seed, monkeypatch):
+    from discovery_archaeology_agent import openai_client
+    from discovery_archaeology_agent.config import settings
+
+    ids = seed("Velcro", "Nylon")
+    monkeypatch.setattr(settings, "openai_api_key", None)
+    monkeypatch.setattr(openai_client, "_client", None)
+    return ids
+
+
+def test_reads_need_no_api_key(no_api_key):
+    from discovery_archaeology_agent.api import app
+
+    with TestClient(app) as client:
+        for path in ["/inventions", f"/inventions/{no_api_key[0]}", "/patterns", "/patterns/themes",
+                     "/patterns/timeline", "/search?q=velcro"]:
+            assert client.get(path).status_code == 200, path
+        # A stored invention is returned without calling the model
+        assert client.post("/inventions/analyze", json={"invention_name": "velcro"}).status_code == 200
+
+
+def test_new_analysis_reports_the_missing_key(no_api_key):
+    from discovery_archaeology_agent.api import app
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        response = client.post("/inventions/analyze", json={"invention_name": "Teflon"})
+
+    assert response.status_code == 500
+    assert "OPENAI_API_KEY" in response.json()["detail"]